@@ -0,0 +1,7 @@
+"""Seed data and a replayable mixed workload for benchmarking the API.
+
+``seed_benchmark_data`` fills an empty database with users, vehicles and
+journeys; ``run_benchmark`` replays login, register, journey creation and
+the admin journey listing against it and compares the results with a
+stored baseline.
+"""
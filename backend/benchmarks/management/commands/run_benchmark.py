@@ -0,0 +1,82 @@
+import json
+import platform
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from benchmarks import report, workload
+
+DEFAULT_BASELINE = Path(__file__).resolve().parents[2] / 'baselines.json'
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name not in workload.OPERATIONS:
+            raise CommandError(f'Unknown operation {name!r}; choose from {", ".join(workload.OPERATIONS)}')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class Command(BaseCommand):
+    help = 'Replay a mixed API workload against seeded data and report latency, throughput and queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--warmup', type=int, default=100)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--mix', help='Operation weights, e.g. login=2,admin_list=4')
+        parser.add_argument('--url', help='Send requests to this running server instead of the test client')
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+        parser.add_argument('--save-baseline', action='store_true', help='Store this run as the new baseline')
+        parser.add_argument('--tolerance', type=float, default=report.LATENCY_TOLERANCE)
+        parser.add_argument('--fail-on-regression', action='store_true')
+        parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+
+    def handle(self, *args, **options):
+        mix = parse_mix(options['mix']) if options['mix'] else workload.DEFAULT_MIX
+        try:
+            samples, elapsed = workload.run(
+                mix, options['requests'], concurrency=options['concurrency'],
+                warmup=options['warmup'], seed=options['seed'], base_url=options['url'],
+            )
+        except LookupError as exc:
+            raise CommandError(str(exc))
+        summary = report.summarize(samples, elapsed)
+
+        if options['json']:
+            self.stdout.write(json.dumps(summary, indent=2))
+        else:
+            self.print_table(summary, len(samples), elapsed)
+
+        baseline_path = Path(options['baseline'])
+        if options['save_baseline']:
+            report.save_baseline(baseline_path, summary, {
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'transport': options['url'] or 'test-client',
+                'database': settings.DATABASES['default']['ENGINE'],
+                'python': platform.python_version(),
+            })
+            self.stdout.write(self.style.SUCCESS(f'Baseline written to {baseline_path}'))
+            return
+        if not baseline_path.exists():
+            self.stdout.write(f'No baseline at {baseline_path}; run with --save-baseline to create one.')
+            return
+        regressions = report.compare(summary, report.load_baseline(baseline_path), options['tolerance'])
+        for line in regressions:
+            self.stdout.write(self.style.ERROR(f'Regression: {line}'))
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f'{len(regressions)} regression(s) against {baseline_path}')
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
+
+    def print_table(self, summary, total, elapsed):
+        columns = ('requests', 'errors', 'throughput', 'p50_ms', 'p95_ms', 'p99_ms', 'queries', 'throttled', 'wait_ms')
+        self.stdout.write(f"{'operation':<16}" + ''.join(f'{column:>12}' for column in columns))
+        for name, row in summary.items():
+            cells = ''.join(f"{'-' if row[column] is None else row[column]:>12}" for column in columns)
+            self.stdout.write(f'{name:<16}{cells}')
+        self.stdout.write(f'{total} requests in {elapsed:.2f}s ({total / elapsed:.1f} req/s)')
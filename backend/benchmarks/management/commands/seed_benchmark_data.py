@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+from benchmarks.seed import seed
+from journeys.models import Journey
+
+
+class Command(BaseCommand):
+    help = 'Fill an empty database with deterministic users, vehicles and journeys for benchmarking'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20000)
+        parser.add_argument('--journeys', type=int, default=1000000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--force', action='store_true', help='Seed even if journeys already exist, replacing an earlier seed',
+        )
+
+    def handle(self, *args, **options):
+        if Journey.objects.exists() and not options['force']:
+            raise CommandError('The database already has journeys; seed a dedicated database or pass --force.')
+        seed(
+            options['users'], options['journeys'], batch_size=options['batch_size'],
+            seed=options['seed'], log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS('Benchmark data seeded'))
@@ -0,0 +1,65 @@
+"""Summaries of workload samples and comparison with a stored baseline."""
+import json
+import math
+from collections import defaultdict
+
+# A run regresses when an operation's p95 latency grows by more than this
+# fraction over the baseline, or its mean queries per request grow by more
+# than QUERY_TOLERANCE (requests that fill a cache can add a query or two).
+LATENCY_TOLERANCE = 0.2
+QUERY_TOLERANCE = 0.5
+
+
+def percentile(ordered, fraction):
+    index = max(math.ceil(fraction * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+def summarize(samples, elapsed):
+    grouped = defaultdict(list)
+    for sample in samples:
+        grouped[sample[0]].append(sample)
+    summary = {}
+    for name, rows in sorted(grouped.items()):
+        latencies = sorted(row[2] for row in rows)
+        queries = [row[3] for row in rows if row[3] is not None]
+        summary[name] = {
+            'requests': len(rows),
+            'errors': sum(1 for row in rows if not row[1]),
+            'throughput': round(len(rows) / elapsed, 2),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'queries': round(sum(queries) / len(queries), 2) if queries else None,
+            # Admission control: requests turned away with 429, and the mean
+            # pacing wait before each request was sent.
+            'throttled': sum(1 for row in rows if row[4]),
+            'wait_ms': round(sum(row[5] for row in rows) / len(rows) * 1000, 2),
+        }
+    return summary
+
+
+def compare(summary, baseline, tolerance=LATENCY_TOLERANCE):
+    """Return a list of human-readable regressions against ``baseline``."""
+    regressions = []
+    for name, current in summary.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']} ms -> {current['p95_ms']} ms")
+        queries = (current['queries'], previous['queries'])
+        if None not in queries and queries[0] > queries[1] + QUERY_TOLERANCE:
+            regressions.append(f"{name}: queries/request {previous['queries']} -> {current['queries']}")
+    return regressions
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)['operations']
+
+
+def save_baseline(path, summary, meta):
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump({'meta': meta, 'operations': summary}, handle, indent=2, sort_keys=True)
+        handle.write('\n')
@@ -0,0 +1,178 @@
+"""Deterministic benchmark data.
+
+Rows are generated from a seeded RNG and written with bulk_create, so the
+same arguments always produce the same database. Journeys respect the
+per-slot capacity limits; SlotCapacity, the route counters and the
+occupancy forecast are rebuilt once at the end instead of per row. Seeding
+again first deletes the previous seed's rows in the same transaction.
+"""
+import random
+from collections import Counter
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from journeys.forecast import occupancy
+from journeys.models import ArchivedJourney, Journey, RouteStat, SlotCapacity, slot_start_for
+from vehicles.models import Vehicle
+
+User = get_user_model()
+
+USERNAME_PREFIX = 'bench_'
+ADMIN_USERNAME = 'bench_admin'
+PASSWORD = 'bench-Pass-2024'
+
+ORIGINS = [
+    'Prayagraj', 'Varanasi', 'Lucknow', 'Delhi', 'Dehradun', 'Haridwar', 'Rishikesh', 'Bhopal',
+    'Indore', 'Puri', 'Bhubaneswar', 'Kolkata', 'Patna', 'Jaipur', 'Ahmedabad', 'Mumbai',
+]
+# Rough share of traffic per destination, in Journey.LOCATIONS order.
+DESTINATION_WEIGHTS = [50, 10, 20, 15, 5]
+# Seeded journeys start within this many days either side of the seed date.
+SPREAD_DAYS = 180
+
+
+def bench_email(index):
+    return f'{USERNAME_PREFIX}{index}@bench.example'
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def generate_users(count, password_hash):
+    yield User(
+        username=ADMIN_USERNAME, email='bench_admin@bench.example', password=password_hash,
+        first_name='Bench', last_name='Admin', aadhar_number='0' * 12, license_number='BENCHADMIN',
+        phone_number='9000000000', is_admin=True, is_staff=True,
+    )
+    for index in range(1, count + 1):
+        yield User(
+            username=f'{USERNAME_PREFIX}{index}', email=bench_email(index), password=password_hash,
+            first_name='Bench', last_name=f'User {index}', aadhar_number=f'{index:012d}',
+            license_number=f'BENCH{index:012d}', phone_number=f'9{index % 10 ** 9:09d}',
+        )
+
+
+def generate_vehicles(rng, user_ids):
+    types = [code for code, _ in Vehicle.VEHICLE_TYPES]
+    index = 0
+    for user_id in user_ids:
+        for _ in range(rng.randint(1, 2)):
+            index += 1
+            vehicle_type = rng.choice(types)
+            yield Vehicle(
+                user_id=user_id, vehicle_type=vehicle_type, plate_number=f'BENCH{index:010d}',
+                model_name='Bench', max_capacity=Vehicle.CAPACITY_BY_TYPE[vehicle_type],
+            )
+
+
+def clear_previous(batch_size):
+    """Delete an earlier seed's users with their vehicles and journeys, and
+    return the slot reservations those journeys held.
+
+    Journeys and vehicles are deleted without their per-row signals; the
+    counters they would adjust are rebuilt after seeding.
+    """
+    users = User.objects.filter(username__startswith=USERNAME_PREFIX)
+    journeys = Journey.objects.filter(user__in=users)
+    released = Counter(
+        (end_location, slot_start_for(start_date))
+        for end_location, start_date in journeys.values_list('end_location', 'start_date').iterator(batch_size)
+    )
+    journeys._raw_delete(journeys.db)
+    archived = ArchivedJourney.objects.filter(user__in=users)
+    archived._raw_delete(archived.db)
+    vehicles = Vehicle.objects.filter(user__in=users)
+    vehicles._raw_delete(vehicles.db)
+    users.delete()
+    return released
+
+
+def generate_journeys(rng, count, vehicles, now, reserved, limits):
+    """Yield journeys, skipping any slot that is already at its limit."""
+    destinations = [code for code, _ in Journey.LOCATIONS]
+    earliest = now - timedelta(days=SPREAD_DAYS)
+    hours = SPREAD_DAYS * 2 * 24
+    produced = 0
+    while produced < count:
+        user_id, vehicle_id, capacity = rng.choice(vehicles)
+        end_location = rng.choices(destinations, DESTINATION_WEIGHTS)[0]
+        start_date = earliest + timedelta(hours=rng.randrange(hours), minutes=rng.randrange(60))
+        slot = (end_location, slot_start_for(start_date))
+        if reserved[slot] >= limits.get(slot, settings.JOURNEY_SLOT_CAPACITY.get(end_location, 0)):
+            continue
+        reserved[slot] += 1
+        produced += 1
+        yield Journey(
+            user_id=user_id, vehicle_id=vehicle_id,
+            start_location=rng.choice(ORIGINS), end_location=end_location,
+            start_date=start_date, end_date=start_date + timedelta(days=rng.randint(1, 10)),
+            number_of_passengers=rng.randint(1, capacity),
+            is_approved=rng.random() < 0.7,
+        )
+
+
+def seed(users, journeys, batch_size=5000, seed=0, log=None):
+    log = log or (lambda message: None)
+    rng = random.Random(seed)
+    now = timezone.now().replace(minute=0, second=0, microsecond=0)
+    password_hash = make_password(PASSWORD)
+
+    with transaction.atomic():
+        released = clear_previous(batch_size)
+        if released:
+            log(f'Removed {sum(released.values())} journeys of the previous seed')
+
+        for batch in batched(generate_users(users, password_hash), batch_size):
+            User.objects.bulk_create(batch)
+        user_ids = list(
+            User.objects.filter(username__startswith=USERNAME_PREFIX, is_admin=False)
+            .order_by('pk').values_list('pk', flat=True)
+        )
+        log(f'{len(user_ids)} users')
+
+        for batch in batched(generate_vehicles(rng, user_ids), batch_size):
+            Vehicle.objects.bulk_create(batch)
+        vehicles = list(
+            Vehicle.objects.filter(user_id__in=user_ids)
+            .order_by('pk').values_list('user_id', 'pk', 'max_capacity')
+        )
+        log(f'{len(vehicles)} vehicles')
+
+        # Slots booked by anything other than the previous seed stay booked.
+        slots = {(slot.end_location, slot.slot_start): slot for slot in SlotCapacity.objects.all()}
+        reserved = Counter({key: max(slot.reserved - released[key], 0) for key, slot in slots.items()})
+        limits = {key: slot.limit for key, slot in slots.items()}
+        created = 0
+        for batch in batched(generate_journeys(rng, journeys, vehicles, now, reserved, limits), batch_size):
+            Journey.objects.bulk_create(batch)
+            created += len(batch)
+            if created % (batch_size * 20) == 0:
+                log(f'{created} journeys')
+        log(f'{created} journeys')
+
+        changed = []
+        for key, slot in slots.items():
+            if slot.reserved != reserved[key]:
+                slot.reserved = reserved[key]
+                changed.append(slot)
+        SlotCapacity.objects.bulk_update(changed, ['reserved'], batch_size=batch_size)
+        new_slots = ((key, count) for key, count in reserved.items() if key not in slots)
+        for batch in batched(new_slots, batch_size):
+            SlotCapacity.objects.bulk_create(
+                SlotCapacity(
+                    end_location=end_location, slot_start=slot_start, reserved=count,
+                    limit=settings.JOURNEY_SLOT_CAPACITY.get(end_location, 0),
+                )
+                for (end_location, slot_start), count in batch
+            )
+        RouteStat.objects.rebuild()
+    occupancy.reset()
+    log(f'{len(reserved)} booking slots, {RouteStat.objects.count()} routes')
@@ -0,0 +1,44 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.db.models import Sum
+from django.test import SimpleTestCase, TestCase
+from journeys.models import Journey, SlotCapacity
+from vehicles.models import Vehicle
+from .report import summarize
+from .seed import seed
+from .workload import Pacer
+
+
+class PacerTests(SimpleTestCase):
+    def test_calls_are_spaced_by_the_rate(self):
+        pacer = Pacer(rate=50)
+        start = time.monotonic()
+        waits = [pacer.wait() for _ in range(4)]
+        self.assertEqual(waits[0], 0)
+        self.assertGreaterEqual(time.monotonic() - start, 3 * 0.02 - 0.005)
+
+
+class SummaryTests(SimpleTestCase):
+    def test_throttled_requests_and_waits_are_reported(self):
+        samples = [
+            ('create_journey', True, 0.01, 12, False, 0.002),
+            ('create_journey', False, 0.001, 4, True, 0.004),
+            ('login', True, 0.02, 8, False, 0.0),
+        ]
+        summary = summarize(samples, elapsed=1.0)
+        self.assertEqual(summary['create_journey']['throttled'], 1)
+        self.assertEqual(summary['create_journey']['errors'], 1)
+        self.assertEqual(summary['create_journey']['wait_ms'], 3.0)
+        self.assertEqual(summary['login']['throttled'], 0)
+
+
+class SeedTests(TestCase):
+    def test_seeding_again_replaces_the_previous_seed(self):
+        seed(users=5, journeys=30, batch_size=7)
+        vehicles = Vehicle.objects.count()
+        seed(users=5, journeys=30, batch_size=7)
+        self.assertEqual(get_user_model().objects.filter(username__startswith='bench_').count(), 6)
+        self.assertEqual(Vehicle.objects.count(), vehicles)
+        self.assertEqual(Journey.objects.count(), 30)
+        self.assertEqual(SlotCapacity.objects.aggregate(total=Sum('reserved'))['total'], 30)
@@ -0,0 +1,247 @@
+"""Mixed API workload replayed against seeded data.
+
+Each operation builds one request from a per-worker RNG. Requests go
+through the Django test client in-process, where the queries each request
+runs are counted, or over HTTP to a running server. Workers are threads,
+each with its own client and database connection, so concurrent runs need
+a server database; SQLite serialises writers and reports lock errors.
+"""
+import itertools
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import Client
+from django.utils import timezone
+from journeys.models import Journey
+from rest_framework import status
+from users.authentication import issue_token
+from vehicles.models import Vehicle
+from .seed import ADMIN_USERNAME, PASSWORD, USERNAME_PREFIX, bench_email
+
+# Relative frequency of each operation in the default mix.
+DEFAULT_MIX = {
+    'login': 2,
+    'register': 1,
+    'create_journey': 3,
+    'admin_list': 4,
+}
+# How many seeded users the workload logs in as and books journeys for.
+SAMPLE_USERS = 500
+# Journeys created by the workload start this far out, past the seeded
+# range, so they do not run into full slots.
+BOOKING_WINDOW_DAYS = (400, 1100)
+# Operations behind admission control, and the ADMISSION_BUCKETS entry each
+# is admitted through.
+ADMITTED_OPERATIONS = {
+    'register': 'register',
+    'create_journey': 'journey_create',
+}
+
+
+class Pacer:
+    """Spaces calls from every worker ``1 / rate`` seconds apart."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        """Sleep until this call's turn; returns the seconds slept."""
+        with self._lock:
+            now = time.monotonic()
+            due = max(now, self._next)
+            self._next = due + self.interval
+        time.sleep(due - now)
+        return due - now
+
+
+class Fixtures:
+    """Seeded users, their vehicles and tokens, loaded once before a run."""
+
+    def __init__(self):
+        User = get_user_model()
+        admin = User.objects.get(username=ADMIN_USERNAME)
+        self.admin_token = issue_token(admin)
+        users = list(
+            User.objects.filter(username__startswith=USERNAME_PREFIX, is_admin=False)
+            .order_by('pk')[:SAMPLE_USERS]
+        )
+        if not users:
+            raise LookupError('No benchmark users found; run seed_benchmark_data first.')
+        vehicles = {}
+        for vehicle in Vehicle.objects.filter(user__in=users):
+            vehicles.setdefault(vehicle.user_id, vehicle)
+        self.users = [
+            (int(user.username[len(USERNAME_PREFIX):]), issue_token(user), vehicles[user.pk])
+            for user in users if user.pk in vehicles
+        ]
+        self.admin_pages = max(min(Journey.objects.count() // 10, 50), 1)
+        # Registrations must not collide with earlier runs on the same data.
+        self.run_id = time.time_ns() % 10 ** 5
+        self.registrations = itertools.count()
+        # Over-limit requests get a 429 rather than waiting, so the workers
+        # together send each admitted operation no faster than its bucket
+        # refills. The wait is reported, not timed.
+        self.pacers = {
+            name: Pacer(settings.ADMISSION_BUCKETS[bucket]['rate'])
+            for name, bucket in ADMITTED_OPERATIONS.items() if bucket in settings.ADMISSION_BUCKETS
+        }
+
+    def pace(self, name):
+        pacer = self.pacers.get(name)
+        return pacer.wait() if pacer else 0.0
+
+
+def login(fixtures, rng):
+    index, _, _ = rng.choice(fixtures.users)
+    return 'POST', '/api/users/login/', {'email': bench_email(index), 'password': PASSWORD}, None
+
+
+def register(fixtures, rng):
+    number = next(fixtures.registrations)
+    name = f'load_{fixtures.run_id}_{number}'
+    return 'POST', '/api/users/register/', {
+        'username': name, 'email': f'{name}@bench.example',
+        'first_name': 'Load', 'last_name': str(number),
+        'aadhar_number': f'9{fixtures.run_id:05d}{number:06d}',
+        'license_number': f'LOAD{fixtures.run_id:05d}{number:07d}',
+        'phone_number': f'8{number % 10 ** 9:09d}',
+        'password': PASSWORD, 'password2': PASSWORD,
+    }, None
+
+
+def create_journey(fixtures, rng):
+    _, token, vehicle = rng.choice(fixtures.users)
+    start_date = timezone.now().replace(minute=0, second=0, microsecond=0) + timedelta(
+        days=rng.randint(*BOOKING_WINDOW_DAYS), hours=rng.randrange(24),
+    )
+    return 'POST', '/api/journeys/', {
+        'vehicle': vehicle.pk,
+        'start_location': 'Prayagraj',
+        'end_location': rng.choice(Journey.LOCATIONS)[0],
+        'start_date': start_date.isoformat(),
+        'end_date': (start_date + timedelta(days=2)).isoformat(),
+        'number_of_passengers': rng.randint(1, vehicle.max_capacity),
+    }, token
+
+
+def admin_list(fixtures, rng):
+    return 'GET', f'/api/journeys/?page={rng.randint(1, fixtures.admin_pages)}', None, fixtures.admin_token
+
+
+OPERATIONS = {
+    'login': (login, 200),
+    'register': (register, 201),
+    'create_journey': (create_journey, 201),
+    'admin_list': (admin_list, 200),
+}
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class ClientTransport:
+    def __init__(self):
+        # Server errors are reported as failed samples, not raised.
+        self.client = Client(raise_request_exception=False)
+
+    def send(self, method, path, data, token):
+        headers = {'HTTP_AUTHORIZATION': f'Token {token}'} if token else {}
+        queries = QueryCounter()
+        with ExitStack() as stack:
+            # Replica reads are counted along with the primary's queries.
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            start = time.perf_counter()
+            if method == 'GET':
+                response = self.client.get(path, **headers)
+            else:
+                response = self.client.post(path, data, content_type='application/json', **headers)
+            elapsed = time.perf_counter() - start
+        return response.status_code, elapsed, queries.count
+
+    def close(self):
+        connections.close_all()
+
+
+class HttpTransport:
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def send(self, method, path, data, token):
+        headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Token {token}'
+        body = json.dumps(data).encode() if data is not None else None
+        request = urllib.request.Request(self.base_url + path, data=body, headers=headers, method=method)
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                status_code = response.status
+        except urllib.error.HTTPError as exc:
+            exc.read()
+            status_code = exc.code
+        return status_code, time.perf_counter() - start, None
+
+    def close(self):
+        pass
+
+
+def schedule(mix, requests, seed):
+    rng = random.Random(seed)
+    names = list(mix)
+    return rng.choices(names, [mix[name] for name in names], k=requests)
+
+
+def run(mix, requests, concurrency=1, warmup=0, seed=0, base_url=None):
+    """Replay ``requests`` operations drawn from ``mix`` after ``warmup``
+    unrecorded ones, and return ``(samples, elapsed)``; each sample is
+    ``(operation, ok, seconds, queries, throttled, admission wait)``."""
+    fixtures = Fixtures()
+
+    def work(phase, worker, plan):
+        transport = HttpTransport(base_url) if base_url else ClientTransport()
+        rng = random.Random(f'{seed}:{phase}:{worker}')
+        samples = []
+        try:
+            for name in plan:
+                build, expected = OPERATIONS[name]
+                waited = fixtures.pace(name)
+                status_code, elapsed, queries = transport.send(*build(fixtures, rng))
+                throttled = status_code == status.HTTP_429_TOO_MANY_REQUESTS
+                samples.append((name, status_code == expected, elapsed, queries, throttled, waited))
+        finally:
+            transport.close()
+        return samples
+
+    def replay(phase, plan):
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [
+                pool.submit(work, phase, worker, plan[worker::concurrency]) for worker in range(concurrency)
+            ]
+            return [sample for future in futures for sample in future.result()]
+
+    if warmup:
+        replay('warmup', schedule(mix, warmup, f'{seed}:warmup'))
+    plan = schedule(mix, requests, seed)
+    start = time.perf_counter()
+    samples = replay('run', plan)
+    return samples, time.perf_counter() - start
@@ -0,0 +1,66 @@
+from django.contrib import admin, messages
+from django.http import HttpResponseRedirect
+from .models import ArchivedJourney, Journey, JourneyHistoryStat, Origin, SlotCapacity, SlotFull
+
+@admin.register(Journey)
+class JourneyAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'vehicle', 'start_location', 'end_location', 'start_date', 'number_of_passengers', 'is_approved')
+    list_filter = ('is_approved', 'end_location', 'vehicle__vehicle_type')
+    list_select_related = ('user', 'vehicle')
+    raw_id_fields = ('user', 'vehicle', 'origin')
+    date_hierarchy = 'start_date'
+    actions = ('approve_journeys', 'reject_journeys')
+
+    def changeform_view(self, request, *args, **kwargs):
+        try:
+            return super().changeform_view(request, *args, **kwargs)
+        except SlotFull as exc:
+            # The form check saw room, but the slot filled before the save.
+            self.message_user(request, str(exc), messages.ERROR)
+            return HttpResponseRedirect(request.get_full_path())
+
+    @admin.action(description='Approve selected journeys')
+    def approve_journeys(self, request, queryset):
+        updated = queryset.set_approval(True)
+        self.message_user(request, f'{updated} journeys approved.')
+
+    @admin.action(description='Reject selected journeys')
+    def reject_journeys(self, request, queryset):
+        updated = queryset.set_approval(False)
+        self.message_user(request, f'{updated} journeys rejected.')
+
+@admin.register(SlotCapacity)
+class SlotCapacityAdmin(admin.ModelAdmin):
+    list_display = ('end_location', 'slot_start', 'reserved', 'limit')
+    list_filter = ('end_location',)
+    list_editable = ('limit',)
+    readonly_fields = ('reserved',)
+    date_hierarchy = 'slot_start'
+    ordering = ('slot_start', 'end_location')
+
+@admin.register(ArchivedJourney)
+class ArchivedJourneyAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'start_location', 'end_location', 'start_date', 'end_date', 'number_of_passengers', 'archived_at')
+    list_filter = ('end_location', 'is_approved')
+    raw_id_fields = ('user', 'vehicle')
+    date_hierarchy = 'start_date'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(JourneyHistoryStat)
+class JourneyHistoryStatAdmin(admin.ModelAdmin):
+    list_display = ('day', 'start_location', 'end_location', 'journey_count', 'passenger_count', 'approved_count')
+    list_filter = ('end_location',)
+    date_hierarchy = 'day'
+    ordering = ('-day', 'end_location')
+
+@admin.register(Origin)
+class OriginAdmin(admin.ModelAdmin):
+    list_display = ('name', 'key', 'created_at')
+    search_fields = ('name', 'key')
+    readonly_fields = ('key',)
+    ordering = ('name',)
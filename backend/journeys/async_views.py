@@ -0,0 +1,45 @@
+from rest_framework import exceptions
+from yatra_backend import cache, sync
+from yatra_backend.async_api import async_read_view, paginate, render
+from .models import Journey
+from .serializers import JourneySerializer, journey_filters, journey_rows
+from .views import JourneyViewSet
+
+
+async def read_journey_list(request, user):
+    params = request.GET
+    if params.get('paginate') == 'cursor' or 'cursor' in params or 'history' in params:
+        return None
+    conditions = await sync.alist_conditions(cache.JOURNEYS, user, request)
+    response = sync.not_modified(request, *conditions)
+    if response is not None:
+        return response
+    queryset = Journey.objects.visible_to(user).apply_params(journey_filters(params), user)
+    queryset = queryset.order_by('-start_date', '-id').values(*journey_rows.columns)
+    if user.is_admin:
+        return sync.add_validators(render(await paginate(request, queryset, journey_rows.serialize)), *conditions)
+    return sync.add_validators(render(await cache.acached_data(
+        cache.JOURNEYS, user, request, lambda: paginate(request, queryset, journey_rows.serialize),
+    )), *conditions)
+
+
+async def read_journey_detail(request, user, pk):
+    try:
+        journey = await Journey.objects.visible_to(user).aget(pk=pk)
+    except Journey.DoesNotExist:
+        raise exceptions.NotFound('No Journey matches the given query.')
+    conditions = sync.detail_conditions(journey, request)
+    response = sync.not_modified(request, *conditions)
+    if response is not None:
+        return response
+    return sync.add_validators(render(JourneySerializer(journey).data), *conditions)
+
+
+journey_list = async_read_view(
+    read_journey_list, JourneyViewSet.as_view({'get': 'list', 'post': 'create'}),
+)
+journey_detail = async_read_view(
+    read_journey_detail,
+    JourneyViewSet.as_view({'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}),
+    replica=True,
+)
@@ -0,0 +1,9 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+
+@register()
+def check_slot_minutes(app_configs, **kwargs):
+    if settings.JOURNEY_SLOT_MINUTES <= 0:
+        return [Error('JOURNEY_SLOT_MINUTES must be a positive number of minutes.', id='journeys.E001')]
+    return []
@@ -0,0 +1,210 @@
+"""Live route traffic pushed to admin dashboards over Server-Sent Events.
+
+Journey writes call ``route_events.routes_changed`` with the routes they
+touched. After the transaction commits, the broker reads those routes'
+counters once and fans the same event out to every connected client, so
+clients no longer poll and re-aggregate. Each client has a bounded queue;
+one that falls behind gets a ``reset`` event and is disconnected, and
+should reconnect to receive a fresh snapshot.
+"""
+import asyncio
+import json
+import queue
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+
+
+class _Overflow(Exception):
+    pass
+
+
+class AsyncSubscriber:
+    def __init__(self, maxsize):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def deliver(self, event):
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        if self.overflowed:
+            raise _Overflow
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class SyncSubscriber:
+    def __init__(self, maxsize):
+        self.queue = queue.Queue(maxsize)
+        self.overflowed = False
+
+    def deliver(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout):
+        if self.overflowed:
+            raise _Overflow
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class RouteEventBroker:
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    @property
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def subscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.deliver(event)
+
+    def routes_changed(self, kind, routes, **extra):
+        """Queue an event for ``routes`` (start, end pairs) once the current
+        transaction commits. Does nothing while no client is connected."""
+        if not self.has_subscribers:
+            return
+        routes = list(set(routes))
+        transaction.on_commit(lambda: self._publish_routes(kind, routes, extra))
+
+    def _publish_routes(self, kind, routes, extra):
+        from .models import RouteStat
+        from .serializers import RouteStatSerializer
+
+        if not self.has_subscribers:
+            return
+        condition = Q()
+        for start_location, end_location in routes:
+            condition |= Q(start_location=start_location, end_location=end_location)
+        rows = RouteStat.objects.filter(condition).with_traffic_status() if routes else []
+        self.publish({'type': kind, 'routes': RouteStatSerializer(rows, many=True).data, **extra})
+
+
+route_events = RouteEventBroker()
+
+
+def authenticate_admin(request):
+    """Resolve the admin behind an event-stream request.
+
+    Browsers' EventSource cannot set headers, so besides the usual DRF
+    authentication a signed token may be passed as ``?token=``. Returns
+    ``(user, error_response)``.
+    """
+    from rest_framework import exceptions
+    from users.authentication import SignedTokenAuthentication
+    from yatra_backend.async_api import auth_failure, authenticate
+
+    token = request.GET.get('token')
+    if token:
+        try:
+            user, _ = SignedTokenAuthentication().authenticate_token(token)
+        except exceptions.AuthenticationFailed as exc:
+            return None, auth_failure(request, exc)
+    else:
+        user, error = authenticate(request)
+        if error is not None:
+            return None, auth_failure(request, error)
+        if not user or not user.is_authenticated:
+            return None, auth_failure(request)
+    if not user.is_admin:
+        return None, auth_failure(request, exceptions.PermissionDenied())
+    return user, None
+
+
+def event_stream_response(body):
+    response = StreamingHttpResponse(body, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def snapshot():
+    from .models import RouteStat
+    from .serializers import RouteStatSerializer
+
+    rows = RouteStat.objects.filter(booking_count__gt=0).with_traffic_status()
+    return {'type': 'snapshot', 'routes': RouteStatSerializer(rows, many=True).data}
+
+
+def encode(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+def stream():
+    """Sync SSE body, for WSGI servers. Each open stream holds a worker
+    thread, so production deployments should use the ASGI variant."""
+    # Subscribed on the first read, so a client gone before it leaves
+    # nothing behind; before the snapshot, so no change falls in between.
+    subscriber = route_events.subscribe(SyncSubscriber(settings.ROUTE_EVENTS_QUEUE_SIZE))
+    try:
+        yield encode(snapshot())
+        while True:
+            try:
+                event = subscriber.get(settings.ROUTE_EVENTS_HEARTBEAT)
+            except _Overflow:
+                yield encode({'type': 'reset'})
+                return
+            yield encode(event) if event is not None else ': keepalive\n\n'
+    finally:
+        route_events.unsubscribe(subscriber)
+
+
+async def astream():
+    subscriber = route_events.subscribe(AsyncSubscriber(settings.ROUTE_EVENTS_QUEUE_SIZE))
+    try:
+        yield encode(await sync_to_async(snapshot)())
+        while True:
+            try:
+                event = await subscriber.get(settings.ROUTE_EVENTS_HEARTBEAT)
+            except _Overflow:
+                yield encode({'type': 'reset'})
+                return
+            yield encode(event) if event is not None else ': keepalive\n\n'
+    finally:
+        route_events.unsubscribe(subscriber)
+
+
+def route_events_view(request):
+    user, error = authenticate_admin(request)
+    if error is not None:
+        return error
+    return event_stream_response(stream())
+
+
+async def aroute_events_view(request):
+    user, error = await sync_to_async(authenticate_admin)(request)
+    if error is not None:
+        return error
+    return event_stream_response(astream())
@@ -0,0 +1,201 @@
+"""Streaming CSV / NDJSON export of journeys for control rooms.
+
+Rows are read in keyset-paginated chunks ordered by (start_date, id), which
+the (start_date, id) index, or the destination/start_date one for a single
+destination, serves directly, and encoded as they are read, so memory stays flat however many journeys match. MySQL drivers
+buffer a whole result set even under ``iterator()``, so each chunk is its
+own bounded query. Output can be gzipped on the fly.
+"""
+import csv
+import json
+import zlib
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.fields import BooleanField
+from yatra_backend.async_api import render
+from .events import authenticate_admin
+from .models import Journey
+
+FORMATS = ('csv', 'ndjson')
+
+# Output column, then the Journey lookup it is read from.
+COLUMNS = (
+    ('id', 'id'),
+    ('start_location', 'start_location'),
+    ('end_location', 'end_location'),
+    ('start_date', 'start_date'),
+    ('end_date', 'end_date'),
+    ('number_of_passengers', 'number_of_passengers'),
+    ('is_approved', 'is_approved'),
+    ('user_id', 'user_id'),
+    ('user_name', None),
+    ('user_email', 'user__email'),
+    ('user_phone', 'user__phone_number'),
+    ('license_number', 'user__license_number'),
+    ('vehicle_id', 'vehicle_id'),
+    ('vehicle_type', 'vehicle__vehicle_type'),
+    ('plate_number', 'vehicle__plate_number'),
+    ('vehicle_model', 'vehicle__model_name'),
+)
+HEADER = [name for name, _ in COLUMNS]
+LOOKUPS = [lookup for _, lookup in COLUMNS if lookup] + ['user__first_name', 'user__last_name']
+
+# Encoded rows are grouped into blocks of about this many bytes per write.
+BLOCK_SIZE = 64 * 1024
+
+# Spreadsheets run text starting with these as a formula (CSV injection).
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def parse_filters(params):
+    """Validate export filters from a query string or command options.
+
+    Approved journeys only unless ``is_approved`` says otherwise.
+    """
+    filters = {'is_approved': params.get('is_approved') or 'true'}
+    end_location = params.get('end_location')
+    if end_location:
+        if end_location not in dict(Journey.LOCATIONS):
+            raise ValueError(f'Unknown end_location {end_location!r}.')
+        filters['end_location'] = end_location
+    for name in ('start_after', 'start_before'):
+        value = params.get(name)
+        if value:
+            parsed = parse_datetime(value)
+            if parsed is None:
+                raise ValueError(f'{name} must be an ISO 8601 datetime.')
+            if timezone.is_naive(parsed):
+                parsed = timezone.make_aware(parsed)
+            filters[name] = parsed
+    approved = str(filters.pop('is_approved')).lower()
+    if approved in BooleanField.TRUE_VALUES:
+        filters['is_approved'] = True
+    elif approved in BooleanField.FALSE_VALUES:
+        filters['is_approved'] = False
+    elif approved != 'all':
+        raise ValueError('is_approved must be true, false or all.')
+    return filters
+
+
+def rows(filters, chunk_size=None):
+    """Yield one dict per matching journey, in (start_date, id) order."""
+    chunk_size = chunk_size or settings.JOURNEY_EXPORT_CHUNK_SIZE
+    queryset = Journey.objects.apply_params(filters, user=None).order_by('start_date', 'id')
+    position = None
+    while True:
+        chunk = queryset
+        if position is not None:
+            start_date, pk = position
+            chunk = chunk.filter(Q(start_date__gt=start_date) | Q(start_date=start_date, id__gt=pk))
+        values = list(chunk.values(*LOOKUPS)[:chunk_size])
+        for value in values:
+            user_name = f"{value['user__first_name']} {value['user__last_name']}".strip()
+            yield {name: value[lookup] if lookup else user_name for name, lookup in COLUMNS}
+        if len(values) < chunk_size:
+            return
+        position = (values[-1]['start_date'], values[-1]['id'])
+
+
+def _text(value):
+    if isinstance(value, datetime):
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+    return value
+
+
+class _Line:
+    def write(self, value):
+        return value
+
+
+def _cell(value):
+    value = _text(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def encode_csv(records):
+    writer = csv.writer(_Line())
+    yield writer.writerow(HEADER)
+    for record in records:
+        yield writer.writerow([_cell(record[name]) for name in HEADER])
+
+
+def encode_ndjson(records):
+    for record in records:
+        yield json.dumps(record, default=_text, separators=(',', ':')) + '\n'
+
+
+def blocks(lines, size=BLOCK_SIZE):
+    block = []
+    length = 0
+    for line in lines:
+        data = line.encode()
+        block.append(data)
+        length += len(data)
+        if length >= size:
+            yield b''.join(block)
+            block, length = [], 0
+    if block:
+        yield b''.join(block)
+
+
+def gzipped(chunks):
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream(filters, fmt, compress=False, chunk_size=None):
+    encode = encode_csv if fmt == 'csv' else encode_ndjson
+    output = blocks(encode(rows(filters, chunk_size)))
+    return gzipped(output) if compress else output
+
+
+async def astream(iterator):
+    # Under ASGI a sync iterator would be drained into memory before sending,
+    # so blocks are pulled one at a time from the sync thread instead.
+    pull = sync_to_async(next)
+    done = object()
+    while (block := await pull(iterator, done)) is not done:
+        yield block
+
+
+def export_view(request):
+    user, error = authenticate_admin(request)
+    if error is not None:
+        return error
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in FORMATS:
+        return render({'detail': f"format must be one of {', '.join(FORMATS)}."}, status.HTTP_400_BAD_REQUEST)
+    try:
+        filters = parse_filters(request.GET)
+    except ValueError as exc:
+        return render({'detail': str(exc)}, status.HTTP_400_BAD_REQUEST)
+    compress = request.GET.get('gzip', '').lower() in ('1', 'true', 'yes')
+
+    filename = f"journeys-{filters.get('end_location', 'all')}-{timezone.now():%Y%m%d%H%M}.{fmt}"
+    content_type = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    if compress:
+        filename += '.gz'
+        content_type = 'application/gzip'
+    body = stream(filters, fmt, compress)
+    if settings.ASYNC_READ_VIEWS:
+        body = astream(body)
+    response = StreamingHttpResponse(body, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
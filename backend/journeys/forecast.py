@@ -0,0 +1,260 @@
+"""Hourly crowd-load forecast per destination.
+
+Each destination keeps a difference array over a fixed window of hours: a
+journey adds its load at the hour it starts and removes it at the hour it
+ends, so the occupancy curve is a cumulative sum. To build the arrays the
+database sums journeys by destination and start hour, and again by end
+hour, so Python sees at most one row per destination and hour, and numpy
+scatters those into the arrays. Later bookings are applied as O(1) updates instead of
+rescanning the table.
+
+A rebuild runs outside the lock bookings take, so they are not held up.
+It reads one consistent snapshot; bookings committed while it runs are
+replayed onto the new arrays unless that snapshot already holds them.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+from django.db import connections, models, router, transaction
+from django.db.models import Count, F, Sum
+
+HOUR = 3600
+
+
+def _to_hour(value):
+    return int(value.timestamp()) // HOUR
+
+
+def _to_hour_ceil(value):
+    return -(-int(value.timestamp()) // HOUR)
+
+
+# Seconds since the Unix epoch of a UTC datetime column. MySQL's
+# TIMESTAMPDIFF ignores the session time zone, unlike UNIX_TIMESTAMP.
+EPOCH_SECONDS = {
+    'mysql': "TIMESTAMPDIFF(SECOND, '1970-01-01 00:00:00', {})",
+    'postgresql': 'FLOOR(EXTRACT(EPOCH FROM {}))',
+    'sqlite': "CAST(strftime('%%s', {}) AS INTEGER)",
+}
+
+
+class EpochHour(models.Func):
+    """Hours since the Unix epoch, rounded down (or up with ``ceil``) like
+    ``_to_hour`` / ``_to_hour_ceil``."""
+    output_field = models.BigIntegerField()
+
+    def __init__(self, expression, ceil=False):
+        self.ceil = ceil
+        super().__init__(expression)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.get_source_expressions()[0])
+        seconds = EPOCH_SECONDS[connection.vendor].format(sql)
+        if self.ceil:
+            seconds = f'{seconds} + {HOUR - 1}'
+        # SQLite already divides integers like //; the window is after 1970.
+        template = '(({}) / {})' if connection.vendor == 'sqlite' else 'FLOOR(({}) / {})'
+        return template.format(seconds, HOUR), params
+
+
+@contextmanager
+def _snapshot(using):
+    """Run the queries inside against one read view of the database."""
+    connection = connections[using]
+    outermost = not connection.in_atomic_block
+    with transaction.atomic(using=using):
+        # MySQL reads REPEATABLE READ by default, PostgreSQL does not. Only
+        # the first statement of a transaction may set it.
+        if outermost and connection.vendor in ('mysql', 'postgresql'):
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+        yield
+
+
+class OccupancyForecast:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Held by the one thread rebuilding; bookings only take _lock.
+        self._build_lock = threading.Lock()
+        self._built_at = None
+        self._pending = None
+        self._origin = None
+        self._hours = None
+        self._locations = None
+        self._vehicles = None
+        self._passengers = None
+
+    @staticmethod
+    def _compute(using):
+        from .models import Journey
+
+        locations = [code for code, _ in Journey.LOCATIONS]
+        index = {code: i for i, code in enumerate(locations)}
+        hours = settings.FORECAST_HORIZON_HOURS
+        origin = _to_hour(datetime.now(dt_timezone.utc)) - settings.FORECAST_HISTORY_HOURS
+        window_start = datetime.fromtimestamp(origin * HOUR, dt_timezone.utc)
+        window_end = window_start + timedelta(hours=hours)
+        journeys = (
+            Journey.objects.using(using).filter(end_date__gt=window_start, start_date__lt=window_end)
+            .filter(end_date__gt=F('start_date'))
+        )
+
+        # Sweep line: +load at the first hour, -load one past the last hour,
+        # summed per (destination, hour) by the database and scattered into
+        # one flat array per measure. Hours outside the window are clamped
+        # to its edges, where they still cancel out.
+        width = hours + 1
+        size = len(locations) * width
+
+        def totals(hour):
+            rows = [
+                (index[code], at, vehicles, passengers)
+                for code, at, vehicles, passengers in journeys.annotate(hour=hour)
+                .values('end_location', 'hour').order_by()
+                .annotate(vehicles=Count('id'), passengers=Sum('number_of_passengers'))
+                .values_list('end_location', 'hour', 'vehicles', 'passengers')
+                if code in index
+            ]
+            rows = np.array(rows, dtype=np.int64).reshape(-1, 4)
+            at = rows[:, 0] * width + np.clip(rows[:, 1] - origin, 0, hours)
+            return (np.bincount(at, weights=rows[:, 2], minlength=size),
+                    np.bincount(at, weights=rows[:, 3], minlength=size))
+
+        add_vehicles, add_passengers = totals(EpochHour('start_date'))
+        remove_vehicles, remove_passengers = totals(EpochHour('end_date', ceil=True))
+        shape = (len(locations), width)
+        return (
+            index, origin, hours,
+            (add_vehicles - remove_vehicles).reshape(shape).astype(np.int64),
+            (add_passengers - remove_passengers).reshape(shape).astype(np.int64),
+        )
+
+    def _stale(self):
+        return (
+            self._built_at is None
+            or time.monotonic() - self._built_at > settings.FORECAST_REBUILD_SECONDS
+        )
+
+    def _rebuild(self, force=False):
+        from .models import Journey
+
+        with self._build_lock:
+            if not force and not self._stale():
+                # Another thread rebuilt while this one waited.
+                return
+            # The primary, where bookings commit: a lagging replica would
+            # miss rows whose changes were already applied here.
+            using = router.db_for_write(Journey)
+            with self._lock:
+                self._pending = []
+            try:
+                with _snapshot(using):
+                    built = self._compute(using)
+                    replay = []
+                    while True:
+                        with self._lock:
+                            changes, self._pending = self._pending, []
+                            if not changes:
+                                self._locations, self._origin, self._hours, self._vehicles, self._passengers = built
+                                self._built_at = time.monotonic()
+                                self._pending = None
+                                for change in replay:
+                                    self._add(*change[2:])
+                                return
+                        replay += self._not_in_snapshot(changes, using)
+            except BaseException:
+                with self._lock:
+                    self._pending = None
+                raise
+
+    @staticmethod
+    def _not_in_snapshot(changes, using):
+        """The queued changes the snapshot being read does not hold yet.
+
+        A row newer than or as new as the change's version already has it,
+        and a deleted row (one with a tombstone) has every change made to it.
+        """
+        from yatra_backend.models import Tombstone
+        from .models import Journey
+
+        ids = {change[0] for change in changes}
+        versions = dict(Journey.objects.using(using).filter(pk__in=ids).values_list('pk', 'updated_at'))
+        deleted = set(
+            Tombstone.objects.using(using)
+            .filter(kind=Tombstone.JOURNEY, object_id__in=ids - versions.keys())
+            .values_list('object_id', flat=True)
+        )
+        missing = []
+        for change in changes:
+            journey_id, version = change[:2]
+            if journey_id in deleted:
+                continue
+            if journey_id in versions and version is not None and versions[journey_id] >= version:
+                continue
+            missing.append(change)
+        return missing
+
+    def _add(self, end_location, start_date, end_date, vehicles, passengers):
+        # Caller holds _lock.
+        if self._built_at is None or end_location not in self._locations:
+            return
+        row = self._locations[end_location]
+        first = min(max(_to_hour(start_date) - self._origin, 0), self._hours)
+        last = min(max(_to_hour_ceil(end_date) - self._origin, 0), self._hours)
+        if last <= first:
+            return
+        self._vehicles[row, first] += vehicles
+        self._vehicles[row, last] -= vehicles
+        self._passengers[row, first] += passengers
+        self._passengers[row, last] -= passengers
+
+    def _apply(self, change):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(change)
+            self._add(*change[2:])
+
+    def record(self, journey_id, version, state, sign=1):
+        """Add (sign=1) or remove (sign=-1) a journey's load once the
+        surrounding transaction commits. ``state`` maps the tracked fields;
+        ``version`` is the journey's ``updated_at`` after the write, or None
+        when the write removed it."""
+        change = (
+            journey_id, version, state['end_location'], state['start_date'], state['end_date'],
+            sign, sign * state['number_of_passengers'],
+        )
+        transaction.on_commit(lambda: self._apply(change))
+
+    def load(self):
+        self._rebuild(force=True)
+
+    def reset(self):
+        with self._lock:
+            self._built_at = None
+
+    def curve(self, end_location, start, hours):
+        if self._stale():
+            self._rebuild()
+        with self._lock:
+            row = self._locations[end_location]
+            vehicles = np.cumsum(self._vehicles[row])
+            passengers = np.cumsum(self._passengers[row])
+            offset = _to_hour(start) - self._origin
+            first = min(max(offset, 0), self._hours)
+            last = min(max(offset + hours, 0), self._hours)
+            origin = self._origin
+        return [
+            {
+                'hour': datetime.fromtimestamp((origin + h) * HOUR, dt_timezone.utc),
+                'vehicles': int(vehicles[h]),
+                'passengers': int(passengers[h]),
+            }
+            for h in range(first, last)
+        ]
+
+
+occupancy = OccupancyForecast()
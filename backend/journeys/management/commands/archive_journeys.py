@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from journeys.models import Journey
+
+
+class Command(BaseCommand):
+    help = 'Move journeys that have ended into the archive table and update the history stats'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=1,
+                            help='Archive journeys that ended at least this many days ago')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['older_than_days'])
+        archived = 0
+        for count in Journey.objects.archive_completed(before, batch_size=options['batch_size']):
+            archived += count
+            self.stdout.write(f'{archived} journeys archived')
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} journeys that ended before {before:%Y-%m-%d %H:%M}'))
@@ -0,0 +1,58 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from journeys.models import Journey, Origin, RouteStat
+from yatra_backend import cache
+
+
+class Command(BaseCommand):
+    help = 'Map free-text journey start locations to canonical origins'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--rename', action='store_true',
+                            help='Also replace start_location with the origin name and rebuild route stats')
+
+    def handle(self, *args, **options):
+        batch_size, rename = options['batch_size'], options['rename']
+        resolved = {}
+        mapped = renamed = 0
+        last = 0
+        while True:
+            # Keyset over pk, so rows whose text has no origin are not read again.
+            rows = list(
+                Journey.objects.filter(origin__isnull=True, pk__gt=last).order_by('pk')
+                .values_list('pk', 'start_location', 'user_id')[:batch_size]
+            )
+            if not rows:
+                break
+            last = rows[-1][0]
+            groups = defaultdict(list)
+            user_ids = set()
+            for pk, text, user_id in rows:
+                if text not in resolved:
+                    resolved[text] = Origin.objects.resolve(text)
+                if resolved[text] is None:
+                    continue
+                origin_id, name = resolved[text]
+                target = name if rename and name != text else None
+                groups[(origin_id, target)].append(pk)
+                user_ids.add(user_id)
+            with transaction.atomic():
+                for (origin_id, target), pks in groups.items():
+                    # Stamped so delta-sync clients pick the new origin up.
+                    changes = {'origin_id': origin_id, 'updated_at': timezone.now()}
+                    if target is not None:
+                        changes['start_location'] = target
+                        renamed += len(pks)
+                    Journey.objects.filter(pk__in=pks).update(**changes)
+                    mapped += len(pks)
+            cache.bump_many(cache.JOURNEYS, user_ids)
+            self.stdout.write(f'{mapped} journeys mapped')
+        if renamed:
+            RouteStat.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Mapped {mapped} journeys to {Origin.objects.count()} origins, renamed {renamed}'
+        ))
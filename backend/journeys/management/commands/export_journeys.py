@@ -0,0 +1,38 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from journeys.export import FORMATS, parse_filters, stream
+
+
+class Command(BaseCommand):
+    help = 'Stream approved journeys with user and vehicle details as CSV or NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument('--end-location')
+        parser.add_argument('--start-after', help='ISO 8601 datetime')
+        parser.add_argument('--start-before', help='ISO 8601 datetime')
+        parser.add_argument('--include-unapproved', action='store_true')
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument('--chunk-size', type=int)
+        parser.add_argument('--output', help='File to write (default: stdout)')
+
+    def handle(self, *args, **options):
+        try:
+            filters = parse_filters({
+                'end_location': options['end_location'],
+                'start_after': options['start_after'],
+                'start_before': options['start_before'],
+                'is_approved': 'all' if options['include_unapproved'] else None,
+            })
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        output = open(options['output'], 'wb') if options['output'] else sys.stdout.buffer
+        try:
+            for block in stream(filters, options['format'], options['gzip'], options['chunk_size']):
+                output.write(block)
+        finally:
+            if options['output']:
+                output.close()
+            else:
+                output.flush()
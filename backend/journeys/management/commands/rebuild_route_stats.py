@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from journeys.models import RouteStat
+
+
+class Command(BaseCommand):
+    help = 'Recompute the route occupancy counters from the journeys table'
+
+    def handle(self, *args, **options):
+        RouteStat.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {RouteStat.objects.count()} route counters'))
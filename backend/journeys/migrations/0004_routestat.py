@@ -0,0 +1,40 @@
+# Generated by Django 5.0.2 on 2026-10-18 11:33
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_route_stats(apps, schema_editor):
+    Journey = apps.get_model('journeys', 'Journey')
+    RouteStat = apps.get_model('journeys', 'RouteStat')
+    rows = (
+        Journey.objects.order_by()
+        .values('start_location', 'end_location')
+        .annotate(booking_count=Count('id'), passenger_count=Sum('number_of_passengers'))
+    )
+    RouteStat.objects.bulk_create(RouteStat(**row) for row in rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journeys', '0003_alter_journey_start_location'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RouteStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_location', models.CharField(max_length=100)),
+                ('end_location', models.CharField(max_length=2)),
+                ('booking_count', models.IntegerField(default=0)),
+                ('passenger_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('start_location', 'end_location')},
+            },
+        ),
+        migrations.RunPython(populate_route_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.2 on 2026-10-18 11:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journeys', '0004_routestat'),
+        ('vehicles', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='journey',
+            index=models.Index(fields=['user', 'start_date'], name='journey_user_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='journey',
+            index=models.Index(fields=['end_location', 'start_date'], name='journey_dest_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='journey',
+            index=models.Index(fields=['is_approved', 'created_at'], name='journey_approved_created_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.0.2 on 2026-10-18 11:34
+
+from collections import Counter
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def reserve_existing_journeys(apps, schema_editor):
+    from journeys.models import slot_start_for
+
+    Journey = apps.get_model('journeys', 'Journey')
+    SlotCapacity = apps.get_model('journeys', 'SlotCapacity')
+    reserved = Counter(
+        (end_location, slot_start_for(start_date))
+        for end_location, start_date in Journey.objects.values_list('end_location', 'start_date').iterator()
+    )
+    SlotCapacity.objects.bulk_create(
+        SlotCapacity(
+            end_location=end_location,
+            slot_start=slot_start,
+            limit=max(settings.JOURNEY_SLOT_CAPACITY.get(end_location, 0), count),
+            reserved=count,
+        )
+        for (end_location, slot_start), count in reserved.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journeys', '0005_journey_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotCapacity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('end_location', models.CharField(choices=[('KM', 'Kumbh Mela'), ('BD', 'Badrinath'), ('JG', 'Jagannath Yatra'), ('UJ', 'Ujjain'), ('KD', 'Kedarnath Mandir')], max_length=2)),
+                ('slot_start', models.DateTimeField()),
+                ('limit', models.PositiveIntegerField()),
+                ('reserved', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'slot capacities',
+                'unique_together': {('end_location', 'slot_start')},
+            },
+        ),
+        migrations.RunPython(reserve_existing_journeys, migrations.RunPython.noop),
+    ]
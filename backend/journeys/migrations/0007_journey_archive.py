@@ -0,0 +1,52 @@
+# Generated by Django 5.0.2 on 2026-10-18 11:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journeys', '0006_slotcapacity'),
+        ('vehicles', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JourneyHistoryStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_location', models.CharField(max_length=100)),
+                ('end_location', models.CharField(choices=[('KM', 'Kumbh Mela'), ('BD', 'Badrinath'), ('JG', 'Jagannath Yatra'), ('UJ', 'Ujjain'), ('KD', 'Kedarnath Mandir')], max_length=2)),
+                ('day', models.DateField()),
+                ('journey_count', models.IntegerField(default=0)),
+                ('passenger_count', models.IntegerField(default=0)),
+                ('approved_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('start_location', 'end_location', 'day')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedJourney',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('start_location', models.CharField(max_length=100)),
+                ('end_location', models.CharField(choices=[('KM', 'Kumbh Mela'), ('BD', 'Badrinath'), ('JG', 'Jagannath Yatra'), ('UJ', 'Ujjain'), ('KD', 'Kedarnath Mandir')], max_length=2)),
+                ('start_date', models.DateTimeField()),
+                ('end_date', models.DateTimeField()),
+                ('number_of_passengers', models.IntegerField()),
+                ('is_approved', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_journeys', to=settings.AUTH_USER_MODEL)),
+                ('vehicle', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_journeys', to='vehicles.vehicle')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'start_date'], name='archived_user_start_idx'), models.Index(fields=['end_location', 'start_date'], name='archived_dest_start_idx')],
+            },
+        ),
+    ]
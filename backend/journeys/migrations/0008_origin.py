@@ -0,0 +1,40 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Cities on the route graph, so common origins resolve from the start.
+CITIES = [
+    'Ahmedabad', 'Bhopal', 'Bhubaneswar', 'Dehradun', 'Delhi', 'Haridwar', 'Indore', 'Jaipur', 'Kolkata',
+    'Lucknow', 'Mumbai', 'Patna', 'Prayagraj', 'Puri', 'Rishikesh', 'Ujjain', 'Varanasi',
+]
+
+
+def add_cities(apps, schema_editor):
+    Origin = apps.get_model('journeys', 'Origin')
+    Origin.objects.bulk_create(Origin(name=name, key=name.lower()) for name in CITIES)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journeys', '0007_journey_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Origin',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('key', models.CharField(max_length=100, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='journey',
+            name='origin',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='journeys', to='journeys.origin'),
+        ),
+        migrations.RunPython(add_cities, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journeys', '0008_origin'),
+        ('vehicles', '0002_sync_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='journey',
+            index=models.Index(fields=['user', 'updated_at'], name='journey_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='journey',
+            index=models.Index(fields=['updated_at'], name='journey_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journeys', '0009_sync_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedjourney',
+            name='origin',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_journeys', to='journeys.origin'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journeys', '0010_archivedjourney_origin'),
+        ('vehicles', '0002_sync_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='journey',
+            index=models.Index(fields=['start_date', 'id'], name='journey_start_id_idx'),
+        ),
+    ]
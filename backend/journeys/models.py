@@ -1,6 +1,304 @@
-from django.db import models
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models, transaction, IntegrityError
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+from django.db.models.lookups import LessThanOrEqual
+from django.utils import timezone
 from users.models import User
 from vehicles.models import Vehicle
+from yatra_backend import cache
+from yatra_backend.models import Tombstone
+from .events import route_events
+from .forecast import occupancy
+from .origins import display_name, normalize, origin_index
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# Bookings a single route can absorb before it is reported as congested.
+ROUTE_CAPACITY = 500
+
+TRACKED_FIELDS = ('start_location', 'end_location', 'number_of_passengers', 'start_date', 'end_date', 'is_approved')
+ROUTE_FIELDS = ('start_location', 'end_location', 'number_of_passengers')
+FORECAST_FIELDS = ('end_location', 'number_of_passengers', 'start_date', 'end_date')
+ARCHIVE_FIELDS = (
+    'id', 'user_id', 'vehicle_id', 'start_location', 'origin_id', 'end_location', 'start_date', 'end_date',
+    'number_of_passengers', 'is_approved', 'created_at', 'updated_at',
+)
+
+
+class SlotFull(Exception):
+    def __init__(self, slot):
+        self.slot = slot
+        super().__init__(
+            f"No capacity left for {slot.get_end_location_display()} in the "
+            f"{slot.slot_start:%Y-%m-%d %H:%M} slot"
+        )
+
+
+def capacity_error(vehicle):
+    return f"Number of passengers cannot exceed vehicle capacity of {vehicle.max_capacity}"
+
+
+def slot_start_for(start_date):
+    # Slots are counted from the Unix epoch, so any length (90 minutes, a
+    # day) buckets the same instant alike whatever time zone it is given in.
+    return start_date - (start_date - EPOCH) % timedelta(minutes=settings.JOURNEY_SLOT_MINUTES)
+
+
+class RouteStatQuerySet(models.QuerySet):
+    def with_traffic_status(self, capacity=ROUTE_CAPACITY):
+        occupancy = F('booking_count') * 1.0 / Value(capacity, output_field=FloatField())
+        return self.annotate(
+            total_capacity=Value(capacity),
+            traffic_status=Case(
+                When(booking_count__gt=capacity * 0.9, then=Value('high')),
+                When(booking_count__gt=capacity * 0.6, then=Value('moderate')),
+                default=Value('low'),
+                output_field=models.CharField(),
+            ),
+            occupancy=occupancy,
+        )
+
+
+class RouteStatManager(models.Manager.from_queryset(RouteStatQuerySet)):
+    def adjust(self, start_location, end_location, bookings=0, passengers=0):
+        if not bookings and not passengers:
+            return
+        route = self.filter(start_location=start_location, end_location=end_location)
+        changes = {
+            'booking_count': F('booking_count') + bookings,
+            'passenger_count': F('passenger_count') + passengers,
+            'updated_at': timezone.now(),
+        }
+        if route.update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                self.create(
+                    start_location=start_location, end_location=end_location,
+                    booking_count=bookings, passenger_count=passengers,
+                )
+        except IntegrityError:
+            # Another booking created the row first; apply our delta to it.
+            route.update(**changes)
+
+    def rebuild(self):
+        rows = (
+            Journey.objects.order_by()
+            .values('start_location', 'end_location')
+            .annotate(booking_count=Count('id'), passenger_count=Sum('number_of_passengers'))
+        )
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(self.model(**row) for row in rows)
+
+
+class RouteStat(models.Model):
+    start_location = models.CharField(max_length=100)
+    end_location = models.CharField(max_length=2)
+    booking_count = models.IntegerField(default=0)
+    passenger_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = RouteStatManager()
+
+    class Meta:
+        unique_together = ('start_location', 'end_location')
+
+    def __str__(self):
+        return f"{self.start_location} to {self.end_location}: {self.booking_count} bookings"
+
+
+class OriginManager(models.Manager):
+    def resolve(self, text):
+        """``(id, name)`` of the canonical origin for free text, creating
+        one when no origin has the same key; None for text without letters
+        or digits."""
+        key = normalize(text)
+        if not key:
+            return None
+        match = origin_index.match(key)
+        if match is not None:
+            return match
+        origin, _ = self.get_or_create(key=key, defaults={'name': display_name(text)[:100]})
+        # Only once committed: a rolled-back booking takes the new row with it.
+        transaction.on_commit(lambda: origin_index.add(origin.pk, origin.name, origin.key), using=self.db)
+        return origin.pk, origin.name
+
+    def assign(self, journeys):
+        """Point journeys at their canonical origin and use its name as
+        ``start_location``, resolving each distinct text once."""
+        resolved = {}
+        for journey in journeys:
+            text = journey.start_location
+            if text not in resolved:
+                resolved[text] = self.resolve(text)
+            if resolved[text] is not None:
+                journey.origin_id, journey.start_location = resolved[text]
+
+
+class Origin(models.Model):
+    """A canonical place journeys start from."""
+    name = models.CharField(max_length=100)
+    key = models.CharField(max_length=100, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = OriginManager()
+
+    def __str__(self):
+        return self.name
+
+
+class JourneyFilterQuerySet(models.QuerySet):
+    # Shared by live and archived journeys, so history queries accept the
+    # same listing parameters.
+    def visible_to(self, user):
+        if user.is_admin:
+            return self.all()
+        return self.filter(user=user)
+
+    def apply_params(self, params, user):
+        """Filters shared by the journey listings (query string) and bulk
+        actions (request body), as validated by ``journey_filters``."""
+        queryset = self
+        if params.get('is_approved') is not None:
+            queryset = queryset.filter(is_approved=params['is_approved'])
+        if params.get('end_location'):
+            queryset = queryset.filter(end_location=params['end_location'])
+        if params.get('start_after'):
+            queryset = queryset.filter(start_date__gte=params['start_after'])
+        if params.get('start_before'):
+            queryset = queryset.filter(start_date__lt=params['start_before'])
+        if params.get('vehicle_type'):
+            queryset = queryset.filter(vehicle__vehicle_type=params['vehicle_type'])
+        if params.get('user') and user.is_admin:
+            queryset = queryset.filter(user_id=params['user'])
+        return queryset
+
+
+
+class JourneyQuerySet(JourneyFilterQuerySet):
+    def set_approval(self, approved):
+        """Approve or reject every matching journey with one UPDATE."""
+        pending = self.exclude(is_approved=approved)
+        user_ids = list(pending.order_by().values_list('user_id', flat=True).distinct())
+        routes = []
+        if route_events.has_subscribers:
+            routes = list(pending.order_by().values_list('start_location', 'end_location').distinct())
+        with transaction.atomic():
+            updated = pending.update(is_approved=approved, updated_at=timezone.now())
+            if updated:
+                route_events.routes_changed('approved' if approved else 'rejected', routes, count=updated)
+        cache.bump_many(cache.JOURNEYS, user_ids)
+        return updated
+
+
+class JourneyManager(models.Manager.from_queryset(JourneyQuerySet)):
+    def bulk_book(self, journeys, batch_size=500):
+        """Insert unsaved journeys in one transaction with bulk_create.
+
+        Slot reservations and route counters are applied once per slot and
+        route rather than once per journey. Returns ``(created, rejected)``:
+        lists of ``(index, journey)`` and ``(index, SlotFull)`` pairs.
+        """
+        Origin.objects.assign(journeys)
+        by_slot = defaultdict(list)
+        for index, journey in enumerate(journeys):
+            by_slot[(journey.end_location, slot_start_for(journey.start_date))].append((index, journey))
+
+        admitted, rejected = [], []
+        with transaction.atomic():
+            for (end_location, slot_start), group in by_slot.items():
+                slot, count = SlotCapacity.objects.reserve_up_to(end_location, slot_start, len(group))
+                admitted.extend(group[:count])
+                rejected.extend((index, SlotFull(slot)) for index, _ in group[count:])
+            admitted.sort(key=lambda item: item[0])
+            inserted = [journey for _, journey in admitted]
+            self.bulk_create(inserted, batch_size=batch_size)
+            if inserted and inserted[0].pk is None:
+                self._fetch_inserted_pks(inserted)
+
+            routes = defaultdict(lambda: [0, 0])
+            for _, journey in admitted:
+                route = routes[(journey.start_location, journey.end_location)]
+                route[0] += 1
+                route[1] += journey.number_of_passengers
+            for (start_location, end_location), (bookings, passengers) in routes.items():
+                RouteStat.objects.adjust(start_location, end_location, bookings=bookings, passengers=passengers)
+            for _, journey in admitted:
+                occupancy.record(
+                    journey.pk, journey.updated_at, {field: getattr(journey, field) for field in TRACKED_FIELDS},
+                )
+            route_events.routes_changed(
+                'created', routes.keys(), journeys=[journey.pk for _, journey in admitted],
+            )
+
+        for _, journey in admitted:
+            journey._remember_state()
+        # bulk_create sends no post_save, so invalidate cached lists here.
+        cache.bump_many(cache.JOURNEYS, [journey.user_id for _, journey in admitted])
+        rejected.sort(key=lambda item: item[0])
+        return admitted, rejected
+
+    def _fetch_inserted_pks(self, journeys):
+        """Set the ids bulk_create cannot return on MySQL by reading back
+        the rows just inserted, matched on the values written (created_at
+        is stamped per row, to the microsecond)."""
+        fields = ('user_id', 'vehicle_id', 'start_location', 'end_location', 'start_date', 'number_of_passengers',
+                  'created_at')
+        waiting = defaultdict(list)
+        for journey in journeys:
+            waiting[tuple(getattr(journey, field) for field in fields)].append(journey)
+        created = [journey.created_at for journey in journeys]
+        rows = self.filter(
+            user_id__in={journey.user_id for journey in journeys},
+            created_at__gte=min(created), created_at__lte=max(created),
+        ).order_by('pk').values_list('pk', *fields)
+        for pk, *values in rows:
+            matches = waiting.get(tuple(values))
+            if matches:
+                matches.pop(0).pk = pk
+
+    def archive_completed(self, before=None, batch_size=1000):
+        """Move journeys that ended before ``before`` (default: now) into
+        ArchivedJourney, one transaction per batch, and yield the size of
+        each batch.
+
+        Route counters, the forecast and history stats are adjusted once per
+        batch. Slot reservations are left alone because they describe
+        past slots.
+        """
+        before = before or timezone.now()
+        while True:
+            with transaction.atomic():
+                rows = list(
+                    self.filter(end_date__lt=before).order_by('pk')
+                    .select_for_update().values(*ARCHIVE_FIELDS)[:batch_size]
+                )
+                if not rows:
+                    return
+                ArchivedJourney.objects.bulk_create(ArchivedJourney(**row) for row in rows)
+                JourneyHistoryStat.objects.record(rows)
+
+                routes = defaultdict(lambda: [0, 0])
+                for row in rows:
+                    route = routes[(row['start_location'], row['end_location'])]
+                    route[0] += 1
+                    route[1] += row['number_of_passengers']
+                    occupancy.record(row['id'], None, row, sign=-1)
+                for (start_location, end_location), (bookings, passengers) in routes.items():
+                    RouteStat.objects.adjust(start_location, end_location, bookings=-bookings, passengers=-passengers)
+                # Nothing references journeys, and the counters were settled
+                # above, so skip the per-row post_delete handlers.
+                self.filter(pk__in=[row['id'] for row in rows])._raw_delete(self.db)
+                Tombstone.objects.record(Tombstone.JOURNEY, [(row['id'], row['user_id']) for row in rows])
+                route_events.routes_changed('archived', routes.keys(), count=len(rows))
+            cache.bump_many(cache.JOURNEYS, [row['user_id'] for row in rows])
+            yield len(rows)
+
 
 class Journey(models.Model):
     LOCATIONS = [
@@ -14,6 +312,7 @@ class Journey(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='journeys')
     vehicle = models.ForeignKey(Vehicle, on_delete=models.CASCADE, related_name='journeys')
     start_location = models.CharField(max_length=100)
+    origin = models.ForeignKey(Origin, on_delete=models.SET_NULL, null=True, blank=True, related_name='journeys')
     end_location = models.CharField(max_length=2, choices=LOCATIONS)
     start_date = models.DateTimeField()
     end_date = models.DateTimeField()
@@ -22,11 +321,274 @@ class Journey(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = JourneyManager()
+
+    _saved_state = None
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'start_date'], name='journey_user_start_idx'),
+            models.Index(fields=['end_location', 'start_date'], name='journey_dest_start_idx'),
+            models.Index(fields=['is_approved', 'created_at'], name='journey_approved_created_idx'),
+            # Admin listings and exports walk (start_date, id) across users.
+            models.Index(fields=['start_date', 'id'], name='journey_start_id_idx'),
+            # Delta sync (changes?since=) for one user and for admins.
+            models.Index(fields=['user', 'updated_at'], name='journey_user_updated_idx'),
+            models.Index(fields=['updated_at'], name='journey_updated_idx'),
+        ]
+
     def __str__(self):
-        return f"{self.user.email} - {self.get_start_location_display()} to {self.get_end_location_display()}"
+        return f"{self.user.email} - {self.start_location} to {self.get_end_location_display()}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if set(TRACKED_FIELDS).issubset(field_names):
+            instance._remember_state()
+        return instance
+
+    def _remember_state(self):
+        self._saved_state = {field: getattr(self, field) for field in TRACKED_FIELDS}
+
+    def clean(self):
+        super().clean()
+        if self.vehicle_id is None or self.number_of_passengers is None:
+            return
+        if self.number_of_passengers > self.vehicle.max_capacity:
+            raise ValidationError({'number_of_passengers': capacity_error(self.vehicle)})
+        if self.start_date is None or not self._moves_slot(self._previous_state()):
+            return
+        # The reservation on save decides; this only reports a full slot as
+        # a form error beforehand.
+        slot_start = slot_start_for(self.start_date)
+        slot = SlotCapacity.objects.filter(end_location=self.end_location, slot_start=slot_start).first()
+        if slot is None:
+            slot = SlotCapacity(
+                end_location=self.end_location, slot_start=slot_start,
+                limit=settings.JOURNEY_SLOT_CAPACITY.get(self.end_location, 0),
+            )
+        if not slot.available:
+            raise ValidationError({'start_date': str(SlotFull(slot))})
+
+    def _previous_state(self):
+        if self._saved_state is None and not self._state.adding:
+            return Journey.objects.filter(pk=self.pk).values(*TRACKED_FIELDS).first()
+        return self._saved_state
+
+    def _moves_slot(self, previous):
+        return previous is None or not (
+            previous['end_location'] == self.end_location
+            and slot_start_for(previous['start_date']) == slot_start_for(self.start_date)
+        )
 
     def save(self, *args, **kwargs):
-        # Validate number of passengers against vehicle capacity
         if self.number_of_passengers > self.vehicle.max_capacity:
-            raise ValueError(f"Number of passengers cannot exceed vehicle capacity of {self.vehicle.max_capacity}")
-        super().save(*args, **kwargs) 
\ No newline at end of file
+            raise ValidationError({'number_of_passengers': capacity_error(self.vehicle)})
+        previous = self._previous_state()
+        with transaction.atomic():
+            if previous is None or previous['start_location'] != self.start_location or self.origin_id is None:
+                Origin.objects.assign([self])
+            self._reserve_slot(previous)
+            super().save(*args, **kwargs)
+            self._update_route_stats(previous)
+            self._update_forecast(previous)
+            self._publish_route_event(previous)
+        self._remember_state()
+
+    def _publish_route_event(self, previous):
+        routes = {(self.start_location, self.end_location)}
+        if previous is None:
+            kind = 'created'
+        else:
+            routes.add((previous['start_location'], previous['end_location']))
+            if self.is_approved and not previous['is_approved']:
+                kind = 'approved'
+            elif any(previous[field] != getattr(self, field) for field in ROUTE_FIELDS):
+                kind = 'updated'
+            else:
+                return
+        route_events.routes_changed(kind, routes, journeys=[self.pk])
+
+    def _update_forecast(self, previous):
+        current = {field: getattr(self, field) for field in TRACKED_FIELDS}
+        if previous is not None and all(previous[field] == current[field] for field in FORECAST_FIELDS):
+            return
+        if previous is not None:
+            occupancy.record(self.pk, self.updated_at, previous, sign=-1)
+        occupancy.record(self.pk, self.updated_at, current)
+
+    def _reserve_slot(self, previous):
+        if not self._moves_slot(previous):
+            return
+        SlotCapacity.objects.reserve(self.end_location, self.start_date)
+        if previous is not None:
+            SlotCapacity.objects.release(previous['end_location'], previous['start_date'])
+
+    def _update_route_stats(self, previous):
+        if previous is None:
+            RouteStat.objects.adjust(
+                self.start_location, self.end_location,
+                bookings=1, passengers=self.number_of_passengers,
+            )
+            return
+        same_route = (
+            previous['start_location'] == self.start_location
+            and previous['end_location'] == self.end_location
+        )
+        if same_route:
+            RouteStat.objects.adjust(
+                self.start_location, self.end_location,
+                passengers=self.number_of_passengers - previous['number_of_passengers'],
+            )
+        else:
+            RouteStat.objects.adjust(
+                previous['start_location'], previous['end_location'],
+                bookings=-1, passengers=-previous['number_of_passengers'],
+            )
+            RouteStat.objects.adjust(
+                self.start_location, self.end_location,
+                bookings=1, passengers=self.number_of_passengers,
+            )
+
+
+
+class SlotCapacityManager(models.Manager):
+    def slot_for(self, end_location, start_date):
+        slot, _ = self.get_or_create(
+            end_location=end_location,
+            slot_start=slot_start_for(start_date),
+            defaults={'limit': settings.JOURNEY_SLOT_CAPACITY.get(end_location, 0)},
+        )
+        return slot
+
+    def reserve(self, end_location, start_date, vehicles=1):
+        # The guarded UPDATE is the admission decision: the database applies it
+        # atomically, so concurrent bookings can never push reserved past limit.
+        slot = self.slot_for(end_location, start_date)
+        # Written as reserved + vehicles <= limit: limit - vehicles would
+        # underflow the unsigned column on MySQL when limit < vehicles.
+        admitted = self.filter(LessThanOrEqual(F('reserved') + vehicles, F('limit')), pk=slot.pk).update(
+            reserved=F('reserved') + vehicles,
+        )
+        if not admitted:
+            raise SlotFull(slot)
+        return slot
+
+    def reserve_up_to(self, end_location, start_date, vehicles):
+        # Row lock so a partially admitted batch reads a stable remaining count.
+        slot = self.slot_for(end_location, start_date)
+        slot = self.select_for_update().get(pk=slot.pk)
+        admitted = min(vehicles, slot.available)
+        if admitted:
+            self.filter(pk=slot.pk).update(reserved=F('reserved') + admitted)
+            slot.reserved += admitted
+        return slot, admitted
+
+    def release(self, end_location, start_date, vehicles=1):
+        self.filter(
+            end_location=end_location,
+            slot_start=slot_start_for(start_date),
+            reserved__gte=vehicles,
+        ).update(reserved=F('reserved') - vehicles)
+
+
+class SlotCapacity(models.Model):
+    end_location = models.CharField(max_length=2, choices=Journey.LOCATIONS)
+    slot_start = models.DateTimeField()
+    limit = models.PositiveIntegerField()
+    reserved = models.PositiveIntegerField(default=0)
+
+    objects = SlotCapacityManager()
+
+    class Meta:
+        unique_together = ('end_location', 'slot_start')
+        verbose_name_plural = 'slot capacities'
+
+    def __str__(self):
+        return f"{self.get_end_location_display()} @ {self.slot_start:%Y-%m-%d %H:%M}: {self.reserved}/{self.limit}"
+
+    @property
+    def available(self):
+        return max(self.limit - self.reserved, 0)
+
+
+class ArchivedJourney(models.Model):
+    """A completed journey moved out of the live table; keeps its id."""
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_journeys')
+    vehicle = models.ForeignKey(Vehicle, on_delete=models.SET_NULL, null=True, related_name='archived_journeys')
+    start_location = models.CharField(max_length=100)
+    origin = models.ForeignKey(
+        Origin, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_journeys',
+    )
+    end_location = models.CharField(max_length=2, choices=Journey.LOCATIONS)
+    start_date = models.DateTimeField()
+    end_date = models.DateTimeField()
+    number_of_passengers = models.IntegerField()
+    is_approved = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    objects = JourneyFilterQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'start_date'], name='archived_user_start_idx'),
+            models.Index(fields=['end_location', 'start_date'], name='archived_dest_start_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.start_location} to {self.get_end_location_display()} ({self.start_date:%Y-%m-%d})"
+
+
+class JourneyHistoryStatManager(models.Manager):
+    def record(self, rows):
+        """Add archived journey rows to the per-day route totals, with one
+        read, one bulk update and one bulk insert per batch."""
+        totals = defaultdict(lambda: [0, 0, 0])
+        for row in rows:
+            day = timezone.localdate(row['start_date'])
+            total = totals[(row['start_location'], row['end_location'], day)]
+            total[0] += 1
+            total[1] += row['number_of_passengers']
+            total[2] += row['is_approved']
+        days = {day for _, _, day in totals}
+        existing = {
+            (stat.start_location, stat.end_location, stat.day): stat
+            for stat in self.select_for_update().filter(day__in=days)
+        }
+        changed, created = [], []
+        for key, (journeys, passengers, approved) in totals.items():
+            stat = existing.get(key)
+            if stat is None:
+                start_location, end_location, day = key
+                created.append(self.model(
+                    start_location=start_location, end_location=end_location, day=day,
+                    journey_count=journeys, passenger_count=passengers, approved_count=approved,
+                ))
+                continue
+            stat.journey_count += journeys
+            stat.passenger_count += passengers
+            stat.approved_count += approved
+            changed.append(stat)
+        self.bulk_update(changed, ['journey_count', 'passenger_count', 'approved_count'], batch_size=500)
+        self.bulk_create(created, batch_size=500)
+
+
+class JourneyHistoryStat(models.Model):
+    """Daily totals per route for archived journeys, for reporting."""
+    start_location = models.CharField(max_length=100)
+    end_location = models.CharField(max_length=2, choices=Journey.LOCATIONS)
+    day = models.DateField()
+    journey_count = models.IntegerField(default=0)
+    passenger_count = models.IntegerField(default=0)
+    approved_count = models.IntegerField(default=0)
+
+    objects = JourneyHistoryStatManager()
+
+    class Meta:
+        unique_together = ('start_location', 'end_location', 'day')
+
+    def __str__(self):
+        return f"{self.start_location} to {self.end_location} on {self.day}: {self.journey_count} journeys"
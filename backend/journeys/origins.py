@@ -0,0 +1,200 @@
+"""Canonical journey origins and the in-memory autocomplete index.
+
+Free-text ``start_location`` values are folded into a key (case, accents,
+punctuation and spacing ignored) and resolved against the Origin table by
+exact key, or recorded as a new origin. Close spellings are only offered
+as suggestions, since nearby places often differ by one character
+("Sector 12" / "Sector 13"). Every word-start suffix of each origin name is kept in one sorted
+list, so a prefix lookup is two bisections over memory, ranked by how many
+bookings each origin has. Each worker loads the index on first use and
+reloads it after ``ORIGIN_INDEX_REFRESH_SECONDS`` to pick up origins
+created elsewhere, or at once after an origin is deleted anywhere.
+"""
+import bisect
+import difflib
+import re
+import threading
+import time
+import unicodedata
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+
+# Sorts after every character a key can contain.
+_KEY_END = '{'
+# Spelling suggestions remembered between reloads.
+SPELLING_CACHE_SIZE = 10000
+# Shared stamp moved when an origin is deleted.
+VERSION_KEY = 'ver:origins'
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode()
+    return ' '.join(re.findall(r'[a-z0-9]+', text.lower()))
+
+
+def display_name(text):
+    name = ' '.join(text.split()).strip('.,;:!?-')
+    return name.title() if name.islower() or name.isupper() else name
+
+
+class OriginIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Held by the one thread loading; lookups only take _lock.
+        self._load_lock = threading.Lock()
+        self._loaded_at = None
+        self._version = None
+        self._pending = None
+        self._by_key = {}
+        self._names = {}
+        self._popularity = {}
+        self._keys = []
+        self._terms = []
+        self._entries = []
+        self._spellings = {}
+
+    @classmethod
+    def _read(cls):
+        from .models import Origin, RouteStat
+
+        bookings = dict(
+            RouteStat.objects.order_by().values('start_location')
+            .annotate(total=Sum('booking_count')).values_list('start_location', 'total')
+        )
+        by_key, names, popularity = {}, {}, {}
+        for pk, name, key in Origin.objects.values_list('id', 'name', 'key'):
+            by_key[key] = (pk, name)
+            names[pk] = name
+            popularity[pk] = bookings.get(name, 0)
+        entries = sorted(
+            (term, pk) for key, (pk, _) in by_key.items() for term in cls._suffixes(key)
+        )
+        return by_key, names, popularity, entries
+
+    def _load(self, version):
+        # Caller holds _load_lock. The database is read without _lock, so
+        # lookups keep using the loaded index meanwhile; origins added in
+        # the meantime are carried over.
+        with self._lock:
+            self._pending = []
+        try:
+            by_key, names, popularity, entries = self._read()
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            self._by_key = by_key
+            self._names = names
+            self._popularity = popularity
+            self._keys = list(by_key)
+            self._entries = entries
+            self._terms = [term for term, _ in entries]
+            self._spellings = {}
+            self._loaded_at = time.monotonic()
+            self._version = version
+            pending, self._pending = self._pending, None
+            for origin in pending:
+                self._insert(*origin)
+
+    @staticmethod
+    def _suffixes(key):
+        words = key.split(' ')
+        return [' '.join(words[index:]) for index in range(len(words))]
+
+    def _stale(self, version):
+        return (
+            self._loaded_at is None
+            or version != self._version
+            or time.monotonic() - self._loaded_at > settings.ORIGIN_INDEX_REFRESH_SECONDS
+        )
+
+    def _ensure_loaded(self):
+        version = cache.get(VERSION_KEY)
+        if not self._stale(version):
+            return
+        # Wait for the load only with nothing usable: before the first one,
+        # or after an origin was deleted, whose id would fail a booking's
+        # foreign key. Otherwise keep serving while another thread reloads.
+        if not self._load_lock.acquire(blocking=self._loaded_at is None or version != self._version):
+            return
+        try:
+            if self._stale(version):
+                self._load(version)
+        finally:
+            self._load_lock.release()
+
+    def __len__(self):
+        return len(self._by_key)
+
+    def load(self):
+        with self._load_lock:
+            self._load(cache.get(VERSION_KEY))
+
+    def reset(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def invalidate(self):
+        """Make every worker reload before its next lookup."""
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+    def add(self, pk, name, key):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((pk, name, key))
+            if self._loaded_at is not None:
+                self._insert(pk, name, key)
+
+    def _insert(self, pk, name, key):
+        # Caller holds _lock.
+        if key in self._by_key:
+            return
+        self._by_key[key] = (pk, name)
+        self._names[pk] = name
+        self._popularity[pk] = 0
+        self._keys.append(key)
+        for term in self._suffixes(key):
+            position = bisect.bisect_left(self._entries, (term, pk))
+            self._entries.insert(position, (term, pk))
+            self._terms.insert(position, term)
+
+    def match(self, key):
+        """``(id, name)`` of the origin with exactly this key, or None."""
+        self._ensure_loaded()
+        with self._lock:
+            return self._by_key.get(key)
+
+    def similar(self, text, limit=5):
+        """Origins spelled closely to ``text``, closest first."""
+        key = normalize(text)
+        if not key:
+            return []
+        self._ensure_loaded()
+        with self._lock:
+            if key not in self._spellings:
+                if len(self._spellings) >= SPELLING_CACHE_SIZE:
+                    self._spellings.clear()
+                self._spellings[key] = difflib.get_close_matches(
+                    key, self._keys, n=limit, cutoff=settings.ORIGIN_MATCH_CUTOFF,
+                )
+            pks = [self._by_key[close][0] for close in self._spellings[key][:limit]]
+            return [{'id': pk, 'name': self._names[pk]} for pk in pks]
+
+    def complete(self, prefix, limit=10):
+        """Origins with a word starting with ``prefix``, most booked first."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        self._ensure_loaded()
+        with self._lock:
+            first = bisect.bisect_left(self._terms, prefix)
+            last = bisect.bisect_left(self._terms, prefix + _KEY_END, first)
+            found = {pk for _, pk in self._entries[first:last]}
+            ranked = sorted(found, key=lambda pk: (-self._popularity[pk], self._names[pk]))[:limit]
+            return [{'id': pk, 'name': self._names[pk]} for pk in ranked]
+
+
+origin_index = OriginIndex()
@@ -0,0 +1,21 @@
+from rest_framework.pagination import CursorPagination
+
+
+class JourneyCursorPagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering_query_param = 'order_by'
+    # Each ordering is backed by one of the composite indexes on Journey, with
+    # id as the tie-breaker so the cursor position is stable.
+    orderings = {
+        'start_date': ('start_date', 'id'),
+        '-start_date': ('-start_date', '-id'),
+        'created_at': ('created_at', 'id'),
+        '-created_at': ('-created_at', '-id'),
+    }
+    ordering = orderings['start_date']
+
+    def get_ordering(self, request, queryset, view):
+        key = request.query_params.get(self.ordering_query_param)
+        return self.orderings.get(key, self.ordering)
@@ -0,0 +1,303 @@
+"""Congestion-aware corridor and departure-slot suggestions.
+
+Origin cities and the five sites form a small road graph. Every booked
+journey is assumed to drive its free-flow shortest path, so the journeys
+departing in an hour put load on the corridors of those paths. Edge costs
+follow the BPR volume-delay curve: travel time grows with the ratio of that
+load to the corridor's hourly capacity. Routes are ranked with Yen's
+k-shortest paths over those costs, and departure slots by remaining slot
+capacity and corridor delay, so suggestions steer new bookings away from
+busy corridors and hours.
+
+Hourly loads are read from the database with one grouped query per
+missing range and reused for ``ROUTING_REFRESH_SECONDS``; path searches
+are memoised per hour until its load is reloaded.
+"""
+import heapq
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+# (from, to, free-flow hours, vehicles per hour). Corridors are two-way;
+# site nodes use the Journey.LOCATIONS codes.
+CORRIDORS = (
+    ('Delhi', 'Haridwar', 5.0, 900),
+    ('Dehradun', 'Haridwar', 1.5, 500),
+    ('Dehradun', 'Rishikesh', 1.5, 400),
+    ('Haridwar', 'Rishikesh', 1.0, 700),
+    ('Rishikesh', 'KD', 9.0, 250),
+    ('Rishikesh', 'BD', 10.0, 300),
+    ('Delhi', 'Lucknow', 8.0, 900),
+    ('Lucknow', 'Prayagraj', 4.0, 700),
+    ('Varanasi', 'Prayagraj', 3.0, 700),
+    ('Patna', 'Varanasi', 5.0, 500),
+    ('Prayagraj', 'KM', 0.5, 1200),
+    ('Bhopal', 'Prayagraj', 11.0, 400),
+    ('Delhi', 'Jaipur', 5.0, 800),
+    ('Jaipur', 'Ujjain', 9.0, 400),
+    ('Ahmedabad', 'Ujjain', 7.0, 500),
+    ('Mumbai', 'Ahmedabad', 8.0, 800),
+    ('Mumbai', 'Indore', 10.0, 600),
+    ('Indore', 'Ujjain', 1.5, 700),
+    ('Ujjain', 'UJ', 0.25, 900),
+    ('Bhopal', 'Ujjain', 3.5, 500),
+    ('Bhopal', 'Indore', 3.5, 500),
+    ('Patna', 'Kolkata', 9.0, 500),
+    ('Kolkata', 'Bhubaneswar', 7.0, 700),
+    ('Bhubaneswar', 'Puri', 1.5, 600),
+    ('Puri', 'JG', 0.25, 900),
+)
+
+# BPR volume-delay parameters.
+BPR_ALPHA = 0.15
+BPR_BETA = 4
+
+# Congestion bands, matching RouteStat.with_traffic_status.
+HIGH_LOAD = 0.9
+MODERATE_LOAD = 0.6
+
+
+def traffic_status(ratio):
+    if ratio > HIGH_LOAD:
+        return 'high'
+    if ratio > MODERATE_LOAD:
+        return 'moderate'
+    return 'low'
+
+
+def _hour(value):
+    # Hours are keyed in UTC, as the loads are truncated: replacing the
+    # minutes of a +05:30 time would land half an hour off every key.
+    return value.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _edge(a, b):
+    return (a, b) if a <= b else (b, a)
+
+
+class CorridorGraph:
+    def __init__(self, corridors):
+        self.neighbours = defaultdict(list)
+        self.hours = {}
+        self.capacity = {}
+        for a, b, hours, capacity in corridors:
+            self.neighbours[a].append(b)
+            self.neighbours[b].append(a)
+            self.hours[_edge(a, b)] = hours
+            self.capacity[_edge(a, b)] = capacity
+        self._free_flow = {}
+
+    def __contains__(self, node):
+        return node in self.neighbours
+
+    def shortest_path(self, origin, destination, cost, removed_edges=(), removed_nodes=()):
+        """Dijkstra; returns ``(total cost, [nodes])`` or None."""
+        queue = [(0.0, origin, [origin])]
+        settled = set()
+        while queue:
+            total, node, path = heapq.heappop(queue)
+            if node == destination:
+                return total, path
+            if node in settled:
+                continue
+            settled.add(node)
+            for neighbour in self.neighbours[node]:
+                edge = _edge(node, neighbour)
+                if neighbour in settled or neighbour in removed_nodes or edge in removed_edges:
+                    continue
+                heapq.heappush(queue, (total + cost[edge], neighbour, path + [neighbour]))
+        return None
+
+    def k_shortest_paths(self, origin, destination, cost, k):
+        """Yen's algorithm: up to ``k`` loopless paths in increasing cost."""
+        first = self.shortest_path(origin, destination, cost)
+        if first is None:
+            return []
+        found = [first]
+        candidates = []
+        while len(found) < k:
+            _, previous = found[-1]
+            for index in range(len(previous) - 1):
+                spur, root = previous[index], previous[:index + 1]
+                removed_edges = {
+                    _edge(path[index], path[index + 1])
+                    for _, path in found if len(path) > index + 1 and path[:index + 1] == root
+                }
+                spur_path = self.shortest_path(spur, destination, cost, removed_edges, set(root[:-1]))
+                if spur_path is None:
+                    continue
+                path = root[:-1] + spur_path[1]
+                total = sum(cost[_edge(a, b)] for a, b in zip(path, path[1:]))
+                if all(path != other for _, other in found) and all(path != other for _, other in candidates):
+                    heapq.heappush(candidates, (total, path))
+            if not candidates:
+                break
+            found.append(heapq.heappop(candidates))
+        return found
+
+    def free_flow_path(self, origin, destination):
+        key = (origin, destination)
+        if key not in self._free_flow:
+            result = None
+            if origin in self and destination in self:
+                result = self.shortest_path(origin, destination, self.hours)
+            self._free_flow[key] = result[1] if result else None
+        return self._free_flow[key]
+
+
+class RoutePlanner:
+    def __init__(self, graph):
+        self.graph = graph
+        self._lock = threading.Lock()
+        self._loads = {}
+        self._paths = {}
+
+    def reset(self):
+        with self._lock:
+            self._loads.clear()
+            self._paths.clear()
+
+    def _fetch(self, first, last):
+        from .models import Journey
+
+        rows = (
+            Journey.objects.filter(start_date__gte=first, start_date__lt=last + timedelta(hours=1))
+            .annotate(hour=TruncHour('start_date', tzinfo=dt_timezone.utc))
+            .order_by()
+            .values('hour', 'start_location', 'end_location')
+            .annotate(vehicles=Count('id'))
+        )
+        loads = {first + timedelta(hours=offset): defaultdict(int)
+                 for offset in range(int((last - first).total_seconds() // 3600) + 1)}
+        for row in rows:
+            path = self.graph.free_flow_path(row['start_location'], row['end_location'])
+            hour = _hour(row['hour'])
+            if path and hour in loads:
+                for a, b in zip(path, path[1:]):
+                    loads[hour][_edge(a, b)] += row['vehicles']
+        return loads
+
+    def hourly_loads(self, first, last):
+        """Vehicles per corridor for each hour from ``first`` to ``last``."""
+        now = time.monotonic()
+        hours = []
+        hour = first
+        while hour <= last:
+            hours.append(hour)
+            hour += timedelta(hours=1)
+        # Loads are taken from what this call read or fetched, never read
+        # back later: another thread may evict or reset them in between.
+        loads, stale = {}, []
+        with self._lock:
+            for hour in hours:
+                entry = self._loads.get(hour)
+                if entry is None or now - entry[0] > settings.ROUTING_REFRESH_SECONDS:
+                    stale.append(hour)
+                else:
+                    loads[hour] = entry[1]
+        if stale:
+            fetched = self._fetch(stale[0], stale[-1])
+            with self._lock:
+                for hour, (loaded_at, _) in list(self._loads.items()):
+                    if now - loaded_at > settings.ROUTING_REFRESH_SECONDS:
+                        del self._loads[hour]
+                        self._paths.pop(hour, None)
+                for hour, load in fetched.items():
+                    self._loads[hour] = (now, load)
+                    self._paths.pop(hour, None)
+            for hour in stale:
+                loads[hour] = fetched[hour]
+        return loads
+
+    def costs(self, load):
+        costs, ratios = {}, {}
+        for edge, hours in self.graph.hours.items():
+            ratio = load.get(edge, 0) / self.graph.capacity[edge]
+            costs[edge] = hours * (1 + BPR_ALPHA * ratio ** BPR_BETA)
+            ratios[edge] = ratio
+        return costs, ratios
+
+    def routes(self, origin, destination, hour, k=3):
+        """Up to ``k`` corridors from ``origin`` to ``destination`` for a
+        departure in ``hour``, fastest first under the current load."""
+        if origin not in self.graph or destination not in self.graph:
+            return []
+        hour = _hour(hour)
+        load = self.hourly_loads(hour, hour)[hour]
+        key = (origin, destination, k)
+        with self._lock:
+            cached = self._paths.get(hour, {}).get(key)
+        if cached is not None:
+            return cached
+        costs, ratios = self.costs(load)
+        result = []
+        for total, path in self.graph.k_shortest_paths(origin, destination, costs, k):
+            edges = [_edge(a, b) for a, b in zip(path, path[1:])]
+            busiest = max(ratios[edge] for edge in edges)
+            result.append({
+                'path': path,
+                'hours': round(total, 2),
+                'free_flow_hours': round(sum(self.graph.hours[edge] for edge in edges), 2),
+                'traffic_status': traffic_status(busiest),
+                'peak_load': round(busiest, 3),
+            })
+        with self._lock:
+            self._paths.setdefault(hour, {})[key] = result
+        return result
+
+    def slots(self, origin, destination, around, count=5):
+        """Departure slots within ``SLOT_SUGGESTION_WINDOW_HOURS`` of
+        ``around`` that still have capacity, least congested first."""
+        from .models import SlotCapacity, slot_start_for
+
+        window = settings.SLOT_SUGGESTION_WINDOW_HOURS
+        step = timedelta(minutes=settings.JOURNEY_SLOT_MINUTES)
+        slot = slot_start_for(max(around - timedelta(hours=window), timezone.now()))
+        starts = []
+        while slot <= around + timedelta(hours=window):
+            starts.append(slot)
+            slot += step
+        if not starts:
+            return []
+
+        default_limit = settings.JOURNEY_SLOT_CAPACITY.get(destination, 0)
+        booked = {
+            slot_start: (limit, reserved)
+            for slot_start, limit, reserved in SlotCapacity.objects.filter(
+                end_location=destination, slot_start__in=starts,
+            ).values_list('slot_start', 'limit', 'reserved')
+        }
+        hour_of = {start: _hour(start) for start in starts}
+        self.hourly_loads(hour_of[starts[0]], hour_of[starts[-1]])
+
+        suggestions = []
+        for start in starts:
+            slot_limit, reserved = booked.get(start, (default_limit, 0))
+            available = max(slot_limit - reserved, 0)
+            if not available:
+                continue
+            fill = 1 - available / slot_limit if slot_limit else 1
+            best = self.routes(origin, destination, hour_of[start], k=1)
+            delay = best[0]['hours'] / best[0]['free_flow_hours'] - 1 if best else 0
+            shift = abs((start - around).total_seconds()) / 3600 / window
+            suggestions.append({
+                'slot_start': start,
+                'available': available,
+                'limit': slot_limit,
+                'traffic_status': traffic_status(max(fill, best[0]['peak_load'] if best else 0)),
+                'route': best[0] if best else None,
+                '_score': fill + delay + 0.5 * shift,
+            })
+        suggestions.sort(key=lambda item: item['_score'])
+        for item in suggestions:
+            del item['_score']
+        return suggestions[:count]
+
+
+planner = RoutePlanner(CorridorGraph(CORRIDORS))
@@ -1,8 +1,109 @@
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import serializers
-from .models import Journey
+from vehicles.models import Vehicle
+from yatra_backend.fast_serializers import RowSerializer
+from .models import Journey, JourneyHistoryStat, RouteStat, capacity_error
  
 class JourneySerializer(serializers.ModelSerializer):
     class Meta:
         model = Journey
         fields = '__all__'
-        read_only_fields = ('user', 'is_approved') 
\ No newline at end of file
+        read_only_fields = ('user', 'origin', 'is_approved')
+
+    def validate(self, attrs):
+        vehicle = attrs.get('vehicle', getattr(self.instance, 'vehicle', None))
+        passengers = attrs.get('number_of_passengers', getattr(self.instance, 'number_of_passengers', None))
+        if vehicle is not None and passengers is not None and passengers > vehicle.max_capacity:
+            raise serializers.ValidationError({'number_of_passengers': [capacity_error(vehicle)]})
+        return attrs
+
+
+journey_rows = RowSerializer(JourneySerializer)
+
+
+class RouteStatSerializer(serializers.ModelSerializer):
+    total_capacity = serializers.IntegerField(read_only=True)
+    traffic_status = serializers.CharField(read_only=True)
+    occupancy = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = RouteStat
+        fields = ('id', 'start_location', 'end_location', 'booking_count', 'passenger_count',
+                  'total_capacity', 'traffic_status', 'occupancy', 'updated_at')
+
+
+class JourneyHistoryStatSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JourneyHistoryStat
+        fields = ('start_location', 'end_location', 'day', 'journey_count', 'passenger_count', 'approved_count')
+
+
+class JourneyBulkItemSerializer(JourneySerializer):
+    # Vehicles are resolved in one query for the whole batch by the view,
+    # instead of a PrimaryKeyRelatedField lookup per item.
+    vehicle = serializers.IntegerField()
+
+    def validate(self, attrs):
+        # Capacity is checked by the view once the vehicles are resolved.
+        return attrs
+
+
+class FilterDateTimeField(serializers.Field):
+    """An ISO 8601 datetime, or a date meaning its start, in the current
+    time zone unless one is given."""
+    default_error_messages = {'invalid': 'Use an ISO 8601 date or datetime.'}
+
+    def to_internal_value(self, data):
+        if isinstance(data, datetime):
+            value = data
+        else:
+            try:
+                # Well-formed but impossible values (month 13) raise ValueError.
+                value = parse_datetime(str(data))
+                day = parse_date(str(data)) if value is None else None
+            except ValueError:
+                self.fail('invalid')
+            if day is not None:
+                value = datetime.combine(day, time.min)
+            if value is None:
+                self.fail('invalid')
+        return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+    def to_representation(self, value):
+        return value.isoformat()
+
+
+class JourneyFilterSerializer(serializers.Serializer):
+    is_approved = serializers.BooleanField(required=False)
+    end_location = serializers.ChoiceField(Journey.LOCATIONS, required=False)
+    start_after = FilterDateTimeField(required=False)
+    start_before = FilterDateTimeField(required=False)
+    vehicle_type = serializers.ChoiceField(Vehicle.VEHICLE_TYPES, required=False)
+    user = serializers.IntegerField(required=False)
+
+
+def journey_filters(params):
+    """Validate listing filters from a query string or request body for
+    ``apply_params``; blank values are ignored."""
+    # A plain dict: DRF reads missing booleans in a QueryDict as false.
+    data = {name: params.get(name) for name in JourneyFilterSerializer().fields if params.get(name) not in ('', None)}
+    serializer = JourneyFilterSerializer(data=data)
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data
+
+
+class JourneyApprovalSerializer(serializers.Serializer):
+    approve = serializers.BooleanField(default=True)
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    filter = serializers.DictField(required=False)
+
+    def validate_filter(self, value):
+        return journey_filters(value)
+
+    def validate(self, attrs):
+        if not attrs.get('ids') and not attrs.get('filter'):
+            raise serializers.ValidationError('Provide "ids" or a "filter" to select journeys.')
+        return attrs
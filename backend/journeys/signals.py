@@ -0,0 +1,37 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from yatra_backend import cache
+from yatra_backend.models import Tombstone
+from .events import route_events
+from .forecast import occupancy
+from .models import TRACKED_FIELDS, Journey, Origin, RouteStat, SlotCapacity
+from .origins import origin_index
+
+
+@receiver(post_delete, sender=Journey)
+def release_journey_counters(sender, instance, **kwargs):
+    # Cascading deletes (user/vehicle removal) never call Journey.delete(),
+    # so the counters are released from the signal instead.
+    RouteStat.objects.adjust(
+        instance.start_location, instance.end_location,
+        bookings=-1, passengers=-instance.number_of_passengers,
+    )
+    SlotCapacity.objects.release(instance.end_location, instance.start_date)
+    occupancy.record(instance.pk, None, {field: getattr(instance, field) for field in TRACKED_FIELDS}, sign=-1)
+    route_events.routes_changed(
+        'deleted', [(instance.start_location, instance.end_location)], journeys=[instance.pk],
+    )
+    Tombstone.objects.record(Tombstone.JOURNEY, [(instance.pk, instance.user_id)])
+    cache.bump(cache.JOURNEYS, instance.user_id)
+
+
+@receiver(post_save, sender=Journey)
+def invalidate_journey_list(sender, instance, **kwargs):
+    cache.bump(cache.JOURNEYS, instance.user_id)
+
+
+@receiver(post_delete, sender=Origin)
+def reload_origin_index(sender, instance, **kwargs):
+    # Before the commit another worker could reload and keep the old row.
+    transaction.on_commit(origin_index.invalidate)
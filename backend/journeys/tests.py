@@ -0,0 +1,611 @@
+import json
+import warnings
+from datetime import timedelta, timezone as dt_timezone
+from functools import partial
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import UnorderedObjectListWarning
+from django.db import connection
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.test import APIClient
+from users.authentication import issue_token
+from users.models import User
+from vehicles.models import Vehicle
+from yatra_backend.models import Tombstone
+from yatra_backend.sync import encode_cursor
+from .async_views import journey_detail, journey_list
+from .events import aroute_events_view, route_events, route_events_view
+from .export import parse_filters, rows
+from .forecast import occupancy
+from .models import ArchivedJourney, Journey, JourneyHistoryStat, Origin, RouteStat, SlotCapacity, SlotFull, slot_start_for
+from .origins import origin_index
+from .routing import planner
+
+
+class JourneyTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='pilgrim', password='bench-Pass-2024', aadhar_number='123456789012',
+            license_number='DL0420240001', phone_number='9876543210',
+        )
+        self.vehicle = Vehicle.objects.create(
+            user=self.user, vehicle_type='TR', plate_number='UP32AB1234', model_name='Tempo', max_capacity=15,
+        )
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {issue_token(self.user)}')
+
+    def admin(self):
+        return User.objects.create_user(
+            username='control', password='bench-Pass-2024', aadhar_number='123456789013',
+            license_number='DL0420240002', phone_number='9876543211', is_admin=True,
+        )
+
+    def admin_client(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {issue_token(self.admin())}')
+        return client
+
+    def journeys(self, count, start=None):
+        start = start or (timezone.now() + timedelta(days=30)).replace(minute=0, second=0, microsecond=0)
+        return [
+            Journey(
+                user=self.user, vehicle=self.vehicle, start_location='Lucknow', end_location='KM',
+                start_date=start, end_date=start + timedelta(days=1), number_of_passengers=2,
+            )
+            for _ in range(count)
+        ]
+
+
+class BulkBookTests(JourneyTestCase):
+    def test_created_journeys_have_ids(self):
+        created, rejected = Journey.objects.bulk_book(self.journeys(3))
+        self.assertEqual(rejected, [])
+        self.assertEqual(
+            sorted(journey.pk for _, journey in created),
+            sorted(Journey.objects.values_list('pk', flat=True)),
+        )
+
+    def test_ids_are_read_back_when_bulk_insert_returns_none(self):
+        # MySQL cannot return the rows of a bulk INSERT.
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            created, _ = Journey.objects.bulk_book(self.journeys(3))
+        ids = [journey.pk for _, journey in created]
+        self.assertNotIn(None, ids)
+        self.assertEqual(sorted(ids), sorted(Journey.objects.values_list('pk', flat=True)))
+
+
+class BulkEndpointTests(JourneyTestCase):
+    def item(self, **overrides):
+        start = (timezone.now() + timedelta(days=30)).replace(minute=0, second=0, microsecond=0)
+        return {
+            'vehicle': self.vehicle.pk, 'start_location': 'Lucknow', 'end_location': 'KM',
+            'start_date': start.isoformat(), 'end_date': (start + timedelta(days=1)).isoformat(),
+            'number_of_passengers': 2, **overrides,
+        }
+
+    def test_each_item_gets_its_own_result(self):
+        other = User.objects.create_user(
+            username='other', password='bench-Pass-2024', aadhar_number='123456789014',
+            license_number='DL0420240003', phone_number='9876543212',
+        )
+        foreign = Vehicle.objects.create(
+            user=other, vehicle_type='4W', plate_number='UP32AB9999', model_name='Swift', max_capacity=4,
+        )
+        response = self.client.post('/api/journeys/bulk/', {'journeys': [
+            self.item(), self.item(vehicle=foreign.pk), self.item(end_location='XX'),
+        ]}, format='json')
+        self.assertEqual(response.status_code, 207)
+        body = response.json()
+        self.assertEqual((body['created'], body['failed']), (1, 2))
+        self.assertEqual([result['status'] for result in body['results']], ['created', 'invalid', 'invalid'])
+        self.assertEqual(body['results'][1]['errors'], {'vehicle': ['Vehicle not found.']})
+        self.assertEqual(list(Journey.objects.values_list('user_id', flat=True)), [self.user.pk])
+
+    def test_empty_and_oversized_batches_are_rejected(self):
+        self.assertEqual(self.client.post('/api/journeys/bulk/', [], format='json').status_code, 400)
+        with mock.patch('journeys.views.BULK_CREATE_LIMIT', 2):
+            response = self.client.post('/api/journeys/bulk/', [self.item()] * 3, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Journey.objects.exists())
+
+
+class BulkApprovalTests(JourneyTestCase):
+    def setUp(self):
+        super().setUp()
+        created, _ = Journey.objects.bulk_book(self.journeys(3))
+        self.ids = [journey.pk for _, journey in created]
+
+    def test_selected_journeys_are_approved_once(self):
+        client = self.admin_client()
+        response = client.post('/api/journeys/bulk-approval/', {'ids': self.ids[:2]}, format='json')
+        self.assertEqual(response.json(), {'approved': 2})
+        response = client.post('/api/journeys/bulk-approval/', {'ids': self.ids}, format='json')
+        self.assertEqual(response.json(), {'approved': 1})
+        self.assertEqual(Journey.objects.filter(is_approved=True).count(), 3)
+
+    def test_filter_selects_journeys_to_reject(self):
+        Journey.objects.filter(pk__in=self.ids).update(is_approved=True)
+        response = self.admin_client().post(
+            '/api/journeys/bulk-approval/', {'approve': False, 'filter': {'end_location': 'KM'}}, format='json',
+        )
+        self.assertEqual(response.json(), {'rejected': 3})
+        self.assertFalse(Journey.objects.filter(is_approved=True).exists())
+
+    def test_selection_and_admin_are_required(self):
+        self.assertEqual(self.client.post('/api/journeys/bulk-approval/', {'ids': self.ids}).status_code, 403)
+        response = self.admin_client().post('/api/journeys/bulk-approval/', {'approve': True}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Journey.objects.filter(is_approved=True).exists())
+
+
+class ArchiveTests(JourneyTestCase):
+    def setUp(self):
+        super().setUp()
+        self.past = (timezone.now() - timedelta(days=3)).replace(minute=0, second=0, microsecond=0)
+        created, _ = Journey.objects.bulk_book(self.journeys(3, self.past))
+        self.archived = sorted(journey.pk for _, journey in created)
+        self.live = Journey.objects.bulk_book(self.journeys(1))[0][0][1]
+
+    def test_ended_journeys_move_to_history_in_batches(self):
+        self.assertEqual(list(Journey.objects.archive_completed(batch_size=2)), [2, 1])
+        self.assertEqual(list(Journey.objects.values_list('pk', flat=True)), [self.live.pk])
+        self.assertEqual(sorted(ArchivedJourney.objects.values_list('pk', flat=True)), self.archived)
+        self.assertEqual(RouteStat.objects.get(start_location='Lucknow').booking_count, 1)
+        stat = JourneyHistoryStat.objects.get()
+        self.assertEqual((stat.day, stat.journey_count, stat.passenger_count), (timezone.localdate(self.past), 3, 6))
+        self.assertEqual(
+            sorted(Tombstone.objects.filter(kind=Tombstone.JOURNEY).values_list('object_id', flat=True)),
+            self.archived,
+        )
+
+    def test_history_is_listed_only_when_asked_for(self):
+        list(Journey.objects.archive_completed())
+        ids = lambda **params: sorted(row['id'] for row in self.client.get('/api/journeys/', params).json()['results'])
+        self.assertEqual(ids(), [self.live.pk])
+        self.assertEqual(ids(history='only'), self.archived)
+        self.assertEqual(ids(history='all'), sorted(self.archived + [self.live.pk]))
+        self.assertEqual(self.client.get('/api/journeys/', {'history': 'some'}).status_code, 400)
+
+
+class ConditionalGetTests(JourneyTestCase):
+    def setUp(self):
+        super().setUp()
+        created, _ = Journey.objects.bulk_book(self.journeys(2))
+        self.journey = created[0][1]
+
+    def test_unchanged_list_is_not_modified_until_a_commit(self):
+        etag = self.client.get('/api/journeys/')['ETag']
+        self.assertEqual(self.client.get('/api/journeys/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.journey.number_of_passengers = 3
+            self.journey.save()
+        response = self.client.get('/api/journeys/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_detail_etag_follows_updated_at(self):
+        path = f'/api/journeys/{self.journey.pk}/'
+        etag = self.client.get(path)['ETag']
+        self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.journey.number_of_passengers = 3
+        self.journey.save()
+        self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class DeltaSyncTests(JourneyTestCase):
+    def sync(self, cursor=None, **params):
+        response = self.client.get('/api/journeys/changes/', {**({'since': cursor} if cursor else {}), **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_pages_cover_every_journey(self):
+        Journey.objects.bulk_book(self.journeys(5))
+        seen, page = [], {'cursor': None, 'has_more': True}
+        while page['has_more']:
+            page = self.sync(page['cursor'], limit=2)
+            seen += [row['id'] for row in page['changed']]
+        self.assertEqual(sorted(seen), sorted(Journey.objects.values_list('pk', flat=True)))
+
+    def test_updates_and_deletions_since_the_cursor(self):
+        created, _ = Journey.objects.bulk_book(self.journeys(3))
+        (_, updated), (_, deleted), _ = created
+        deleted_id = deleted.pk
+        cursor = self.sync()['cursor']
+        updated.number_of_passengers = 3
+        updated.save()
+        deleted.delete()
+        page = self.sync(cursor)
+        changed = {row['id']: row for row in page['changed']}
+        self.assertEqual(changed[updated.pk]['number_of_passengers'], 3)
+        self.assertNotIn(deleted_id, changed)
+        self.assertEqual(page['deleted'], [deleted_id])
+
+    def test_other_users_deletions_are_not_sent(self):
+        cursor = self.sync()['cursor']
+        Tombstone.objects.record(Tombstone.JOURNEY, [(999, self.user.pk + 1)])
+        self.assertEqual(self.sync(cursor)['deleted'], [])
+
+    def test_cursor_older_than_the_tombstones_is_gone(self):
+        old = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS + 1)
+        response = self.client.get('/api/journeys/changes/', {'since': encode_cursor((old, 0), (old, 0))})
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(self.client.get('/api/journeys/changes/', {'since': 'x'}).status_code, 400)
+
+
+class RouteStatsTests(JourneyTestCase):
+    def test_counts_follow_bookings_and_deletes(self):
+        created, _ = Journey.objects.bulk_book(self.journeys(3))
+        created[0][1].delete()
+        counts = RouteStat.objects.values_list('start_location', 'end_location', 'booking_count', 'passenger_count')
+        self.assertEqual(list(counts), [('Lucknow', 'KM', 2, 4)])
+        RouteStat.objects.rebuild()
+        self.assertEqual(list(counts), [('Lucknow', 'KM', 2, 4)])
+
+    def test_endpoint_reports_traffic_status_to_admins(self):
+        Journey.objects.bulk_book(self.journeys(2))
+        self.assertEqual(self.client.get('/api/journeys/route-stats/').status_code, 403)
+        client = self.admin_client()
+        routes = client.get('/api/journeys/route-stats/', {'end_location': 'KM'}).json()
+        self.assertEqual(len(routes), 1)
+        self.assertEqual(routes[0]['booking_count'], 2)
+        self.assertEqual(routes[0]['traffic_status'], 'low')
+        self.assertEqual(client.get('/api/journeys/route-stats/', {'end_location': 'BD'}).json(), [])
+
+
+class RoutingTests(JourneyTestCase):
+    def setUp(self):
+        super().setUp()
+        planner.reset()
+        self.addCleanup(planner.reset)
+
+    def test_load_is_found_for_a_time_given_in_ist(self):
+        start = (timezone.now() + timedelta(days=30)).astimezone(dt_timezone.utc).replace(
+            minute=0, second=0, microsecond=0,
+        )
+        Journey.objects.bulk_book(self.journeys(5, start))
+        ist = dt_timezone(timedelta(hours=5, minutes=30))
+        in_utc = planner.routes('Lucknow', 'KM', start + timedelta(minutes=30), k=1)
+        planner.reset()
+        in_ist = planner.routes('Lucknow', 'KM', (start + timedelta(minutes=30)).astimezone(ist), k=1)
+        self.assertGreater(in_utc[0]['peak_load'], 0)
+        self.assertEqual(in_ist[0]['peak_load'], in_utc[0]['peak_load'])
+
+
+    @override_settings(JOURNEY_SLOT_CAPACITY={'KM': 2})
+    def test_full_slot_is_not_suggested(self):
+        start = (timezone.now() + timedelta(days=30)).replace(minute=0, second=0, microsecond=0)
+        Journey.objects.bulk_book(self.journeys(2, start))
+        response = self.client.get('/api/journeys/suggestions/', {
+            'start_location': 'Lucknow', 'end_location': 'KM', 'start': start.isoformat(),
+        })
+        self.assertEqual(response.status_code, 200)
+        slots = [parse_datetime(slot['slot_start']) for slot in response.json()['slots']]
+        self.assertTrue(slots)
+        self.assertNotIn(slot_start_for(start), slots)
+
+    def test_suggestions_need_a_known_destination(self):
+        response = self.client.get('/api/journeys/suggestions/', {'start_location': 'Lucknow', 'end_location': 'XX'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ForecastTests(JourneyTestCase):
+    def setUp(self):
+        super().setUp()
+        self.start = (timezone.now() + timedelta(days=30)).astimezone(dt_timezone.utc).replace(
+            minute=0, second=0, microsecond=0,
+        )
+        self.addCleanup(occupancy.reset)
+
+    def at_start(self, measure='vehicles'):
+        return occupancy.curve('KM', self.start, 1)[0][measure]
+
+    def test_curve_counts_journeys_while_they_run(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Journey.objects.bulk_book(self.journeys(3, self.start))
+        occupancy.load()
+        curve = occupancy.curve('KM', self.start - timedelta(hours=1), 26)
+        self.assertEqual([hour['vehicles'] for hour in curve], [0] + [3] * 24 + [0])
+
+    def test_bookings_are_applied_once_committed(self):
+        occupancy.load()
+        with self.captureOnCommitCallbacks() as callbacks:
+            Journey.objects.bulk_book(self.journeys(2, self.start))
+        self.assertEqual(self.at_start(), 0)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.at_start(), 2)
+
+    def test_change_the_rebuild_already_read_is_not_replayed(self):
+        compute = occupancy._compute
+
+        def committed_before_the_read(using):
+            # Committed before the snapshot, applied only once it is read.
+            with self.captureOnCommitCallbacks() as callbacks:
+                Journey.objects.bulk_book(self.journeys(1, self.start))
+            built = compute(using)
+            for callback in callbacks:
+                callback()
+            return built
+
+        with mock.patch.object(occupancy, '_compute', committed_before_the_read):
+            occupancy.load()
+        self.assertEqual(self.at_start(), 1)
+
+    def test_change_newer_than_the_rebuild_is_replayed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            (_, journey), = Journey.objects.bulk_book(self.journeys(1, self.start))[0]
+        compute = occupancy._compute
+
+        def committed_after_the_read(using):
+            built = compute(using)
+            read_at = journey.updated_at
+            with self.captureOnCommitCallbacks() as callbacks:
+                journey.number_of_passengers = 5
+                journey.save()
+            # Put the row back as the snapshot, taken before the save, saw it.
+            Journey.objects.filter(pk=journey.pk).update(number_of_passengers=2, updated_at=read_at)
+            for callback in callbacks:
+                callback()
+            return built
+
+        with mock.patch.object(occupancy, '_compute', committed_after_the_read):
+            occupancy.load()
+        self.assertEqual(self.at_start('passengers'), 5)
+
+
+class JourneyListTests(JourneyTestCase):
+    def test_list_is_newest_first(self):
+        start = (timezone.now() + timedelta(days=30)).replace(minute=0, second=0, microsecond=0)
+        for days in (2, 0, 1):
+            Journey.objects.bulk_book(self.journeys(1, start + timedelta(days=days)))
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', UnorderedObjectListWarning)
+            response = self.client.get('/api/journeys/')
+        self.assertEqual(response.status_code, 200)
+        starts = [journey['start_date'] for journey in response.json()['results']]
+        self.assertEqual(starts, sorted(starts, reverse=True))
+        self.assertEqual(len(starts), 3)
+
+    def test_cursor_pages_cover_every_journey_once(self):
+        # Same start_date everywhere: only the id tie-breaker orders them.
+        Journey.objects.bulk_book(self.journeys(5))
+        seen, url = [], '/api/journeys/?paginate=cursor&page_size=2&order_by=-start_date'
+        while url:
+            page = self.client.get(url).json()
+            seen += [journey['id'] for journey in page['results']]
+            url = page['next']
+        self.assertEqual(seen, sorted(Journey.objects.values_list('pk', flat=True), reverse=True))
+
+    def test_invalid_filter_is_rejected(self):
+        response = self.client.get('/api/journeys/', {'is_approved': 'maybe'})
+        self.assertEqual(response.status_code, 400)
+
+
+class AsyncReadViewTests(JourneyTestCase):
+    def setUp(self):
+        super().setUp()
+        created, _ = Journey.objects.bulk_book(self.journeys(3))
+        self.journey = created[0][1]
+        self.auth = {'HTTP_AUTHORIZATION': f'Token {issue_token(self.user)}'}
+
+    async def test_list_and_detail_match_the_sync_views(self):
+        for path in ('/api/journeys/', f'/api/journeys/{self.journey.pk}/'):
+            expected = (await sync_to_async(self.client.get)(path)).json()
+            await cache.aclear()
+            view = journey_list if path == '/api/journeys/' else partial(journey_detail, pk=self.journey.pk)
+            response = await view(RequestFactory().get(path, **self.auth))
+            self.assertEqual(response.status_code, 200, path)
+            self.assertEqual(json.loads(response.content), expected, path)
+
+    async def test_requests_without_a_token_are_refused(self):
+        response = await journey_list(RequestFactory().get('/api/journeys/'))
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Token')
+
+    async def test_other_users_journey_is_not_found(self):
+        admin = await sync_to_async(self.admin)()
+        journey = await Journey.objects.acreate(
+            user=admin, vehicle=self.vehicle, start_location='Lucknow', end_location='KM',
+            start_date=self.journey.start_date, end_date=self.journey.end_date, number_of_passengers=1,
+        )
+        response = await journey_detail(RequestFactory().get('/', **self.auth), pk=journey.pk)
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(JOURNEY_SLOT_CAPACITY={'KM': 2})
+class SlotReservationTests(JourneyTestCase):
+    def setUp(self):
+        super().setUp()
+        self.start = (timezone.now() + timedelta(days=30)).replace(minute=0, second=0, microsecond=0)
+
+    def payload(self, **overrides):
+        return {
+            'vehicle': self.vehicle.pk, 'start_location': 'Lucknow', 'end_location': 'KM',
+            'start_date': self.start.isoformat(), 'end_date': (self.start + timedelta(days=1)).isoformat(),
+            'number_of_passengers': 2, **overrides,
+        }
+
+    def test_reserve_stops_at_the_limit(self):
+        SlotCapacity.objects.reserve('KM', self.start)
+        SlotCapacity.objects.reserve('KM', self.start + timedelta(minutes=30))
+        with self.assertRaises(SlotFull):
+            SlotCapacity.objects.reserve('KM', self.start)
+        slot = SlotCapacity.objects.get(end_location='KM', slot_start=slot_start_for(self.start))
+        self.assertEqual((slot.reserved, slot.limit), (2, 2))
+
+    def test_zero_limit_slot_is_full(self):
+        SlotCapacity.objects.create(end_location='KM', slot_start=slot_start_for(self.start), limit=0)
+        with self.assertRaises(SlotFull):
+            SlotCapacity.objects.reserve('KM', self.start)
+
+    def test_moving_a_journey_releases_its_old_slot(self):
+        (_, journey), = Journey.objects.bulk_book(self.journeys(1, self.start))[0]
+        journey.start_date += timedelta(hours=3)
+        journey.end_date += timedelta(hours=3)
+        journey.save()
+        reserved = dict(SlotCapacity.objects.values_list('slot_start', 'reserved'))
+        self.assertEqual(reserved, {slot_start_for(self.start): 0, slot_start_for(journey.start_date): 1})
+
+    def test_bulk_book_admits_up_to_the_limit(self):
+        created, rejected = Journey.objects.bulk_book(self.journeys(3, self.start))
+        self.assertEqual([index for index, _ in created], [0, 1])
+        self.assertEqual([index for index, _ in rejected], [2])
+
+    def test_full_slot_is_rejected_with_suggestions(self):
+        Journey.objects.bulk_book(self.journeys(2, self.start))
+        response = self.client.post('/api/journeys/', self.payload(), format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('start_date', response.json())
+        self.assertIn('suggested_slots', response.json())
+
+    def test_over_capacity_is_rejected_alike_on_every_path(self):
+        payload = self.payload(number_of_passengers=16)
+        single = self.client.post('/api/journeys/', payload, format='json')
+        bulk = self.client.post('/api/journeys/bulk/', [payload], format='json')
+        self.assertEqual(single.status_code, 400)
+        self.assertEqual(bulk.status_code, 400)
+        self.assertEqual(single.json(), bulk.json()['results'][0]['errors'])
+        self.assertFalse(Journey.objects.exists())
+
+    def test_admin_reports_a_full_slot_on_the_form(self):
+        Journey.objects.bulk_book(self.journeys(2, self.start))
+        admin = User.objects.create_superuser(
+            username='control', password='bench-Pass-2024', aadhar_number='123456789013',
+            license_number='DL0420240002', phone_number='9876543211',
+        )
+        client = Client()
+        client.force_login(admin)
+        end = self.start + timedelta(days=1)
+        response = client.post('/admin/journeys/journey/add/', {
+            'user': self.user.pk, 'vehicle': self.vehicle.pk, 'start_location': 'Lucknow', 'end_location': 'KM',
+            'start_date_0': f'{self.start:%Y-%m-%d}', 'start_date_1': f'{self.start:%H:%M:%S}',
+            'end_date_0': f'{end:%Y-%m-%d}', 'end_date_1': f'{end:%H:%M:%S}',
+            'number_of_passengers': 2,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('start_date', response.context['adminform'].form.errors)
+        self.assertEqual(Journey.objects.count(), 2)
+
+
+class OriginIndexTests(JourneyTestCase):
+    def setUp(self):
+        super().setUp()
+        origin_index.reset()
+        self.addCleanup(origin_index.reset)
+
+    def book(self, start_location):
+        journey, = self.journeys(1)
+        journey.start_location = start_location
+        with self.captureOnCommitCallbacks(execute=True):
+            journey.save()
+        return journey
+
+    def test_same_place_resolves_to_one_origin(self):
+        first = self.book('lucknow ')
+        second = self.book('LUCKNOW')
+        self.assertEqual(first.origin_id, second.origin_id)
+        self.assertEqual(second.start_location, 'Lucknow')
+
+    def test_close_spelling_is_kept_as_typed(self):
+        self.book('Sector 12 Noida')
+        journey = self.book('Sector 13 Noida')
+        self.assertEqual(journey.start_location, 'Sector 13 Noida')
+        self.assertEqual(Origin.objects.filter(key__startswith='sector').count(), 2)
+
+    def test_deleted_origin_is_not_reused(self):
+        deleted = self.book('Lucknow').origin
+        with self.captureOnCommitCallbacks(execute=True):
+            deleted.delete()
+        journey = self.book('Lucknow')
+        self.assertNotEqual(journey.origin_id, deleted.pk)
+        self.assertTrue(Origin.objects.filter(pk=journey.origin_id).exists())
+
+    def test_database_is_read_outside_the_lock(self):
+        read = origin_index._read
+
+        def unlocked_read():
+            self.assertFalse(origin_index._lock.locked())
+            return read()
+
+        with mock.patch.object(origin_index, '_read', unlocked_read):
+            self.assertEqual(origin_index.match('lucknow')[1], 'Lucknow')
+
+    def test_completion_limit_is_at_least_one(self):
+        self.book('Lucknow')
+        self.book('Ludhiana')
+        response = self.client.get('/api/journeys/origins/', {'q': 'lu', 'limit': -3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+
+
+class RouteEventStreamTests(JourneyTestCase):
+    def setUp(self):
+        super().setUp()
+        admin = self.admin()
+        self.request = RequestFactory().get('/api/journeys/events/', {'token': issue_token(admin)})
+        self.addCleanup(route_events._subscribers.clear)
+
+    def test_unread_stream_leaves_no_subscriber(self):
+        response = route_events_view(self.request)
+        self.assertFalse(route_events.has_subscribers)
+        response.close()
+        self.assertFalse(route_events.has_subscribers)
+
+    def test_stream_delivers_events_until_closed(self):
+        response = route_events_view(self.request)
+        body = iter(response)
+        self.assertTrue(next(body).startswith(b'event: snapshot'))
+        self.assertTrue(route_events.has_subscribers)
+        route_events.publish({'type': 'created', 'routes': []})
+        self.assertTrue(next(body).startswith(b'event: created'))
+        response.close()
+        self.assertFalse(route_events.has_subscribers)
+
+    async def test_async_stream_subscribes_on_first_read(self):
+        response = await aroute_events_view(self.request)
+        self.assertFalse(route_events.has_subscribers)
+        first = await anext(aiter(response.streaming_content))
+        self.assertTrue(first.startswith(b'event: snapshot'))
+        self.assertTrue(route_events.has_subscribers)
+
+
+class ExportTests(JourneyTestCase):
+    def setUp(self):
+        super().setUp()
+        admin = self.admin()
+        self.token = issue_token(admin)
+
+    def export(self, **params):
+        response = self.client.get('/api/journeys/export/', {'token': self.token, **params})
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body.decode()
+
+    def test_chunks_cover_every_row_once(self):
+        Journey.objects.bulk_book(self.journeys(5))
+        exported = [row['id'] for row in rows(parse_filters({'is_approved': 'all'}), chunk_size=2)]
+        self.assertEqual(exported, sorted(Journey.objects.values_list('pk', flat=True)))
+
+    def test_approved_only_by_default(self):
+        (_, approved), _ = Journey.objects.bulk_book(self.journeys(2))[0]
+        Journey.objects.filter(pk=approved.pk).update(is_approved=True)
+        self.assertEqual([row['id'] for row in rows(parse_filters({}))], [approved.pk])
+
+    def test_invalid_filters_are_rejected(self):
+        for params in ({'is_approved': 'maybe'}, {'end_location': 'XX'}, {'format': 'xml'}):
+            response, _ = self.export(**params)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_csv_cells_cannot_start_a_formula(self):
+        journey, = self.journeys(1)
+        journey.start_location = '=HYPERLINK("x")'
+        journey.is_approved = True
+        journey.save()
+        response, body = self.export(format='csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("'=HYPERLINK", body)
@@ -1,10 +1,23 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from .events import aroute_events_view, route_events_view
+from .export import export_view
 from .views import JourneyViewSet
 
 router = DefaultRouter()
 router.register(r'', JourneyViewSet)
 
 urlpatterns = [
+    path('events/', aroute_events_view if settings.ASYNC_READ_VIEWS else route_events_view, name='route-events'),
+    path('export/', export_view, name='journey-export'),
     path('', include(router.urls)),
-] 
\ No newline at end of file
+]
+
+if settings.ASYNC_READ_VIEWS:
+    from .async_views import journey_detail, journey_list
+
+    urlpatterns = [
+        path('', journey_list),
+        path('<int:pk>/', journey_detail),
+    ] + urlpatterns
@@ -1,16 +1,262 @@
-from rest_framework import viewsets, permissions
-from .models import Journey
-from .serializers import JourneySerializer
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import viewsets, permissions, serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from users.permissions import IsAdmin
+from yatra_backend import cache, sync
+from yatra_backend.admission import AdmissionThrottle
+from yatra_backend.db_router import ReplicaReadMixin
+from yatra_backend.fast_serializers import FastListMixin
+from yatra_backend.models import Tombstone
+from vehicles.models import Vehicle
+from .forecast import occupancy
+from .models import ArchivedJourney, Journey, JourneyHistoryStat, RouteStat, SlotFull, capacity_error
+from .origins import origin_index
+from .pagination import JourneyCursorPagination
+from .routing import planner
+from .serializers import (
+    JourneyApprovalSerializer, JourneySerializer, JourneyBulkItemSerializer, JourneyHistoryStatSerializer,
+    RouteStatSerializer, journey_filters, journey_rows,
+)
 
-class JourneyViewSet(viewsets.ModelViewSet):
+BULK_CREATE_LIMIT = 1000
+HISTORY_MODES = (None, 'only', 'all')
+ROUTE_SUGGESTION_COUNT = 3
+SUGGESTION_COUNT = 5
+ORIGIN_COMPLETION_LIMIT = 20
+FORECAST_MAX_HOURS = 24 * 14
+
+class JourneyViewSet(ReplicaReadMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Journey.objects.all()
     serializer_class = JourneySerializer
+    row_serializer = journey_rows
+    # Lists are cached and tagged under cache version stamps and changes
+    # hands out time cursors; a lagging replica would file stale rows under
+    # them for good.
+    primary_actions = ('list', 'changes')
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        if self.request.user.is_admin:
-            return Journey.objects.all()
-        return Journey.objects.filter(user=self.request.user)
+        queryset = Journey.objects.visible_to(self.request.user)
+        if self.action != 'list':
+            return queryset
+        params, user = journey_filters(self.request.query_params), self.request.user
+        queryset = queryset.apply_params(params, user)
+        history = self.history
+        if history is None:
+            return queryset.order_by('-start_date', '-id')
+        # Archived journeys are only read when ?history= asks for them.
+        archived = ArchivedJourney.objects.visible_to(user).apply_params(params, user)
+        if history == 'only':
+            return archived.order_by('-start_date', '-id')
+        columns = journey_rows.columns
+        return queryset.values(*columns).union(archived.values(*columns), all=True).order_by('-start_date', '-id')
+
+    @property
+    def history(self):
+        history = self.request.query_params.get('history')
+        if history not in HISTORY_MODES:
+            raise serializers.ValidationError({'history': ['Use "only" or "all".']})
+        return history
+
+    def list(self, request, *args, **kwargs):
+        def build():
+            # Admin listings span every user and are not cached per user.
+            if request.user.is_admin:
+                return Response(self.list_data(request))
+            return Response(cache.cached_data(cache.JOURNEYS, request, lambda: self.list_data(request)))
+
+        return sync.conditional(request, sync.list_conditions(cache.JOURNEYS, request.user, request), build)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        return sync.conditional(
+            request, sync.detail_conditions(instance, request), lambda: Response(self.get_serializer(instance).data),
+        )
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        user = request.user
+        return Response(sync.changes(
+            Journey.objects.visible_to(user), journey_rows, Tombstone.JOURNEY,
+            None if user.is_admin else user.pk, request.query_params.get('since'), sync.page_limit(request),
+        ))
+
+    @property
+    def paginator(self):
+        # ?paginate=cursor (or following a cursor link) switches to keyset
+        # pagination, which stays constant-time per page on large tables.
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if params.get('paginate') == 'cursor' or 'cursor' in params:
+                if self.history == 'all':
+                    raise serializers.ValidationError({'history': ['Cursor pagination supports history=only.']})
+                self._paginator = JourneyCursorPagination()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
+
+    def get_throttles(self):
+        if self.action in ('create', 'bulk'):
+            return [AdmissionThrottle('journey_create')]
+        return super().get_throttles()
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user) 
\ No newline at end of file
+        serializer.save(user=self.request.user)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, SlotFull):
+            # Offer nearby slots with room left instead of a bare rejection.
+            return Response({
+                'start_date': [str(exc)],
+                'suggested_slots': planner.slots(
+                    self.request.data.get('start_location'), exc.slot.end_location, exc.slot.slot_start,
+                    count=SUGGESTION_COUNT,
+                ),
+            }, status=status.HTTP_400_BAD_REQUEST)
+        return super().handle_exception(exc)
+
+    @action(detail=False, methods=['get'])
+    def origins(self, request):
+        try:
+            limit = max(min(int(request.query_params.get('limit', 10)), ORIGIN_COMPLETION_LIMIT), 1)
+        except ValueError:
+            return Response({'detail': 'limit must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        query = request.query_params.get('q', '')
+        matches = origin_index.complete(query, limit)
+        if len(matches) < limit:
+            # Close spellings are suggestions only; bookings keep the text as typed.
+            seen = {match['id'] for match in matches}
+            matches += [match for match in origin_index.similar(query, limit) if match['id'] not in seen]
+        return Response(matches[:limit])
+
+    @action(detail=False, methods=['get'])
+    def suggestions(self, request):
+        params = request.query_params
+        end_location = params.get('end_location')
+        if end_location not in dict(Journey.LOCATIONS):
+            return Response({'detail': 'Provide a valid end_location.'}, status=status.HTTP_400_BAD_REQUEST)
+        start = params.get('start')
+        start = parse_datetime(start) if start else timezone.now()
+        if start is None:
+            return Response({'detail': 'Invalid start datetime.'}, status=status.HTTP_400_BAD_REQUEST)
+        if timezone.is_naive(start):
+            start = timezone.make_aware(start)
+        start_location = params.get('start_location', '')
+        return Response({
+            'start_location': start_location,
+            'end_location': end_location,
+            'routes': planner.routes(start_location, end_location, start, k=ROUTE_SUGGESTION_COUNT),
+            'slots': planner.slots(start_location, end_location, start, count=SUGGESTION_COUNT),
+        })
+
+    @action(detail=False, methods=['get'], url_path='route-stats', permission_classes=[IsAdmin])
+    def route_stats(self, request):
+        routes = RouteStat.objects.filter(booking_count__gt=0)
+        end_location = request.query_params.get('end_location')
+        if end_location:
+            routes = routes.filter(end_location=end_location)
+        routes = routes.with_traffic_status().order_by('-booking_count')
+        serializer = RouteStatSerializer(routes, many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['get'], url_path='history-stats', permission_classes=[IsAdmin])
+    def history_stats(self, request):
+        stats = JourneyHistoryStat.objects.order_by('day', 'end_location', 'start_location')
+        params = request.query_params
+        if params.get('end_location'):
+            stats = stats.filter(end_location=params['end_location'])
+        for name, lookup in (('since', 'day__gte'), ('until', 'day__lt')):
+            if params.get(name):
+                day = parse_date(params[name])
+                if day is None:
+                    return Response({'detail': f'{name} must be a date.'}, status=status.HTTP_400_BAD_REQUEST)
+                stats = stats.filter(**{lookup: day})
+        return Response(JourneyHistoryStatSerializer(stats, many=True).data)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdmin])
+    def forecast(self, request):
+        end_location = request.query_params.get('end_location')
+        if end_location not in dict(Journey.LOCATIONS):
+            return Response({'detail': 'Provide a valid end_location.'}, status=status.HTTP_400_BAD_REQUEST)
+        start = request.query_params.get('start')
+        start = parse_datetime(start) if start else timezone.now()
+        if start is None:
+            return Response({'detail': 'Invalid start datetime.'}, status=status.HTTP_400_BAD_REQUEST)
+        if timezone.is_naive(start):
+            start = timezone.make_aware(start)
+        try:
+            hours = min(int(request.query_params.get('hours', 48)), FORECAST_MAX_HOURS)
+        except ValueError:
+            return Response({'detail': 'hours must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'end_location': end_location,
+            'hours': occupancy.curve(end_location, start, hours),
+        })
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        items = request.data.get('journeys') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({'detail': 'Provide a non-empty list of journeys.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > BULK_CREATE_LIMIT:
+            return Response(
+                {'detail': f'A batch may contain at most {BULK_CREATE_LIMIT} journeys.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        item_serializers = [JourneyBulkItemSerializer(data=item) for item in items]
+        valid = [s.is_valid() for s in item_serializers]
+        vehicles = Vehicle.objects.all()
+        if not request.user.is_admin:
+            vehicles = vehicles.filter(user=request.user)
+        vehicles = vehicles.in_bulk({s.validated_data['vehicle'] for s, ok in zip(item_serializers, valid) if ok})
+
+        results = [None] * len(items)
+        pending = []
+        for index, (item_serializer, ok) in enumerate(zip(item_serializers, valid)):
+            if not ok:
+                results[index] = {'index': index, 'status': 'invalid', 'errors': item_serializer.errors}
+                continue
+            data = dict(item_serializer.validated_data)
+            vehicle = vehicles.get(data.pop('vehicle'))
+            if vehicle is None:
+                errors = {'vehicle': ['Vehicle not found.']}
+            elif data['number_of_passengers'] > vehicle.max_capacity:
+                errors = {'number_of_passengers': [capacity_error(vehicle)]}
+            else:
+                pending.append((index, Journey(user=request.user, vehicle=vehicle, **data)))
+                continue
+            results[index] = {'index': index, 'status': 'invalid', 'errors': errors}
+
+        created, rejected = Journey.objects.bulk_book([journey for _, journey in pending])
+        for position, journey in created:
+            index = pending[position][0]
+            results[index] = {'index': index, 'status': 'created', 'journey': JourneySerializer(journey).data}
+        for position, exc in rejected:
+            index = pending[position][0]
+            results[index] = {'index': index, 'status': 'rejected', 'errors': {'start_date': [str(exc)]}}
+
+        failed = len(items) - len(created)
+        if not failed:
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response({'created': len(created), 'failed': failed, 'results': results}, status=response_status)
+
+    @action(detail=False, methods=['post'], url_path='bulk-approval', permission_classes=[IsAdmin])
+    def bulk_approval(self, request):
+        serializer = JourneyApprovalSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        approve, ids, filters = (serializer.validated_data.get(name) for name in ('approve', 'ids', 'filter'))
+
+        queryset = Journey.objects.all()
+        if ids:
+            queryset = queryset.filter(pk__in=ids)
+        if filters:
+            queryset = queryset.apply_params(filters, request.user)
+        updated = queryset.set_approval(approve)
+        return Response({'approved' if approve else 'rejected': updated})
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from .models import User
+from .search import MAX_LIMIT, EstimatedCountPaginator, search_ids
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
@@ -18,4 +19,15 @@ class CustomUserAdmin(UserAdmin):
         }),
     )
     search_fields = ('username', 'email', 'first_name', 'last_name', 'aadhar_number', 'license_number')
-    ordering = ('username',) 
\ No newline at end of file
+    search_help_text = 'Aadhar, phone or license number (or their start), email, username or name.'
+    ordering = ('username',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        # search_fields only enables the search box; lookups go through the
+        # indexed paths in users.search rather than icontains on each column.
+        if not search_term:
+            return queryset, False
+        ids, _ = search_ids(search_term, MAX_LIMIT)
+        return queryset.filter(pk__in=ids), False 
\ No newline at end of file
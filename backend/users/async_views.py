@@ -0,0 +1,17 @@
+from django.contrib.auth import get_user_model
+from yatra_backend import cache
+from yatra_backend.async_api import async_read_view, render
+from .serializers import UserSerializer
+from .views import UserViewSet
+
+User = get_user_model()
+
+
+async def read_me(request, user):
+    async def build():
+        # Read fresh, not from the token cache's copy (see UserViewSet.me).
+        return UserSerializer(await User.objects.aget(pk=user.pk)).data
+    return render(await cache.acached_data(cache.ME, user, request, build))
+
+
+me = async_read_view(read_me, UserViewSet.as_view({'get': 'me'}))
@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from rest_framework import authentication, exceptions
+
+TOKEN_SALT = 'users.authentication.SignedTokenAuthentication'
+
+
+def issue_token(user):
+    payload = {
+        'uid': user.pk,
+        'adm': user.is_admin,
+        'h': user.get_session_auth_hash()[:16],
+    }
+    return signing.dumps(payload, salt=TOKEN_SALT, compress=True)
+
+
+class ResolvedUserCache:
+    """Small thread-safe LRU of users resolved from tokens, with a TTL so
+    changes made by other workers are picked up after a short delay."""
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            user, auth_hash, expires = entry
+            if expires < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user, auth_hash
+
+    def set(self, user):
+        entry = (user, user.get_session_auth_hash()[:16], time.monotonic() + self.ttl)
+        with self._lock:
+            self._entries[user.pk] = entry
+            self._entries.move_to_end(user.pk)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return entry[:2]
+
+    def evict(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = ResolvedUserCache(settings.AUTH_TOKEN_USER_CACHE_SIZE, settings.AUTH_TOKEN_USER_CACHE_TTL)
+
+
+class SignedTokenAuthentication(authentication.BaseAuthentication):
+    """Authenticate ``Authorization: Token <token>`` headers issued by login_view.
+
+    Tokens are signed and expiring, so validating one needs no database
+    lookup and no password hashing; the user row comes from ``user_cache``.
+    """
+    keyword = 'Token'
+
+    def authenticate(self, request):
+        auth = authentication.get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed('Invalid token header.')
+        try:
+            token = auth[1].decode()
+        except UnicodeDecodeError:
+            raise exceptions.AuthenticationFailed('Invalid token.')
+        return self.authenticate_token(token)
+
+    def authenticate_token(self, token):
+        try:
+            payload = signing.loads(token, salt=TOKEN_SALT, max_age=settings.AUTH_TOKEN_MAX_AGE)
+        except signing.SignatureExpired:
+            raise exceptions.AuthenticationFailed('Token has expired.')
+        except signing.BadSignature:
+            raise exceptions.AuthenticationFailed('Invalid token.')
+
+        cached = user_cache.get(payload['uid'])
+        if cached is None:
+            try:
+                user = get_user_model().objects.get(pk=payload['uid'])
+            except get_user_model().DoesNotExist:
+                raise exceptions.AuthenticationFailed('Invalid token.')
+            cached = user_cache.set(user)
+        user, auth_hash = cached
+
+        # A password change rotates the session auth hash and so revokes tokens.
+        if not user.is_active or auth_hash != payload['h']:
+            raise exceptions.AuthenticationFailed('Invalid token.')
+        return user, payload
+
+    def authenticate_header(self, request):
+        return self.keyword
@@ -0,0 +1,176 @@
+import csv
+import json
+from itertools import islice
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from vehicles.models import Vehicle
+from yatra_backend import cache
+
+User = get_user_model()
+
+USER_FIELDS = ('username', 'email', 'first_name', 'last_name', 'aadhar_number', 'license_number', 'phone_number')
+VEHICLE_FIELDS = ('owner_aadhar', 'vehicle_type', 'plate_number', 'model_name')
+
+
+def field_errors(instance, exclude=()):
+    """The model's field checks (lengths, formats, choices) as one failure
+    reason, or None: a value the column cannot hold would otherwise fail
+    the whole batch's INSERT."""
+    try:
+        instance.clean_fields(exclude=exclude)
+    except ValidationError as exc:
+        return '; '.join(f'{field}: {" ".join(messages)}' for field, messages in exc.message_dict.items())
+    return None
+
+
+def clean_row(row):
+    return {key: str(value).strip() if value is not None else '' for key, value in row.items()}
+
+
+def read_rows(path, fmt):
+    with open(path, newline='', encoding='utf-8') as handle:
+        if fmt == 'csv':
+            yield from csv.DictReader(handle)
+        else:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class Command(BaseCommand):
+    help = 'Stream partner-agency registrations (users or vehicles) from CSV/NDJSON into the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=['users', 'vehicles'])
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: <path>.checkpoint)')
+        parser.add_argument('--resume', action='store_true', help='Skip rows committed by a previous run')
+        parser.add_argument('--errors', help='Write rejected rows with reasons to this NDJSON file')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'{path} does not exist')
+        fmt = options['format'] or ('csv' if path.suffix.lower() == '.csv' else 'ndjson')
+        checkpoint = Path(options['checkpoint'] or f'{path}.checkpoint')
+        batch_size = options['batch_size']
+
+        done = 0
+        if options['resume'] and checkpoint.exists():
+            done = int(checkpoint.read_text().strip() or 0)
+            self.stdout.write(f'Resuming after row {done}')
+
+        importer = self.import_users if options['kind'] == 'users' else self.import_vehicles
+        errors = open(options['errors'], 'a', encoding='utf-8') if options['errors'] else None
+        rows = islice(read_rows(path, fmt), done, None)
+        created = rejected = 0
+        try:
+            while True:
+                batch = [clean_row(row) for row in islice(rows, batch_size)]
+                if not batch:
+                    break
+                with transaction.atomic():
+                    inserted, failures = importer(batch)
+                created += inserted
+                rejected += len(failures)
+                done += len(batch)
+                checkpoint.write_text(str(done))
+                if errors:
+                    for row, reason in failures:
+                        errors.write(json.dumps({'row': row, 'error': reason}) + '\n')
+                self.stdout.write(f'{done} rows read, {created} created, {rejected} rejected')
+        finally:
+            if errors:
+                errors.close()
+
+        self.stdout.write(self.style.SUCCESS(f'Import finished: {created} created, {rejected} rejected'))
+
+    def import_users(self, batch):
+        existing = {
+            field: set(User.objects.filter(**{f'{field}__in': [row.get(field) for row in batch]})
+                       .values_list(field, flat=True))
+            for field in ('username', 'email', 'aadhar_number', 'license_number')
+        }
+
+        users, failures = [], []
+        for row in batch:
+            missing = [field for field in USER_FIELDS if not row.get(field)]
+            if missing:
+                failures.append((row, f'missing {", ".join(missing)}'))
+                continue
+            user = User(**{field: row[field] for field in USER_FIELDS})
+            # The password is set below, after the cheaper checks.
+            error = field_errors(user, exclude=['password'])
+            if error:
+                failures.append((row, error))
+                continue
+            duplicate = next((field for field in existing if row[field] in existing[field]), None)
+            if duplicate:
+                failures.append((row, f'{duplicate} already registered'))
+                continue
+            for field in existing:
+                existing[field].add(row[field])
+
+            # Plain passwords are hashed here, which dominates the run time;
+            # partners should send password_hash or leave both empty.
+            if row.get('password_hash'):
+                user.password = row['password_hash']
+            elif row.get('password'):
+                user.password = make_password(row['password'])
+            else:
+                user.password = make_password(None)
+            users.append(user)
+
+        User.objects.bulk_create(users)
+        return len(users), failures
+
+    def import_vehicles(self, batch):
+        owners = dict(
+            User.objects.filter(aadhar_number__in=[row.get('owner_aadhar') for row in batch])
+            .values_list('aadhar_number', 'id')
+        )
+        existing = set(
+            Vehicle.objects.filter(plate_number__in=[row.get('plate_number') for row in batch])
+            .values_list('plate_number', flat=True)
+        )
+
+        vehicles, failures = [], []
+        for row in batch:
+            missing = [field for field in VEHICLE_FIELDS if not row.get(field)]
+            if missing:
+                failures.append((row, f'missing {", ".join(missing)}'))
+                continue
+            if row['vehicle_type'] not in Vehicle.CAPACITY_BY_TYPE:
+                failures.append((row, f'unknown vehicle type {row["vehicle_type"]}'))
+                continue
+            if row['owner_aadhar'] not in owners:
+                failures.append((row, 'owner not registered'))
+                continue
+            vehicle = Vehicle(
+                user_id=owners[row['owner_aadhar']],
+                vehicle_type=row['vehicle_type'],
+                plate_number=row['plate_number'],
+                model_name=row['model_name'],
+                max_capacity=Vehicle.CAPACITY_BY_TYPE[row['vehicle_type']],
+            )
+            # The owner was just looked up; skip the per-row FK query.
+            error = field_errors(vehicle, exclude=['user'])
+            if error:
+                failures.append((row, error))
+                continue
+            if row['plate_number'] in existing:
+                failures.append((row, 'plate_number already registered'))
+                continue
+            existing.add(row['plate_number'])
+            vehicles.append(vehicle)
+
+        Vehicle.objects.bulk_create(vehicles)
+        cache.bump_many(cache.VEHICLES, [vehicle.user_id for vehicle in vehicles])
+        return len(vehicles), failures
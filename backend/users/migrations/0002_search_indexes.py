@@ -0,0 +1,38 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:11
+
+from django.db import migrations, models
+
+FULLTEXT_INDEX = 'user_name_email_ft'
+
+
+def add_fulltext_index(apps, schema_editor):
+    # Only MySQL has FULLTEXT; users.search falls back to prefix lookups.
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute(
+            f'CREATE FULLTEXT INDEX {FULLTEXT_INDEX} ON users_user (first_name, last_name, email)'
+        )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute(f'DROP INDEX {FULLTEXT_INDEX} ON users_user')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['email'], name='user_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['phone_number'], name='user_phone_idx'),
+        ),
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+    ]
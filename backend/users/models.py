@@ -18,5 +18,13 @@ class User(AbstractUser):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
 
+    class Meta(AbstractUser.Meta):
+        # Lookups used by users.search; names and email also get a MySQL
+        # full-text index in migration 0002.
+        indexes = [
+            models.Index(fields=['email'], name='user_email_idx'),
+            models.Index(fields=['phone_number'], name='user_phone_idx'),
+        ]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.email})" 
\ No newline at end of file
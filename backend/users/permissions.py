@@ -0,0 +1,6 @@
+from rest_framework import permissions
+
+
+class IsAdmin(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated and request.user.is_admin)
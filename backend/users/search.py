@@ -0,0 +1,131 @@
+"""Indexed user lookup for checkpoints, the admin and the search API.
+
+The query's shape picks one index instead of ``icontains`` over every
+column: Aadhar and phone numbers match exactly when complete and by
+prefix otherwise, license numbers and usernames by prefix, emails exactly
+or by prefix, and words against the MySQL full-text index on names and
+email. Each lookup is its own ``LIMIT``-ed query and results are merged
+in Python, so on MySQL no search scans or counts the table; callers get
+``has_more`` instead of a total. Other databases match name words with a
+slower scan, which is enough for development.
+"""
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.paginator import Paginator
+from django.db import connection, models
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+User = get_user_model()
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+# Words shorter than InnoDB's default innodb_ft_min_token_size are not indexed.
+FULLTEXT_MIN_WORD = 3
+# Identity-number prefixes shorter than this would match too much to help.
+MIN_PREFIX = 3
+
+AADHAR_LENGTH = 12
+PHONE_LENGTH = 10
+
+
+class Match(models.Func):
+    """MySQL ``MATCH (...) AGAINST (... IN BOOLEAN MODE)``; relevance > 0
+    when the row matches."""
+    output_field = models.FloatField()
+
+    def __init__(self, *columns, query):
+        super().__init__(*columns, models.Value(query))
+
+    def as_sql(self, compiler, connection, **extra_context):
+        *columns, query = self.get_source_expressions()
+        column_sql = [compiler.compile(column)[0] for column in columns]
+        query_sql, params = compiler.compile(query)
+        return f"MATCH ({', '.join(column_sql)}) AGAINST ({query_sql} IN BOOLEAN MODE)", params
+
+
+def _lookups(query):
+    """Querysets to try, most specific first, for one search string."""
+    if not query:
+        return []
+    compact = query.replace(' ', '')
+    if compact.isdigit():
+        if len(compact) == AADHAR_LENGTH:
+            return [User.objects.filter(aadhar_number=compact)]
+        if len(compact) == PHONE_LENGTH:
+            return [User.objects.filter(phone_number=compact), User.objects.filter(aadhar_number__istartswith=compact)]
+        if len(compact) < MIN_PREFIX:
+            return []
+        return [
+            User.objects.filter(aadhar_number__istartswith=compact).order_by('aadhar_number'),
+            User.objects.filter(phone_number__istartswith=compact).order_by('phone_number'),
+            User.objects.filter(license_number__istartswith=compact).order_by('license_number'),
+        ]
+    if '@' in query:
+        return [
+            User.objects.filter(email__iexact=query),
+            User.objects.filter(email__istartswith=query).order_by('email'),
+        ]
+    lookups = []
+    if ' ' not in query and any(char.isdigit() for char in query) and len(query) >= MIN_PREFIX:
+        lookups.append(User.objects.filter(license_number__istartswith=query).order_by('license_number'))
+    if ' ' not in query:
+        lookups.append(User.objects.filter(username__istartswith=query).order_by('username'))
+    words = re.findall(r'\w+', query)
+    if connection.vendor == 'mysql':
+        indexed = [word for word in words if len(word) >= FULLTEXT_MIN_WORD]
+        if indexed:
+            relevance = Match('first_name', 'last_name', 'email', query=' '.join(f'+{word}*' for word in indexed))
+            lookups.append(
+                User.objects.alias(relevance=relevance).filter(relevance__gt=0).order_by('-relevance', 'pk')
+            )
+    elif words:
+        name_matches = Q()
+        for word in words:
+            name_matches &= (
+                Q(first_name__istartswith=word) | Q(first_name__icontains=f' {word}')
+                | Q(last_name__istartswith=word) | Q(last_name__icontains=f' {word}')
+                | Q(email__istartswith=word)
+            )
+        lookups.append(User.objects.filter(name_matches).order_by('last_name', 'first_name', 'pk'))
+    return lookups
+
+
+def search_ids(query, limit=DEFAULT_LIMIT):
+    """Up to ``limit`` matching user ids, best first, and whether more
+    matched."""
+    query = ' '.join((query or '').split())
+    ids = []
+    for lookup in _lookups(query):
+        wanted = limit + 1 - len(ids)
+        for pk in lookup.exclude(pk__in=ids).values_list('pk', flat=True)[:wanted]:
+            ids.append(pk)
+        if len(ids) > limit:
+            break
+    return ids[:limit], len(ids) > limit
+
+
+def estimated_count(model):
+    """Row count from table statistics on MySQL, where COUNT(*) scans the
+    whole table; an exact count elsewhere."""
+    if connection.vendor == 'mysql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s',
+                [model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] is not None:
+            return row[0]
+    return model._default_manager.count()
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that sizes an unfiltered table from its statistics."""
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            return estimated_count(self.object_list.model)
+        return super().count
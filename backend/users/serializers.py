@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from yatra_backend.fast_serializers import RowSerializer
 
 User = get_user_model()
 
@@ -28,4 +29,7 @@ class UserSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         validated_data.pop('password2')
         user = User.objects.create_user(**validated_data)
-        return user 
\ No newline at end of file
+        return user
+
+
+user_rows = RowSerializer(UserSerializer)
@@ -0,0 +1,167 @@
+import csv
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+from vehicles.models import Vehicle
+from .authentication import SignedTokenAuthentication, issue_token, user_cache
+from .models import User
+
+USER_ROW = {
+    'username': 'pilgrim', 'email': 'pilgrim@example.com', 'first_name': 'Asha', 'last_name': 'Verma',
+    'aadhar_number': '123456789012', 'license_number': 'DL0420240001', 'phone_number': '9876543210',
+    'password_hash': '',
+}
+
+
+class ImportRegistrationsTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def run_import(self, kind, rows):
+        path = self.directory / f'{kind}.csv'
+        with open(path, 'w', newline='', encoding='utf-8') as handle:
+            writer = csv.DictWriter(handle, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        errors = self.directory / f'{kind}.errors.ndjson'
+        call_command('import_registrations', kind, str(path), errors=str(errors), stdout=StringIO())
+        return [json.loads(line) for line in errors.read_text().splitlines()]
+
+    def test_invalid_rows_are_rejected_without_failing_the_batch(self):
+        rows = [
+            USER_ROW,
+            {**USER_ROW, 'username': 'long', 'aadhar_number': '123456789013', 'license_number': 'X' * 21},
+            {**USER_ROW, 'username': 'phone', 'aadhar_number': '123456789014', 'phone_number': '98765'},
+            {**USER_ROW, 'username': 'pilgrim2', 'email': 'other@example.com', 'license_number': 'DL2'},
+        ]
+        errors = self.run_import('users', rows)
+        self.assertEqual(list(User.objects.values_list('username', flat=True)), ['pilgrim'])
+        self.assertEqual([error['row']['username'] for error in errors], ['long', 'phone', 'pilgrim2'])
+        self.assertIn('license_number', errors[0]['error'])
+        self.assertIn('phone_number', errors[1]['error'])
+        self.assertEqual(errors[2]['error'], 'aadhar_number already registered')
+
+    def test_vehicle_fields_are_validated(self):
+        self.run_import('users', [USER_ROW])
+        vehicle = {'owner_aadhar': '123456789012', 'vehicle_type': 'TR', 'plate_number': 'UP32AB1234',
+                   'model_name': 'Tempo'}
+        errors = self.run_import('vehicles', [
+            vehicle,
+            {**vehicle, 'plate_number': 'UP32' * 6},
+            {**vehicle, 'model_name': 'M' * 101, 'plate_number': 'UP32AB1235'},
+        ])
+        self.assertEqual(list(Vehicle.objects.values_list('plate_number', 'max_capacity')), [('UP32AB1234', 15)])
+        self.assertEqual([error['error'].split(':')[0] for error in errors], ['plate_number', 'model_name'])
+
+
+class TokenAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.user = User.objects.create_user(
+            username='pilgrim', email='pilgrim@example.com', password='bench-Pass-2024',
+            aadhar_number='123456789012', license_number='DL0420240001', phone_number='9876543210',
+        )
+        self.authentication = SignedTokenAuthentication()
+
+    def test_login_token_authenticates_requests(self):
+        response = APIClient().post(
+            '/api/users/login/', {'email': 'pilgrim@example.com', 'password': 'bench-Pass-2024'}, format='json',
+        )
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {response.json()["token"]}')
+        self.assertEqual(client.get('/api/users/me/').json()['username'], 'pilgrim')
+        self.assertEqual(APIClient().get('/api/users/me/').status_code, 401)
+
+    def test_resolved_user_is_reused_without_queries(self):
+        token = issue_token(self.user)
+        self.authentication.authenticate_token(token)
+        with self.assertNumQueries(0):
+            user, _ = self.authentication.authenticate_token(token)
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_password_change_revokes_tokens(self):
+        token = issue_token(self.user)
+        self.user.set_password('new-Pass-2024')
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.authenticate_token(token)
+
+    def test_tampered_and_expired_tokens_are_rejected(self):
+        token = issue_token(self.user)
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.authenticate_token(token[:-2] + ('AA' if token[-2:] != 'AA' else 'BB'))
+        with override_settings(AUTH_TOKEN_MAX_AGE=-1), self.assertRaisesMessage(AuthenticationFailed, 'expired'):
+            self.authentication.authenticate_token(token)
+
+
+class MeCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='pilgrim', password='bench-Pass-2024', aadhar_number='123456789012',
+            license_number='DL0420240001', phone_number='9876543210',
+        )
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {issue_token(self.user)}')
+
+    def test_repeat_reads_come_from_the_cache(self):
+        self.client.get('/api/users/me/')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/users/me/').json()['username'], 'pilgrim')
+
+    def test_profile_change_is_served_once_committed(self):
+        self.client.get('/api/users/me/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = 'Asha'
+            self.user.save()
+        self.assertEqual(self.client.get('/api/users/me/').json()['first_name'], 'Asha')
+
+
+class UserSearchTests(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(
+                username=f'pilgrim{index}', email=f'pilgrim{index}@example.com', password='bench-Pass-2024',
+                first_name=first_name, last_name=last_name, aadhar_number=f'12345678901{index}',
+                license_number=f'DL042024000{index}', phone_number=f'987654321{index}',
+            )
+            for index, (first_name, last_name) in enumerate([('Asha', 'Verma'), ('Ravi', 'Verma'), ('Asha', 'Rao')])
+        ]
+        admin = User.objects.create_user(
+            username='control', password='bench-Pass-2024', aadhar_number='999999999999',
+            license_number='DL0420249999', phone_number='9999999999', is_admin=True,
+        )
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {issue_token(admin)}')
+
+    def found(self, query, **params):
+        response = self.client.get('/api/users/search/', {'q': query, **params})
+        return [row['username'] for row in response.json()['results']], response.json()['has_more']
+
+    def test_identity_numbers_match_exactly_or_by_prefix(self):
+        self.assertEqual(self.found('123456789011'), (['pilgrim1'], False))
+        self.assertEqual(self.found('9876543212'), (['pilgrim2'], False))
+        self.assertEqual(self.found('DL0420240000'), (['pilgrim0'], False))
+        self.assertEqual(self.found('12'), ([], False))
+
+    def test_names_and_emails_are_found(self):
+        self.assertEqual(self.found('asha verma'), (['pilgrim0'], False))
+        self.assertEqual(self.found('pilgrim2@example.com'), (['pilgrim2'], False))
+
+    def test_results_are_cut_at_the_limit(self):
+        self.assertEqual(self.found('verma', limit=1), (['pilgrim0'], True))
+
+    def test_search_is_admin_only(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {issue_token(self.users[0])}')
+        self.assertEqual(client.get('/api/users/search/', {'q': 'asha'}).status_code, 403)
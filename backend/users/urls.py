@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import UserViewSet, login_view
@@ -8,4 +9,9 @@ router.register(r'', UserViewSet)
 urlpatterns = [
     path('login/', login_view, name='login'),
     path('', include(router.urls)),
-] 
\ No newline at end of file
+]
+
+if settings.ASYNC_READ_VIEWS:
+    from .async_views import me
+
+    urlpatterns = [path('me/', me)] + urlpatterns
@@ -2,7 +2,13 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action, api_view, permission_classes, authentication_classes
 from django.contrib.auth import get_user_model, authenticate, login
-from .serializers import UserSerializer
+from django.conf import settings
+from yatra_backend import cache
+from yatra_backend.admission import AdmissionThrottle
+from . import search
+from .authentication import issue_token
+from .permissions import IsAdmin
+from .serializers import UserSerializer, user_rows
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from rest_framework.permissions import AllowAny
@@ -20,12 +26,38 @@ class UserViewSet(viewsets.ModelViewSet):
             return [permissions.AllowAny()]
         if self.action == 'register':
             return [permissions.AllowAny()]
+        if self.action == 'search':
+            return [IsAdmin()]
         return [permissions.IsAuthenticated()]
 
+    def get_throttles(self):
+        # Password validation and hashing make sign-ups the costliest request.
+        if self.action in ('create', 'register'):
+            return [AdmissionThrottle('register')]
+        return super().get_throttles()
+
     @action(detail=False, methods=['get'])
     def me(self, request):
-        serializer = self.get_serializer(request.user)
-        return Response(serializer.data)
+        # request.user may come from another worker's token cache; what is
+        # cached under the current version must be read fresh.
+        data = cache.cached_data(
+            cache.ME, request, lambda: self.get_serializer(User.objects.get(pk=request.user.pk)).data,
+        )
+        return Response(data)
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        try:
+            limit = min(max(int(request.query_params.get('limit', search.DEFAULT_LIMIT)), 1), search.MAX_LIMIT)
+        except ValueError:
+            return Response({'detail': 'limit must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        ids, has_more = search.search_ids(request.query_params.get('q', ''), limit)
+        rows = {
+            row['id']: row
+            for row in user_rows.serialize(User.objects.filter(pk__in=ids).values(*user_rows.columns))
+        }
+        # No total: has_more says whether the result list was cut at limit.
+        return Response({'results': [rows[pk] for pk in ids if pk in rows], 'has_more': has_more})
 
     @method_decorator(csrf_exempt)
     @action(detail=False, methods=['post'])
@@ -70,7 +102,9 @@ def login_view(request):
         
         return Response({
             'detail': 'Login successful',
-            'user': user_data
+            'user': user_data,
+            'token': issue_token(user),
+            'expires_in': settings.AUTH_TOKEN_MAX_AGE,
         })
     else:
         return Response(
@@ -0,0 +1,39 @@
+from rest_framework import exceptions
+from yatra_backend import cache, sync
+from yatra_backend.async_api import async_read_view, paginate, render
+from .models import Vehicle
+from .serializers import VehicleSerializer, vehicle_rows
+from .views import VehicleViewSet
+
+
+async def read_vehicle_list(request, user):
+    conditions = await sync.alist_conditions(cache.VEHICLES, user, request)
+    response = sync.not_modified(request, *conditions)
+    if response is not None:
+        return response
+    queryset = Vehicle.objects.filter(user=user).order_by('id').values(*vehicle_rows.columns)
+    return sync.add_validators(render(await cache.acached_data(
+        cache.VEHICLES, user, request, lambda: paginate(request, queryset, vehicle_rows.serialize),
+    )), *conditions)
+
+
+async def read_vehicle_detail(request, user, pk):
+    try:
+        vehicle = await Vehicle.objects.filter(user=user).aget(pk=pk)
+    except Vehicle.DoesNotExist:
+        raise exceptions.NotFound('No Vehicle matches the given query.')
+    conditions = sync.detail_conditions(vehicle, request)
+    response = sync.not_modified(request, *conditions)
+    if response is not None:
+        return response
+    return sync.add_validators(render(VehicleSerializer(vehicle).data), *conditions)
+
+
+vehicle_list = async_read_view(
+    read_vehicle_list, VehicleViewSet.as_view({'get': 'list', 'post': 'create'}),
+)
+vehicle_detail = async_read_view(
+    read_vehicle_detail,
+    VehicleViewSet.as_view({'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}),
+    replica=True,
+)
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vehicles', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['user', 'updated_at'], name='vehicle_user_updated_idx'),
+        ),
+    ]
@@ -9,6 +9,13 @@ class Vehicle(models.Model):
         ('TR', 'Traveler'),
     ]
 
+    CAPACITY_BY_TYPE = {
+        '2W': 2,
+        '4W': 5,
+        '8W': 8,
+        'TR': 15,
+    }
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='vehicles')
     vehicle_type = models.CharField(max_length=2, choices=VEHICLE_TYPES)
     plate_number = models.CharField(max_length=20, unique=True)
@@ -17,17 +24,15 @@ class Vehicle(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # Delta sync (changes?since=) reads a user's vehicles by updated_at.
+        indexes = [models.Index(fields=['user', 'updated_at'], name='vehicle_user_updated_idx')]
+
     def __str__(self):
         return f"{self.get_vehicle_type_display()} - {self.plate_number}"
 
     def save(self, *args, **kwargs):
         # Set max capacity based on vehicle type
-        if self.vehicle_type == '2W':
-            self.max_capacity = 2
-        elif self.vehicle_type == '4W':
-            self.max_capacity = 5
-        elif self.vehicle_type == '8W':
-            self.max_capacity = 8
-        elif self.vehicle_type == 'TR':
-            self.max_capacity = 15
+        if self.vehicle_type in self.CAPACITY_BY_TYPE:
+            self.max_capacity = self.CAPACITY_BY_TYPE[self.vehicle_type]
         super().save(*args, **kwargs) 
\ No newline at end of file
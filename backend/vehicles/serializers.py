@@ -1,8 +1,12 @@
 from rest_framework import serializers
+from yatra_backend.fast_serializers import RowSerializer
 from .models import Vehicle
  
 class VehicleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Vehicle
         fields = '__all__'
-        read_only_fields = ('user',) 
\ No newline at end of file
+        read_only_fields = ('user',)
+
+
+vehicle_rows = RowSerializer(VehicleSerializer)
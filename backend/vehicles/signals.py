@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from yatra_backend import cache
+from yatra_backend.models import Tombstone
+from .models import Vehicle
+
+
+@receiver(post_save, sender=Vehicle)
+@receiver(post_delete, sender=Vehicle)
+def invalidate_vehicle_list(sender, instance, **kwargs):
+    cache.bump(cache.VEHICLES, instance.user_id)
+
+
+@receiver(post_delete, sender=Vehicle)
+def record_vehicle_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.record(Tombstone.VEHICLE, [(instance.pk, instance.user_id)])
@@ -0,0 +1,60 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from users.authentication import issue_token
+from users.models import User
+from .models import Vehicle
+
+
+class VehicleTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='pilgrim', password='bench-Pass-2024', aadhar_number='123456789012',
+            license_number='DL0420240001', phone_number='9876543210',
+        )
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {issue_token(self.user)}')
+
+    def vehicle(self, plate_number='UP32AB1234'):
+        return Vehicle.objects.create(
+            user=self.user, vehicle_type='TR', plate_number=plate_number, model_name='Tempo', max_capacity=15,
+        )
+
+    def plates(self, response):
+        return sorted(vehicle['plate_number'] for vehicle in response.json()['results'])
+
+
+class VehicleListCacheTests(VehicleTestCase):
+    def test_new_vehicle_is_listed_once_committed(self):
+        self.vehicle()
+        self.assertEqual(self.plates(self.client.get('/api/vehicles/')), ['UP32AB1234'])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/vehicles/', {
+                'vehicle_type': '4W', 'plate_number': 'UP32AB1235', 'model_name': 'Swift', 'max_capacity': 4,
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.plates(self.client.get('/api/vehicles/')), ['UP32AB1234', 'UP32AB1235'])
+
+    def test_repeat_lists_come_from_the_cache(self):
+        self.vehicle()
+        self.client.get('/api/vehicles/')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.plates(self.client.get('/api/vehicles/')), ['UP32AB1234'])
+
+
+class VehicleSyncTests(VehicleTestCase):
+    def test_deleted_vehicle_is_reported(self):
+        kept, deleted = self.vehicle(), self.vehicle('UP32AB1235')
+        deleted_id = deleted.pk
+        first = self.client.get('/api/vehicles/changes/').json()
+        self.assertEqual(sorted(row['id'] for row in first['changed']), [kept.pk, deleted_id])
+        deleted.delete()
+        page = self.client.get('/api/vehicles/changes/', {'since': first['cursor']}).json()
+        self.assertEqual(page['deleted'], [deleted_id])
+        self.assertEqual([row['id'] for row in page['changed']], [kept.pk])
+
+    def test_unchanged_list_is_not_modified(self):
+        self.vehicle()
+        etag = self.client.get('/api/vehicles/')['ETag']
+        self.assertEqual(self.client.get('/api/vehicles/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import VehicleViewSet
@@ -7,4 +8,12 @@ router.register(r'', VehicleViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
-] 
\ No newline at end of file
+]
+
+if settings.ASYNC_READ_VIEWS:
+    from .async_views import vehicle_detail, vehicle_list
+
+    urlpatterns = [
+        path('', vehicle_list),
+        path('<int:pk>/', vehicle_detail),
+    ] + urlpatterns
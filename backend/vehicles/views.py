@@ -1,20 +1,50 @@
 from rest_framework import viewsets, permissions
 from .models import Vehicle
-from .serializers import VehicleSerializer
+from .serializers import VehicleSerializer, vehicle_rows
 from rest_framework.authentication import SessionAuthentication, BasicAuthentication
-from rest_framework.decorators import authentication_classes
+from rest_framework.decorators import action, authentication_classes
+from rest_framework.response import Response
+from yatra_backend import cache, sync
+from yatra_backend.db_router import ReplicaReadMixin
+from yatra_backend.fast_serializers import FastListMixin
+from yatra_backend.models import Tombstone
+from users.authentication import SignedTokenAuthentication
 
-@authentication_classes([SessionAuthentication, BasicAuthentication])
-class VehicleViewSet(viewsets.ModelViewSet):
+@authentication_classes([SignedTokenAuthentication, SessionAuthentication, BasicAuthentication])
+class VehicleViewSet(ReplicaReadMixin, FastListMixin, viewsets.ModelViewSet):
     queryset = Vehicle.objects.all()
     serializer_class = VehicleSerializer
+    row_serializer = vehicle_rows
+    # Lists are cached and tagged under cache version stamps and changes
+    # hands out time cursors; a lagging replica would file stale rows under
+    # them for good.
+    primary_actions = ('list', 'changes')
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Vehicle.objects.filter(user=self.request.user)
+        return Vehicle.objects.filter(user=self.request.user).order_by('id')
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    def list(self, request, *args, **kwargs):
+        return sync.conditional(
+            request, sync.list_conditions(cache.VEHICLES, request.user, request),
+            lambda: Response(cache.cached_data(cache.VEHICLES, request, lambda: self.list_data(request))),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        return sync.conditional(
+            request, sync.detail_conditions(instance, request), lambda: Response(self.get_serializer(instance).data),
+        )
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        return Response(sync.changes(
+            self.get_queryset(), vehicle_rows, Tombstone.VEHICLE, request.user.pk,
+            request.query_params.get('since'), sync.page_limit(request),
+        ))
+
     def create(self, request, *args, **kwargs):
         return super().create(request, *args, **kwargs) 
\ No newline at end of file
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import VideoAnalysis
+
+@admin.register(VideoAnalysis)
+class VideoAnalysisAdmin(admin.ModelAdmin):
+    list_display = ('filename', 'user', 'start_location', 'end_location', 'status', 'total_count', 'created_at')
+    list_filter = ('status', 'end_location')
+    list_select_related = ('user',)
+    readonly_fields = ('received_size', 'vehicle_counts', 'total_count', 'video_length', 'completed_at', 'error')
@@ -0,0 +1,40 @@
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand
+from videos.processing import claim_next_job, fail_stale_jobs, make_pool, process
+
+
+class Command(BaseCommand):
+    help = 'Process queued dashcam uploads and store per-class vehicle counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll-interval', type=float, default=5.0)
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty')
+
+    def handle(self, *args, **options):
+        pool = make_pool()
+        try:
+            while True:
+                stale = fail_stale_jobs()
+                if stale:
+                    self.stdout.write(self.style.WARNING(f'{stale} abandoned jobs marked failed'))
+                analysis = claim_next_job()
+                if analysis is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+                self.stdout.write(f'Processing {analysis.pk} ({analysis.filename})')
+                try:
+                    analysis = process(analysis, pool)
+                except BrokenProcessPool:
+                    # A dead worker leaves the pool unusable for later jobs.
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = make_pool()
+                if analysis.status == 'completed':
+                    self.stdout.write(self.style.SUCCESS(f'{analysis.pk}: {analysis.total_count} vehicles'))
+                else:
+                    self.stdout.write(self.style.ERROR(f'{analysis.pk} failed: {analysis.error}'))
+        finally:
+            pool.shutdown()
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.2 on 2026-10-18 11:40
+
+import django.db.models.deletion
+import uuid
+import videos.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoAnalysis',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('start_location', models.CharField(max_length=100)),
+                ('end_location', models.CharField(choices=[('KM', 'Kumbh Mela'), ('BD', 'Badrinath'), ('JG', 'Jagannath Yatra'), ('UJ', 'Ujjain'), ('KD', 'Kedarnath Mandir')], max_length=2)),
+                ('filename', models.CharField(max_length=255)),
+                ('video', models.FileField(blank=True, upload_to='dashcam/')),
+                ('total_size', models.PositiveBigIntegerField()),
+                ('received_size', models.PositiveBigIntegerField(default=0)),
+                ('status', models.CharField(choices=[('uploading', 'Uploading'), ('queued', 'Queued'), ('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed')], default='uploading', max_length=10)),
+                ('error', models.TextField(blank=True)),
+                ('video_length', models.FloatField(blank=True, null=True)),
+                ('vehicle_counts', models.JSONField(default=videos.models.empty_counts)),
+                ('total_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='video_analyses', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='video_status_created_idx'), models.Index(fields=['start_location', 'end_location'], name='video_route_idx')],
+            },
+        ),
+    ]
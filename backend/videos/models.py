@@ -0,0 +1,47 @@
+import uuid
+
+from django.db import models
+from journeys.models import Journey
+from users.models import User
+
+VEHICLE_CLASSES = ('car', 'bus', 'truck', 'motorcycle', 'bicycle', 'auto', 'other')
+
+
+def empty_counts():
+    return dict.fromkeys(VEHICLE_CLASSES, 0)
+
+
+class VideoAnalysis(models.Model):
+    STATUSES = [
+        ('uploading', 'Uploading'),
+        ('queued', 'Queued'),
+        ('processing', 'Processing'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='video_analyses')
+    start_location = models.CharField(max_length=100)
+    end_location = models.CharField(max_length=2, choices=Journey.LOCATIONS)
+    filename = models.CharField(max_length=255)
+    video = models.FileField(upload_to='dashcam/', blank=True)
+    total_size = models.PositiveBigIntegerField()
+    received_size = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUSES, default='uploading')
+    error = models.TextField(blank=True)
+    video_length = models.FloatField(null=True, blank=True)
+    vehicle_counts = models.JSONField(default=empty_counts)
+    total_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='video_status_created_idx'),
+            models.Index(fields=['start_location', 'end_location'], name='video_route_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.get_status_display()})"
@@ -0,0 +1,136 @@
+"""Dashcam processing pipeline.
+
+Each queued video is split into frame ranges that are decoded and counted in
+parallel by a process pool; the per-segment counts are summed and stored on
+the VideoAnalysis row. A job whose worker process dies is failed and the
+broken pool replaced; one left processing by a worker that was killed is
+failed after ``DASHCAM_STALE_JOB_SECONDS``.
+"""
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from .models import VEHICLE_CLASSES, VideoAnalysis
+
+
+def probe(path):
+    import cv2
+
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError('Video could not be decoded.')
+    frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = capture.get(cv2.CAP_PROP_FPS) or 0
+    capture.release()
+    return frames, fps
+
+
+def read_frames(path, start, stop, stride):
+    import cv2
+
+    capture = cv2.VideoCapture(path)
+    capture.set(cv2.CAP_PROP_POS_FRAMES, start)
+    try:
+        for index in range(start, stop):
+            ok = capture.grab()
+            if not ok:
+                break
+            if (index - start) % stride:
+                continue
+            ok, frame = capture.retrieve()
+            if ok:
+                yield frame
+    finally:
+        capture.release()
+
+
+def count_segment(path, start, stop, stride, counter_path):
+    # Runs in a worker process: each segment gets its own counter instance.
+    counter = import_string(counter_path)()
+    return counter.count(read_frames(path, start, stop, stride))
+
+
+def segments(frames, workers, warmup):
+    size = max(frames // workers, 1)
+    for start in range(0, frames, size):
+        # Back up a little so the background model has settled by the time
+        # the segment's own frames arrive.
+        yield max(start - warmup, 0), min(start + size, frames)
+
+
+def claim_next_job():
+    with transaction.atomic():
+        analysis = (
+            VideoAnalysis.objects.select_for_update(skip_locked=True)
+            .filter(status='queued')
+            .order_by('created_at')
+            .first()
+        )
+        if analysis is None:
+            return None
+        analysis.status = 'processing'
+        analysis.save(update_fields=['status', 'updated_at'])
+    return analysis
+
+
+def fail_stale_jobs():
+    """Fail jobs left processing by a worker that stopped mid-job."""
+    cutoff = timezone.now() - timedelta(seconds=settings.DASHCAM_STALE_JOB_SECONDS)
+    return VideoAnalysis.objects.filter(status='processing', updated_at__lt=cutoff).update(
+        status='failed', error='The worker stopped while processing this video.', updated_at=timezone.now(),
+    )
+
+
+def _fail(analysis, error):
+    analysis.status = 'failed'
+    analysis.error = error
+    analysis.save(update_fields=['status', 'error', 'updated_at'])
+
+
+def process(analysis, pool):
+    """Count the vehicles in a claimed job. Raises BrokenProcessPool, after
+    failing the job, when a worker process died: the pool is unusable."""
+    path = default_storage.path(analysis.video.name)
+    counter_path = settings.DASHCAM_VEHICLE_COUNTER
+    stride = settings.DASHCAM_FRAME_STRIDE
+    warmup = getattr(import_string(counter_path), 'WARMUP_FRAMES', 0) * stride
+    try:
+        frames, fps = probe(path)
+        futures = [
+            pool.submit(count_segment, path, start, stop, stride, counter_path)
+            for start, stop in segments(frames, settings.DASHCAM_WORKERS, warmup)
+        ]
+        totals = Counter(dict.fromkeys(VEHICLE_CLASSES, 0))
+        for future in futures:
+            totals.update(future.result())
+    except BrokenProcessPool:
+        _fail(analysis, 'A worker process died while counting vehicles.')
+        raise
+    except Exception as exc:
+        _fail(analysis, str(exc))
+        return analysis
+    except BaseException:
+        # Interrupted (Ctrl-C): hand the job back to the queue.
+        analysis.status = 'queued'
+        analysis.save(update_fields=['status', 'updated_at'])
+        raise
+
+    analysis.vehicle_counts = dict(totals)
+    analysis.total_count = sum(totals.values())
+    analysis.video_length = frames / fps if fps else None
+    analysis.status = 'completed'
+    analysis.completed_at = timezone.now()
+    analysis.save(update_fields=[
+        'vehicle_counts', 'total_count', 'video_length', 'status', 'completed_at', 'updated_at',
+    ])
+    return analysis
+
+
+def make_pool():
+    return ProcessPoolExecutor(max_workers=settings.DASHCAM_WORKERS)
@@ -0,0 +1,20 @@
+from django.conf import settings
+from rest_framework import serializers
+from .models import VideoAnalysis
+
+
+class VideoAnalysisSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = VideoAnalysis
+        fields = ('id', 'user', 'start_location', 'end_location', 'filename', 'total_size', 'received_size',
+                  'status', 'error', 'video_length', 'vehicle_counts', 'total_count',
+                  'created_at', 'updated_at', 'completed_at')
+        read_only_fields = ('user', 'received_size', 'status', 'error', 'video_length', 'vehicle_counts',
+                            'total_count', 'completed_at')
+
+    def validate_total_size(self, value):
+        if value == 0 or value > settings.DASHCAM_MAX_UPLOAD_SIZE:
+            raise serializers.ValidationError(
+                f'Video size must be between 1 byte and {settings.DASHCAM_MAX_UPLOAD_SIZE} bytes.'
+            )
+        return value
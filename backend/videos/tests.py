@@ -0,0 +1,76 @@
+import os
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from users.models import User
+from .counters import VehicleCounter
+from .models import VideoAnalysis
+from .processing import fail_stale_jobs
+
+
+class CrashingCounter(VehicleCounter):
+    def count(self, frames):
+        os._exit(1)
+
+
+class FixedCounter(VehicleCounter):
+    def count(self, frames):
+        return {'car': 2}
+
+
+@override_settings(DASHCAM_WORKERS=1)
+@mock.patch('videos.processing.probe', return_value=(10, 5.0))
+class VideoWorkerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='pilgrim', password='bench-Pass-2024', aadhar_number='123456789012',
+            license_number='DL0420240001', phone_number='9876543210',
+        )
+
+    def job(self, status='queued'):
+        return VideoAnalysis.objects.create(
+            user=self.user, start_location='Lucknow', end_location='KM', filename='dashcam.mp4',
+            total_size=10, received_size=10, status=status,
+        )
+
+    def run_worker(self):
+        call_command('run_video_worker', once=True, stdout=StringIO())
+
+    def test_dead_worker_fails_its_job_and_the_pool_is_replaced(self, probe):
+        crashed, counted = self.job(), self.job()
+        counters = iter(['videos.tests.CrashingCounter', 'videos.tests.FixedCounter'])
+
+        def claim():
+            # Each claimed job is counted with the next counter in line.
+            analysis = VideoAnalysis.objects.filter(status='queued').order_by('created_at').first()
+            if analysis is None:
+                return None
+            analysis.status = 'processing'
+            analysis.save()
+            settings_override = override_settings(DASHCAM_VEHICLE_COUNTER=next(counters))
+            settings_override.enable()
+            self.addCleanup(settings_override.disable)
+            return analysis
+
+        with mock.patch('videos.management.commands.run_video_worker.claim_next_job', claim):
+            self.run_worker()
+        crashed.refresh_from_db()
+        counted.refresh_from_db()
+        self.assertEqual(crashed.status, 'failed')
+        self.assertEqual(counted.status, 'completed')
+
+    def test_abandoned_processing_job_is_failed(self, probe):
+        abandoned, running = self.job(status='processing'), self.job(status='processing')
+        VideoAnalysis.objects.filter(pk=abandoned.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(fail_stale_jobs(), 1)
+        abandoned.refresh_from_db()
+        running.refresh_from_db()
+        self.assertEqual((abandoned.status, running.status), ('failed', 'processing'))
+
+    def test_counter_must_implement_count(self, probe):
+        with self.assertRaises(TypeError):
+            VehicleCounter()
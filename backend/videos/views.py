@@ -0,0 +1,112 @@
+import os
+import re
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from .models import VideoAnalysis
+from .serializers import VideoAnalysisSerializer
+
+CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+COPY_BLOCK_SIZE = 64 * 1024
+
+
+class VideoAnalysisViewSet(mixins.CreateModelMixin,
+                           mixins.RetrieveModelMixin,
+                           mixins.ListModelMixin,
+                           mixins.DestroyModelMixin,
+                           viewsets.GenericViewSet):
+    queryset = VideoAnalysis.objects.all()
+    serializer_class = VideoAnalysisSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        if self.request.user.is_admin:
+            queryset = VideoAnalysis.objects.all()
+        else:
+            queryset = VideoAnalysis.objects.filter(user=self.request.user)
+        params = self.request.query_params
+        for field in ('start_location', 'end_location', 'status'):
+            if params.get(field):
+                queryset = queryset.filter(**{field: params[field]})
+        return queryset.order_by('-created_at')
+
+    def perform_create(self, serializer):
+        analysis = serializer.save(user=self.request.user)
+        extension = os.path.splitext(analysis.filename)[1].lower()[:10]
+        analysis.video.name = f'dashcam/{analysis.pk}{extension}'
+        analysis.save(update_fields=['video'])
+
+    def perform_destroy(self, instance):
+        if instance.video and default_storage.exists(instance.video.name):
+            default_storage.delete(instance.video.name)
+        instance.delete()
+
+    @action(detail=True, methods=['put'])
+    def chunk(self, request, pk=None):
+        """Append one ``Content-Range`` chunk of the video to disk.
+
+        Chunks must arrive in order; after an interruption the client reads
+        ``received_size`` from the job and resumes from that offset.
+        """
+        analysis = self.get_object()
+        if analysis.status != 'uploading':
+            return Response({'detail': 'Upload is already complete.'}, status=status.HTTP_409_CONFLICT)
+
+        match = CONTENT_RANGE.match(request.headers.get('Content-Range', ''))
+        if not match:
+            return Response(
+                {'detail': 'Content-Range header of the form "bytes start-end/total" is required.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        start, end, total = (int(value) for value in match.groups())
+        length = end - start + 1
+        if total != analysis.total_size or end >= total or length <= 0:
+            return Response({'detail': 'Content-Range does not match the upload.'}, status=status.HTTP_400_BAD_REQUEST)
+        if length > settings.DASHCAM_MAX_CHUNK_SIZE:
+            return Response(
+                {'detail': f'Chunks may be at most {settings.DASHCAM_MAX_CHUNK_SIZE} bytes.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if start != analysis.received_size:
+            return Response(
+                {'detail': 'Unexpected offset.', 'received_size': analysis.received_size},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        path = default_storage.path(analysis.video.name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        written = 0
+        # Copy the request body to disk in small blocks so a chunk is never
+        # held in memory in full.
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as destination:
+            destination.seek(start)
+            while written < length:
+                block = request.stream.read(min(COPY_BLOCK_SIZE, length - written)) if request.stream else b''
+                if not block:
+                    break
+                destination.write(block)
+                written += len(block)
+        if written != length:
+            return Response(
+                {'detail': 'Chunk body is shorter than its Content-Range.', 'received_size': analysis.received_size},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        received_size = end + 1
+        new_status = 'queued' if received_size == analysis.total_size else 'uploading'
+        # Guarded on the old offset so two racing uploads of the same chunk
+        # cannot both advance the upload.
+        advanced = VideoAnalysis.objects.filter(pk=analysis.pk, received_size=start).update(
+            received_size=received_size, status=new_status,
+        )
+        if not advanced:
+            analysis.refresh_from_db()
+            return Response(
+                {'detail': 'Unexpected offset.', 'received_size': analysis.received_size},
+                status=status.HTTP_409_CONFLICT,
+            )
+        analysis.refresh_from_db()
+        return Response(self.get_serializer(analysis).data)
@@ -0,0 +1,89 @@
+"""Admission control for bursty endpoints (registration, booking).
+
+Each endpoint gets a token bucket refilled at ``rate`` per second and
+holding up to ``burst`` tokens, shared by every worker through the cache.
+The bucket is stored as the time its next token frees up (GCRA), so taking
+a token is one atomic ``incr``. A request that finds the bucket empty is
+turned away at once with 429 and a Retry-After saying when a token frees
+up. Requests are never held waiting: a sleeping request would tie up its
+worker thread, which under ASGI is the one thread every sync view shares.
+
+Buckets are configured in ``ADMISSION_BUCKETS`` and built by
+``ADMISSION_BACKEND``, which can be replaced by any class with the same
+``reserve`` method.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+class CacheTokenBucket:
+    def __init__(self, name, rate, burst):
+        self.key = f'admission:{name}'
+        # Milliseconds per token, and how far ahead of now reservations may run.
+        self.interval = max(int(1000 / rate), 1)
+        self.capacity = burst * self.interval
+
+    def reserve(self):
+        """Take a token. Returns ``(True, 0.0)``, or ``(False, seconds until
+        a token is free)`` without taking one."""
+        now = _now_ms()
+        if cache.add(self.key, now + self.interval, None):
+            return True, 0.0
+        try:
+            due = cache.incr(self.key, self.interval)
+        except ValueError:
+            # Evicted between add and incr; start over from an empty bucket.
+            cache.set(self.key, now + self.interval, None)
+            return True, 0.0
+        if due - self.interval < now:
+            # The bucket filled up while idle; restart the schedule from now.
+            due = now + self.interval
+            cache.set(self.key, due, None)
+        delay = (due - now - self.capacity) / 1000
+        if delay <= 0:
+            return True, 0.0
+        try:
+            cache.decr(self.key, self.interval)
+        except ValueError:
+            pass
+        return False, delay
+
+
+_buckets = {}
+
+
+def get_bucket(name):
+    config = settings.ADMISSION_BUCKETS.get(name)
+    if config is None:
+        return None
+    if name not in _buckets:
+        _buckets[name] = import_string(settings.ADMISSION_BACKEND)(name, **config)
+    return _buckets[name]
+
+
+class AdmissionThrottle(BaseThrottle):
+    """DRF throttle that admits requests through the named bucket."""
+
+    def __init__(self, name):
+        self.name = name
+        self.retry_after = None
+
+    def allow_request(self, request, view):
+        bucket = get_bucket(self.name)
+        if bucket is None:
+            return True
+        admitted, seconds = bucket.reserve()
+        if not admitted:
+            self.retry_after = seconds
+        return admitted
+
+    def wait(self):
+        return self.retry_after
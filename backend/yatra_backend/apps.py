@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class YatraBackendConfig(AppConfig):
+    name = 'yatra_backend'
+
+    def ready(self):
+        from . import checks  # noqa: F401
+
+        if settings.WARMUP_ON_STARTUP:
+            from . import warmup
+
+            warmup.run(warmup.MEMORY_STEPS)
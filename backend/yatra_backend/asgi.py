@@ -0,0 +1,30 @@
+"""
+ASGI config for yatra_backend project.
+
+It exposes the ASGI callable as a module-level variable named ``application``
+and enables the async read views (see ``ASYNC_READ_VIEWS``), so a single
+worker can keep many database reads in flight, e.g.::
+
+    uvicorn yatra_backend.asgi:application --workers 4
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
+"""
+
+import os
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatra_backend.settings')
+os.environ.setdefault('ASYNC_READ_VIEWS', '1')
+os.environ.setdefault('WARMUP_ON_STARTUP', '1')
+
+application = get_asgi_application()
+
+if settings.WARMUP_ON_STARTUP:
+    from yatra_backend import warmup
+
+    # Connections are only checked here; workers forked from this process
+    # must open their own.
+    warmup.run(warmup.CONNECTION_STEPS + warmup.DATA_STEPS, close_connections=True)
@@ -0,0 +1,107 @@
+"""Helpers for the async read endpoints served under ASGI.
+
+Only GET requests are handled asynchronously. Authentication still goes
+through the configured DRF authentication classes, in a thread, and any
+request the async view does not handle is passed to the matching DRF
+viewset, so both paths return the same responses.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from .db_router import choose_replica, replica_reads
+from .fast_serializers import FastJSONRenderer
+
+
+def render(data, status_code=status.HTTP_200_OK, headers=None):
+    response = HttpResponse(FastJSONRenderer().render(data), status=status_code, content_type='application/json')
+    for name, value in (headers or {}).items():
+        response[name] = value
+    return response
+
+
+def authenticate(request):
+    authenticators = [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    drf_request = Request(request, authenticators=authenticators)
+    try:
+        return drf_request.user, None
+    except exceptions.APIException as exc:
+        return None, exc
+
+
+def auth_failure(request, exc=None):
+    exc = exc or exceptions.NotAuthenticated()
+    authenticator = api_settings.DEFAULT_AUTHENTICATION_CLASSES[0]()
+    headers = {}
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        header = authenticator.authenticate_header(request)
+        if header:
+            headers['WWW-Authenticate'] = header
+            exc.status_code = status.HTTP_401_UNAUTHORIZED
+        else:
+            exc.status_code = status.HTTP_403_FORBIDDEN
+    return render({'detail': str(exc.detail)}, exc.status_code, headers)
+
+
+def async_read_view(read, fallback, replica=False):
+    """Build a view that answers GET with the coroutine ``read(request, user,
+    **kwargs)`` and sends everything else to the sync DRF ``fallback``.
+
+    ``read`` may return None to hand a GET to the fallback as well, for
+    modes the async path does not implement. With ``replica``, its queries
+    are routed to a read replica.
+    """
+    run_fallback = sync_to_async(fallback)
+
+    async def view(request, *args, **kwargs):
+        if request.method != 'GET':
+            return await run_fallback(request, *args, **kwargs)
+        user, error = await sync_to_async(authenticate)(request)
+        if error is not None:
+            return auth_failure(request, error)
+        if not user or not user.is_authenticated:
+            return auth_failure(request)
+        alias = await sync_to_async(choose_replica)(user) if replica else None
+        try:
+            with replica_reads(alias):
+                response = await read(request, user, *args, **kwargs)
+        except exceptions.APIException as exc:
+            # Field errors keep their shape, as in DRF's exception handler.
+            detail = exc.detail if isinstance(exc.detail, (dict, list)) else {'detail': str(exc.detail)}
+            return render(detail, exc.status_code)
+        if response is None:
+            return await run_fallback(request, *args, **kwargs)
+        return response
+
+    # The DRF fallback enforces CSRF itself for session-authenticated writes.
+    view.csrf_exempt = True
+    return view
+
+
+async def paginate(request, queryset, serialize):
+    """Page-number pagination matching DRF's PageNumberPagination output."""
+    page_size = api_settings.PAGE_SIZE
+    try:
+        page = int(request.GET.get('page', 1))
+        if page < 1:
+            raise ValueError
+    except ValueError:
+        raise exceptions.NotFound('Invalid page.')
+
+    count = await queryset.acount()
+    offset = (page - 1) * page_size
+    if offset and offset >= count:
+        raise exceptions.NotFound('Invalid page.')
+    rows = [row async for row in queryset[offset:offset + page_size]]
+
+    url = request.build_absolute_uri()
+    next_url = replace_query_param(url, 'page', page + 1) if offset + page_size < count else None
+    if page == 1:
+        previous_url = None
+    elif page == 2:
+        previous_url = remove_query_param(url, 'page')
+    else:
+        previous_url = replace_query_param(url, 'page', page - 1)
+    return {'count': count, 'next': next_url, 'previous': previous_url, 'results': serialize(rows)}
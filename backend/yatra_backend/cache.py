@@ -0,0 +1,113 @@
+"""Read-through cache for per-user API responses.
+
+Entries are keyed by scope, user and a version stamp. Model signals bump the
+stamp whenever a user's rows change, which orphans the old entries instead
+of having to find and delete them. Every bump also moves the scope-wide
+``ALL_USERS`` stamp, which versions listings that span users. Bumps wait
+for the surrounding transaction to commit.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+ME = 'me'
+VEHICLES = 'vehicles'
+JOURNEYS = 'journeys'
+SCOPES = (ME, VEHICLES, JOURNEYS)
+ALL_USERS = 'all'
+
+
+def _version_key(scope, user_id):
+    return f'ver:{scope}:{user_id}'
+
+
+def get_version(scope, user_id):
+    key = _version_key(scope, user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump(scope, user_id):
+    bump_many(scope, [user_id])
+
+
+def bump_many(scope, user_ids):
+    # Bumped before the commit, another request could cache the old rows
+    # under the new stamp, or the write could still roll back.
+    keys = [_version_key(scope, user_id) for user_id in {*user_ids, ALL_USERS}]
+    transaction.on_commit(lambda: cache.set_many(dict.fromkeys(keys, time.time_ns()), None))
+
+
+def _count(scope, outcome):
+    key = f'stats:{scope}:{outcome}'
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def _response_key(scope, user_id, version, request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'resp:{scope}:{user_id}:{version}:{path}'
+
+
+def cached_data(scope, request, build):
+    """Return the cached payload for this user and URL, or build and store it."""
+    user_id = request.user.pk
+    key = _response_key(scope, user_id, get_version(scope, user_id), request)
+    data = cache.get(key)
+    if data is not None:
+        _count(scope, 'hits')
+        return data
+    _count(scope, 'misses')
+    data = build()
+    cache.set(key, data, settings.RESPONSE_CACHE_TTL)
+    return data
+
+
+async def aget_version(scope, user_id):
+    key = _version_key(scope, user_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), None)
+        version = await cache.aget(key)
+    return version
+
+
+async def _acount(scope, outcome):
+    key = f'stats:{scope}:{outcome}'
+    await cache.aadd(key, 0, None)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        pass
+
+
+async def acached_data(scope, user, request, build):
+    """Async twin of cached_data; ``build`` is a coroutine function and the
+    user is passed explicitly because async views authenticate themselves."""
+    key = _response_key(scope, user.pk, await aget_version(scope, user.pk), request)
+    data = await cache.aget(key)
+    if data is not None:
+        await _acount(scope, 'hits')
+        return data
+    await _acount(scope, 'misses')
+    data = await build()
+    await cache.aset(key, data, settings.RESPONSE_CACHE_TTL)
+    return data
+
+
+def stats():
+    keys = [f'stats:{scope}:{outcome}' for scope in SCOPES for outcome in ('hits', 'misses')]
+    values = cache.get_many(keys)
+    return {
+        scope: {outcome: values.get(f'stats:{scope}:{outcome}', 0) for outcome in ('hits', 'misses')}
+        for scope in SCOPES
+    }
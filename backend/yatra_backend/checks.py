@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    # Cache version stamps (cached lists, ETags), admission buckets and
+    # replica pins only work when every worker sees the same cache.
+    if settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Error(
+        'The default cache is local to each process; set REDIS_URL so workers share it.',
+        hint='Otherwise other workers serve cached responses and ETags that were invalidated elsewhere.',
+        id='yatra_backend.E001',
+    )]
@@ -0,0 +1,110 @@
+"""Read-replica routing for the journey and vehicle APIs.
+
+Reads go to a replica only inside ``replica_reads()``, which the journey
+and vehicle viewsets and the async read views enter for safe requests once
+the user is authenticated. Authentication, writes and every other read stay
+on the primary. A successful write pins its user to the primary for
+``DATABASE_REPLICA_PIN_SECONDS`` (through the shared cache, so every worker
+sees it), so users read their own writes despite replication lag.
+"""
+import contextvars
+import itertools
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+_replica = contextvars.ContextVar('replica', default=None)
+_lock = threading.Lock()
+_cycle = None
+_cycled = None
+
+
+def _pin_key(user_id):
+    return f'db-pin:{user_id}'
+
+
+def pin_to_primary(user):
+    if settings.DATABASE_REPLICAS and user is not None and user.pk:
+        cache.set(_pin_key(user.pk), 1, settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+def _next_replica():
+    global _cycle, _cycled
+    with _lock:
+        if _cycled != settings.DATABASE_REPLICAS:
+            _cycled = list(settings.DATABASE_REPLICAS)
+            _cycle = itertools.cycle(_cycled)
+        return next(_cycle)
+
+
+def choose_replica(user=None):
+    """The replica alias for this user's next reads, or None for the primary."""
+    if not settings.DATABASE_REPLICAS:
+        return None
+    if user is not None and user.pk and cache.get(_pin_key(user.pk)):
+        return None
+    return _next_replica()
+
+
+def use_replica(alias):
+    """Route reads to ``alias`` (None: the primary) in the current context;
+    returns a token for ``release``."""
+    return _replica.set(alias)
+
+
+def release(token):
+    _replica.reset(token)
+
+
+@contextmanager
+def replica_reads(alias):
+    token = use_replica(alias)
+    try:
+        yield alias
+    finally:
+        release(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _replica.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaReadMixin:
+    """Viewset mixin: safe requests read from a replica, successful writes
+    pin the user to the primary.
+
+    Actions in ``primary_actions`` always read from the primary: those whose
+    responses are tied to state kept outside the replica (sync cursors,
+    cache version stamps), which replication lag would put out of step.
+    """
+
+    primary_actions = ()
+    _replica_token = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and self.action not in self.primary_actions:
+            self._replica_token = use_replica(choose_replica(request.user))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self._replica_token is not None:
+            release(self._replica_token)
+            self._replica_token = None
+        elif request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(getattr(request, 'user', None))
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,125 @@
+"""Read-only fast path for list endpoints.
+
+``RowSerializer`` compiles a DRF serializer's readable fields once into a
+column and a converter per field and applies them to ``.values()`` rows,
+producing the same dicts as the serializer without building model
+instances or running the per-field machinery for every row.
+``FastJSONRenderer`` renders with orjson when it is installed.
+"""
+from functools import partial
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from django.utils.functional import cached_property
+from rest_framework import ISO_8601, fields, relations
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _identity(value):
+    return value
+
+
+def _iso_datetime(value, tz):
+    value = value.astimezone(tz).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def _zoned(field):
+    # Plain ISO 8601 datetimes from an aware database are rendered here with
+    # the timezone resolved once per call instead of once per value.
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    return (
+        isinstance(field, fields.DateTimeField) and settings.USE_TZ
+        and output_format is not None and output_format.lower() == ISO_8601
+    )
+
+
+def _converter(field):
+    if _zoned(field):
+        return _iso_datetime
+    if isinstance(field, relations.PrimaryKeyRelatedField):
+        return _identity
+    if isinstance(field, fields.ChoiceField):
+        return lambda value: field.choice_strings_to_values.get(str(value), value)
+    if isinstance(field, (fields.CharField, fields.BooleanField)):
+        return _identity
+    if isinstance(field, fields.IntegerField):
+        return int
+    return field.to_representation
+
+
+class RowSerializer:
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+
+    @cached_property
+    def _compiled(self):
+        serializer = self.serializer_class()
+        model = serializer.Meta.model
+        compiled = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if '.' in field.source or field.source == '*':
+                raise ImproperlyConfigured(
+                    f'{self.serializer_class.__name__}.{name} cannot be read from a values() row'
+                )
+            column = model._meta.get_field(field.source).attname
+            timezone_of = getattr(field, 'timezone', None) if _zoned(field) else False
+            compiled.append((name, column, _converter(field), timezone_of))
+        return compiled
+
+    @property
+    def columns(self):
+        return [column for _, column, _, _ in self._compiled]
+
+    def _converters(self):
+        current = timezone.get_current_timezone()
+        return [
+            (name, column, convert if tz is False else partial(convert, tz=tz or current))
+            for name, column, convert, tz in self._compiled
+        ]
+
+    def serialize(self, rows):
+        converters = self._converters()
+        return [
+            {name: None if row[column] is None else convert(row[column]) for name, column, convert in converters}
+            for row in rows
+        ]
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Indented output is only asked for from the browsable API.
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            # Datetimes go through DRF's encoder so they keep its format.
+            return orjson.dumps(data, default=self.encoder_class().default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class FastListMixin:
+    """List action that reads ``row_serializer.columns`` with ``.values()``."""
+
+    row_serializer = None
+    renderer_classes = [FastJSONRenderer] + [
+        renderer for renderer in api_settings.DEFAULT_RENDERER_CLASSES if renderer is not JSONRenderer
+    ]
+
+    def list_data(self, request):
+        queryset = self.filter_queryset(self.get_queryset()).values(*self.row_serializer.columns)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.row_serializer.serialize(page)).data
+        return self.row_serializer.serialize(queryset)
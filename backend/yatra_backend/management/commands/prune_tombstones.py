@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from yatra_backend.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = 'Delete deletion tombstones older than SYNC_TOMBSTONE_DAYS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+        pruned = 0
+        for kind, _ in Tombstone.KINDS:
+            while True:
+                # Small batches off the (kind, deleted_at) index keep each delete's locks short.
+                pks = list(
+                    Tombstone.objects.filter(kind=kind, deleted_at__lt=cutoff).order_by('deleted_at')
+                    .values_list('pk', flat=True)[:options['batch_size']]
+                )
+                if not pks:
+                    break
+                pruned += Tombstone.objects.filter(pk__in=pks)._raw_delete(Tombstone.objects.db)
+        self.stdout.write(self.style.SUCCESS(f'Pruned {pruned} tombstones'))
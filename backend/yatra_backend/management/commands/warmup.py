@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+from yatra_backend import warmup
+
+
+class Command(BaseCommand):
+    help = 'Run the worker warm-up steps and report what each one cost'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--step', action='append', choices=list(warmup.STEPS), dest='steps',
+                            help='Run only this step (repeatable)')
+        parser.add_argument('--close-connections', action='store_true',
+                            help='Close database connections afterwards, as before a fork')
+
+    def handle(self, *args, **options):
+        results = warmup.run(options['steps'], close_connections=options['close_connections'], log=False)
+        for line in warmup.format_report(results):
+            self.stdout.write(line)
+        failed = [result.name for result in results if result.error]
+        if failed:
+            raise CommandError(f"Warm-up failed: {', '.join(failed)}")
@@ -0,0 +1,227 @@
+"""Per-view request metrics, exported in the Prometheus text format.
+
+When ``REQUEST_METRICS_ENABLED`` is set, ``RequestMetricsMiddleware`` records
+for each resolved view: a latency histogram, a histogram of database
+queries per request, total query time and response sizes. Queries are
+counted through an execute wrapper installed on every connection, and
+attributed to the request through a context variable, so queries run by
+async views in ``sync_to_async`` threads are counted too. Metrics live in
+the worker process; each worker exposes its own numbers.
+"""
+import heapq
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger('yatra_backend.metrics')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class _RequestQueries:
+    __slots__ = ('count', 'duration', 'slowest')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = []
+
+
+def _record_query(execute, sql, params, many, context):
+    collector = _current.get()
+    if collector is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        collector.count += 1
+        collector.duration += elapsed
+        if settings.REQUEST_METRICS_LOG_SLOW_QUERIES:
+            entry = (elapsed, sql)
+            if len(collector.slowest) < settings.REQUEST_METRICS_SLOW_QUERY_COUNT:
+                heapq.heappush(collector.slowest, entry)
+            else:
+                heapq.heappushpop(collector.slowest, entry)
+
+
+def install_query_wrapper(sender, connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+class _Histogram:
+    __slots__ = ('buckets', 'counts', 'total', 'observations')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.observations = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+        self.total += value
+        self.observations += 1
+
+
+class _ViewStats:
+    def __init__(self):
+        self.latency = _Histogram(LATENCY_BUCKETS)
+        self.queries = _Histogram(QUERY_COUNT_BUCKETS)
+        self.query_seconds = 0.0
+        self.response_bytes = 0
+        self.responses = {}
+        self.slowest = []
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view, method, status_code, elapsed, collector, size):
+        key = (view, method)
+        with self._lock:
+            stats = self._views.get(key)
+            if stats is None:
+                stats = self._views[key] = _ViewStats()
+            stats.latency.observe(elapsed)
+            stats.queries.observe(collector.count)
+            stats.query_seconds += collector.duration
+            stats.response_bytes += size
+            stats.responses[status_code] = stats.responses.get(status_code, 0) + 1
+            new_slow = self._merge_slowest(stats, collector.slowest)
+        for duration, sql in new_slow:
+            logger.warning('Slow query in %s %s (%.1f ms): %s', method, view, duration * 1000, sql)
+
+    def _merge_slowest(self, stats, candidates):
+        # Keep the N slowest queries seen for the view and report the ones
+        # that just entered that list.
+        limit = settings.REQUEST_METRICS_SLOW_QUERY_COUNT
+        new = []
+        for entry in candidates:
+            if len(stats.slowest) < limit:
+                heapq.heappush(stats.slowest, entry)
+                new.append(entry)
+            elif entry > stats.slowest[0]:
+                heapq.heapreplace(stats.slowest, entry)
+                new.append(entry)
+        return new
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def render(self):
+        with self._lock:
+            views = sorted(self._views.items())
+            lines = []
+
+            def labels(view, method, **extra):
+                pairs = [('view', view), ('method', method), *extra.items()]
+                return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+            def histogram(name, help_text, attribute):
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for (view, method), stats in views:
+                    data = getattr(stats, attribute)
+                    for bound, count in zip(data.buckets, data.counts):
+                        lines.append(f'{name}_bucket{labels(view, method, le=bound)} {count}')
+                    lines.append(f'{name}_bucket{labels(view, method, le="+Inf")} {data.observations}')
+                    lines.append(f'{name}_sum{labels(view, method)} {data.total}')
+                    lines.append(f'{name}_count{labels(view, method)} {data.observations}')
+
+            def counter(name, help_text, value):
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} counter')
+                for (view, method), stats in views:
+                    lines.append(f'{name}{labels(view, method)} {value(stats)}')
+
+            histogram('yatra_request_duration_seconds', 'Request latency per view.', 'latency')
+            histogram('yatra_db_queries_per_request', 'Database queries issued per request.', 'queries')
+            counter('yatra_db_query_seconds_total', 'Time spent in database queries.', lambda s: s.query_seconds)
+            counter('yatra_response_bytes_total', 'Bytes of non-streaming response bodies.',
+                    lambda s: s.response_bytes)
+            lines.append('# HELP yatra_responses_total Responses per view and status code.')
+            lines.append('# TYPE yatra_responses_total counter')
+            for (view, method), stats in views:
+                for status_code, count in sorted(stats.responses.items()):
+                    lines.append(f'yatra_responses_total{labels(view, method, status=status_code)} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match._func_path
+
+
+def _response_size(response):
+    if getattr(response, 'streaming', False):
+        return 0
+    return len(response.content)
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        for connection in connections.all(initialized_only=True):
+            install_query_wrapper(None, connection)
+        collector = _RequestQueries()
+        token = _current.set(collector)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._finish(request, response, start, collector)
+        return response
+
+    async def __acall__(self, request):
+        collector = _RequestQueries()
+        token = _current.set(collector)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._finish(request, response, start, collector)
+        return response
+
+    def _finish(self, request, response, start, collector):
+        registry.record(
+            _view_name(request), request.method, response.status_code,
+            time.perf_counter() - start, collector, _response_size(response),
+        )
+
+
+if settings.REQUEST_METRICS_ENABLED:
+    connection_created.connect(install_query_wrapper, dispatch_uid='yatra_backend.metrics')
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:15
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('journey', 'Journey'), ('vehicle', 'Vehicle')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('user_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'user_id', 'deleted_at'], name='tombstone_user_deleted_idx'), models.Index(fields=['kind', 'deleted_at'], name='tombstone_deleted_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import models
+from django.utils import timezone
+
+
+class TombstoneManager(models.Manager):
+    def record(self, kind, rows):
+        """Record deletions of ``(object_id, user_id)`` pairs."""
+        now = timezone.now()
+        self.bulk_create(
+            self.model(kind=kind, object_id=object_id, user_id=user_id, deleted_at=now)
+            for object_id, user_id in rows
+        )
+
+
+class Tombstone(models.Model):
+    """A deleted (or archived) row, kept so delta-sync clients can drop it."""
+    JOURNEY = 'journey'
+    VEHICLE = 'vehicle'
+    KINDS = [(JOURNEY, 'Journey'), (VEHICLE, 'Vehicle')]
+
+    kind = models.CharField(max_length=10, choices=KINDS)
+    object_id = models.BigIntegerField()
+    # Plain column rather than a foreign key: tombstones outlive their user.
+    user_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    objects = TombstoneManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['kind', 'user_id', 'deleted_at'], name='tombstone_user_deleted_idx'),
+            models.Index(fields=['kind', 'deleted_at'], name='tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
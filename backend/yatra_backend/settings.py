@@ -24,6 +24,9 @@ INSTALLED_APPS = [
     'users',
     'journeys',
     'vehicles',
+    'videos',
+    'benchmarks',
+    'yatra_backend',
 ]
 
 MIDDLEWARE = [
@@ -37,6 +40,28 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-view latency, query and response-size metrics, served at /api/metrics/.
+# With the slow-query flag, queries that enter a view's list of its N
+# slowest are logged to the yatra_backend.metrics logger.
+REQUEST_METRICS_ENABLED = os.getenv('REQUEST_METRICS_ENABLED', '').lower() in ('1', 'true', 'yes')
+REQUEST_METRICS_LOG_SLOW_QUERIES = os.getenv('REQUEST_METRICS_LOG_SLOW_QUERIES', '').lower() in ('1', 'true', 'yes')
+REQUEST_METRICS_SLOW_QUERY_COUNT = 5
+if REQUEST_METRICS_ENABLED:
+    MIDDLEWARE.insert(0, 'yatra_backend.metrics.RequestMetricsMiddleware')
+
+# Preload password validators, URLs and serializers when apps are ready, and
+# the origin index and forecast once the WSGI/ASGI application is built (see
+# yatra_backend.warmup). wsgi.py and asgi.py turn this on.
+WARMUP_ON_STARTUP = os.getenv('WARMUP_ON_STARTUP', '').lower() in ('1', 'true', 'yes')
+
+# Warm-up timings and slow-query reports from the yatra_backend loggers.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {'console': {'class': 'logging.StreamHandler'}},
+    'loggers': {'yatra_backend': {'handlers': ['console'], 'level': 'INFO'}},
+}
+
 ROOT_URLCONF = 'yatra_backend.urls'
 
 TEMPLATES = [
@@ -56,6 +81,11 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'yatra_backend.wsgi.application'
+ASGI_APPLICATION = 'yatra_backend.asgi.application'
+
+# Serve /me and the journey/vehicle list and detail reads from async views.
+# asgi.py turns this on; under WSGI the sync DRF views are used.
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', '').lower() in ('1', 'true', 'yes')
 
 DATABASES = {
     'default': {
@@ -65,9 +95,57 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', ''),
         'HOST': os.getenv('DB_HOST', 'localhost'),
         'PORT': os.getenv('DB_PORT', '3306'),
+        # Reuse connections across requests, pinging them before reuse. Django
+        # advises against persistent connections under ASGI, so it is off there.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '0' if ASYNC_READ_VIEWS else '60')),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Read replicas, as DB_REPLICA_HOSTS=host[:port],... with the primary's
+# credentials. Journey and vehicle reads go to them (see db_router); a user
+# who has just written reads from the primary for DATABASE_REPLICA_PIN_SECONDS.
+for _index, _address in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', '').split(',')), 1):
+    _host, _, _port = _address.strip().partition(':')
+    DATABASES[f'replica_{_index}'] = {
+        **DATABASES['default'],
+        'HOST': _host,
+        'PORT': _port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_REPLICA_PIN_SECONDS = 5
+DATABASE_ROUTERS = ['yatra_backend.db_router.ReplicaRouter']
+
+# Local memory by default, for development only: cached responses, ETags,
+# admission buckets and replica pins need one cache shared by all workers,
+# so set REDIS_URL (manage.py check --deploy fails without it).
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds a cached /me, vehicle list or journey list response may be served.
+RESPONSE_CACHE_TTL = 300
+
+# Admission control (yatra_backend.admission): requests per second and burst
+# size per endpoint, shared across workers through the cache above. Requests
+# past the burst get a 429 with Retry-After.
+ADMISSION_BACKEND = 'yatra_backend.admission.CacheTokenBucket'
+ADMISSION_BUCKETS = {
+    'register': {'rate': float(os.getenv('ADMISSION_REGISTER_RATE', '20')), 'burst': 50},
+    'journey_create': {'rate': float(os.getenv('ADMISSION_BOOKING_RATE', '100')), 'burst': 200},
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -91,6 +169,9 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+MEDIA_URL = 'media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'users.User'
@@ -106,6 +187,7 @@ CSRF_TRUSTED_ORIGINS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'users.authentication.SignedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework.authentication.BasicAuthentication',
     ],
@@ -114,4 +196,63 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
-} 
\ No newline at end of file
+}
+
+# Signed tokens issued by login_view: lifetime in seconds, and the size and
+# TTL of the per-process cache of users resolved from them.
+AUTH_TOKEN_MAX_AGE = int(os.getenv('AUTH_TOKEN_MAX_AGE', str(12 * 60 * 60)))
+AUTH_TOKEN_USER_CACHE_SIZE = 1024
+AUTH_TOKEN_USER_CACHE_TTL = 60
+
+# Vehicles admitted per destination in each booking slot. Rows in the
+# SlotCapacity table override these defaults for individual slots.
+JOURNEY_SLOT_MINUTES = int(os.getenv('JOURNEY_SLOT_MINUTES', '60'))
+JOURNEY_SLOT_CAPACITY = {
+    'KM': 500,
+    'BD': 150,
+    'JG': 300,
+    'UJ': 300,
+    'KD': 100,
+}
+
+# Window covered by the hourly occupancy forecast, and how often each worker
+# reloads it from the database to pick up bookings made by other workers.
+FORECAST_HISTORY_HOURS = 24
+FORECAST_HORIZON_HOURS = 24 * 120
+FORECAST_REBUILD_SECONDS = 300
+
+# Dashcam uploads: size limits, the vehicle counter used by run_video_worker,
+# its process pool size, how many frames to skip between analysed frames, and
+# after how long a job still marked processing is failed as abandoned.
+DASHCAM_MAX_UPLOAD_SIZE = 4 * 1024 ** 3
+DASHCAM_MAX_CHUNK_SIZE = 16 * 1024 ** 2
+DASHCAM_VEHICLE_COUNTER = os.getenv('DASHCAM_VEHICLE_COUNTER', 'videos.counters.MotionBlobCounter')
+DASHCAM_WORKERS = int(os.getenv('DASHCAM_WORKERS', str(os.cpu_count() or 2)))
+DASHCAM_FRAME_STRIDE = 2
+DASHCAM_STALE_JOB_SECONDS = 2 * 60 * 60
+
+# Live route traffic stream: seconds between keepalive comments, and how many
+# undelivered events a slow client may have queued before it is reset.
+ROUTE_EVENTS_HEARTBEAT = 15
+ROUTE_EVENTS_QUEUE_SIZE = 256
+
+# Rows fetched per query by the journey export (endpoint and command).
+JOURNEY_EXPORT_CHUNK_SIZE = 2000
+
+# Route suggestions: seconds before hourly corridor loads are re-read, and
+# how many hours either side of the requested departure slots are offered.
+ROUTING_REFRESH_SECONDS = 60
+SLOT_SUGGESTION_WINDOW_HOURS = 12
+
+# Origin autocomplete: seconds before each worker reloads the index, and how
+# similar free text must be to an existing origin to be suggested for it.
+ORIGIN_INDEX_REFRESH_SECONDS = 300
+ORIGIN_MATCH_CUTOFF = 0.85
+
+# Delta sync (changes?since=): rows per page by default and at most, how far
+# back a drained cursor is set to catch slow commits, and how long deletion
+# tombstones are kept (prune_tombstones).
+SYNC_PAGE_SIZE = 200
+SYNC_MAX_PAGE_SIZE = 1000
+SYNC_OVERLAP_SECONDS = 5
+SYNC_TOMBSTONE_DAYS = 30
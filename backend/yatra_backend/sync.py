@@ -0,0 +1,169 @@
+"""Delta sync and conditional GET for the journey and vehicle APIs.
+
+``changes?since=<cursor>`` returns rows updated after the cursor, in
+(updated_at, id) order off the ``updated_at`` indexes, and the ids of rows
+deleted since then from the Tombstone table. The cursor holds one keyset
+position per stream. Once a stream is drained its position is set back to
+``SYNC_OVERLAP_SECONDS`` ago, so rows saved just before a slow commit are
+sent again rather than missed; clients apply ``changed`` as upserts, then
+``deleted``. Tombstones are kept for ``SYNC_TOMBSTONE_DAYS``; a cursor
+whose deletions position is older gets 410 and the client starts over
+without ``since``.
+
+List responses carry an ETag built from the cache version stamps (no query
+at all), detail responses one built from ``updated_at``, and both a
+Last-Modified, so a matching If-None-Match / If-Modified-Since gets 304
+before anything is read or serialized.
+"""
+import base64
+import hashlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework import exceptions, status
+from . import cache
+from .models import Tombstone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class CursorExpired(exceptions.APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = 'Cursor expired; sync again without since.'
+
+
+def _micros(value):
+    delta = value - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 10 ** 6 + delta.microseconds
+
+
+def _from_micros(value):
+    return EPOCH + timedelta(microseconds=value)
+
+
+def encode_cursor(changed, deleted):
+    text = f'{_micros(changed[0])}.{changed[1]}.{_micros(deleted[0])}.{deleted[1]}'
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        text = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        changed_at, changed_id, deleted_at, deleted_id = (int(part) for part in text.split('.'))
+    except (ValueError, UnicodeDecodeError):
+        raise exceptions.ValidationError({'since': ['Invalid cursor.']})
+    return (_from_micros(changed_at), changed_id), (_from_micros(deleted_at), deleted_id)
+
+
+def page_limit(request):
+    try:
+        limit = int(request.query_params.get('limit', settings.SYNC_PAGE_SIZE))
+    except ValueError:
+        raise exceptions.ValidationError({'limit': ['Must be an integer.']})
+    return min(max(limit, 1), settings.SYNC_MAX_PAGE_SIZE)
+
+
+def _after(field, position):
+    moment, pk = position
+    return Q(**{f'{field}__gt': moment}) | Q(**{field: moment, 'id__gt': pk})
+
+
+def changes(queryset, row_serializer, kind, user_id, since=None, limit=None):
+    """One page of changes to ``queryset`` (already scoped to what the user
+    may see) and the deletions of ``kind`` rows owned by ``user_id`` (all
+    users when None)."""
+    limit = limit or settings.SYNC_PAGE_SIZE
+    now = timezone.now()
+    horizon = (now - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS), 0)
+    if since:
+        changed_from, deleted_from = decode_cursor(since)
+        if deleted_from[0] < now - timedelta(days=settings.SYNC_TOMBSTONE_DAYS):
+            raise CursorExpired()
+    else:
+        # A first sync downloads everything and needs no earlier deletions.
+        changed_from, deleted_from = (EPOCH, 0), horizon
+
+    columns = list(dict.fromkeys([*row_serializer.columns, 'id', 'updated_at']))
+    rows = list(
+        queryset.filter(_after('updated_at', changed_from)).order_by('updated_at', 'id')
+        .values(*columns)[:limit + 1]
+    )
+    tombstones = Tombstone.objects.filter(kind=kind)
+    if user_id is not None:
+        tombstones = tombstones.filter(user_id=user_id)
+    deleted = list(
+        tombstones.filter(_after('deleted_at', deleted_from)).order_by('deleted_at', 'id')
+        .values_list('id', 'object_id', 'deleted_at')[:limit + 1]
+    )
+
+    more_changed, more_deleted = len(rows) > limit, len(deleted) > limit
+    rows, deleted = rows[:limit], deleted[:limit]
+    changed_to = (rows[-1]['updated_at'], rows[-1]['id']) if more_changed else horizon
+    deleted_to = (deleted[-1][2], deleted[-1][0]) if more_deleted else horizon
+    return {
+        'changed': row_serializer.serialize(rows),
+        'deleted': [object_id for _, object_id, _ in deleted],
+        'cursor': encode_cursor(changed_to, deleted_to),
+        'has_more': more_changed or more_deleted,
+    }
+
+
+def _etag(*parts):
+    return 'W/"%s"' % hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def list_validators(scope, owner_id, request, version):
+    # The representation also depends on the URL and the negotiated format.
+    etag = _etag(scope, owner_id, version, request.get_full_path(), request.META.get('HTTP_ACCEPT', ''))
+    return etag, version // 10 ** 9
+
+
+def list_version_owner(scope, user):
+    """Whose version stamp covers this user's listing of ``scope``."""
+    return cache.ALL_USERS if scope == cache.JOURNEYS and user.is_admin else user.pk
+
+
+def list_conditions(scope, user, request):
+    owner = list_version_owner(scope, user)
+    return list_validators(scope, owner, request, cache.get_version(scope, owner))
+
+
+async def alist_conditions(scope, user, request):
+    owner = list_version_owner(scope, user)
+    return list_validators(scope, owner, request, await cache.aget_version(scope, owner))
+
+
+def detail_conditions(instance, request):
+    updated_at = instance.updated_at
+    etag = _etag(type(instance).__name__, instance.pk, _micros(updated_at), request.META.get('HTTP_ACCEPT', ''))
+    return etag, int(updated_at.timestamp())
+
+
+def not_modified(request, etag, last_modified):
+    """A 304 response when the client's copy is current, else None."""
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        add_validators(response, etag, last_modified)
+    return response
+
+
+def add_validators(response, etag, last_modified):
+    if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+    # Per-user data: revalidate every time, never store in shared caches.
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['Authorization', 'Accept'])
+    return response
+
+
+def conditional(request, conditions, build):
+    etag, last_modified = conditions
+    response = not_modified(request, etag, last_modified)
+    if response is None:
+        response = add_validators(build(), etag, last_modified)
+    return response
@@ -0,0 +1,205 @@
+import json
+from datetime import timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache as django_cache
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import resolve
+from django.utils import timezone
+from journeys.forecast import occupancy
+from journeys.models import Journey
+from journeys.origins import origin_index
+from journeys.serializers import JourneySerializer, journey_rows
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from users.authentication import issue_token
+from users.models import User
+from vehicles.models import Vehicle
+from vehicles.serializers import VehicleSerializer, vehicle_rows
+from yatra_backend import admission, cache, warmup
+from .db_router import ReplicaRouter, choose_replica, replica_reads
+from .fast_serializers import FastJSONRenderer
+from .metrics import RequestMetricsMiddleware, registry
+
+
+class CacheVersionTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+
+    def test_bump_waits_for_commit(self):
+        before = cache.get_version(cache.JOURNEYS, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                cache.bump(cache.JOURNEYS, 1)
+                self.assertEqual(cache.get_version(cache.JOURNEYS, 1), before)
+        self.assertNotEqual(cache.get_version(cache.JOURNEYS, 1), before)
+
+    def test_rolled_back_bump_keeps_the_version(self):
+        before = cache.get_version(cache.JOURNEYS, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    cache.bump(cache.JOURNEYS, 1)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(cache.get_version(cache.JOURNEYS, 1), before)
+
+    def test_bump_moves_the_all_users_stamp(self):
+        before = cache.get_version(cache.VEHICLES, cache.ALL_USERS)
+        with self.captureOnCommitCallbacks(execute=True):
+            cache.bump_many(cache.VEHICLES, [1, 2])
+        self.assertNotEqual(cache.get_version(cache.VEHICLES, cache.ALL_USERS), before)
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+
+    def test_queries_and_responses_are_recorded_per_view(self):
+        def view(request):
+            User.objects.count()
+            User.objects.exists()
+            return HttpResponse('ok')
+
+        request = RequestFactory().get('/api/journeys/')
+        request.resolver_match = resolve('/api/journeys/')
+        RequestMetricsMiddleware(view)(request)
+        labels = '{view="journey-list",method="GET"}'
+        lines = registry.render().splitlines()
+        self.assertIn(f'yatra_db_queries_per_request_sum{labels} 2.0', lines)
+        self.assertIn(f'yatra_request_duration_seconds_count{labels} 1', lines)
+        self.assertIn(f'yatra_response_bytes_total{labels} 2', lines)
+        self.assertIn('yatra_responses_total{view="journey-list",method="GET",status="200"} 1', lines)
+
+    def test_endpoint_is_admin_only_and_off_by_default(self):
+        admin = User.objects.create_user(
+            username='control', password='bench-Pass-2024', aadhar_number='123456789013',
+            license_number='DL0420240002', phone_number='9876543211', is_admin=True,
+        )
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {issue_token(admin)}')
+        with override_settings(REQUEST_METRICS_ENABLED=False):
+            self.assertEqual(client.get('/api/metrics/').status_code, 404)
+        with override_settings(REQUEST_METRICS_ENABLED=True):
+            response = client.get('/api/metrics/')
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response['Content-Type'].startswith('text/plain'))
+            self.assertEqual(APIClient().get('/api/metrics/').status_code, 401)
+
+
+class RowSerializerTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(
+            username='pilgrim', password='bench-Pass-2024', aadhar_number='123456789012',
+            license_number='DL0420240001', phone_number='9876543210',
+        )
+        vehicle = Vehicle.objects.create(
+            user=user, vehicle_type='TR', plate_number='UP32AB1234', model_name='Tempo', max_capacity=15,
+        )
+        start = timezone.now().replace(microsecond=123456)
+        Journey.objects.create(
+            user=user, vehicle=vehicle, start_location='Lucknow', end_location='KM',
+            start_date=start, end_date=start + timedelta(days=1), number_of_passengers=2,
+        )
+
+    def assertRowsMatch(self, model, serializer_class, rows):
+        queryset = model.objects.order_by('id')
+        self.assertEqual(rows.serialize(queryset.values(*rows.columns)), serializer_class(queryset, many=True).data)
+
+    def test_rows_match_the_model_serializers(self):
+        self.assertRowsMatch(Journey, JourneySerializer, journey_rows)
+        self.assertRowsMatch(Vehicle, VehicleSerializer, vehicle_rows)
+        with timezone.override(dt_timezone(timedelta(hours=5, minutes=30))):
+            self.assertRowsMatch(Journey, JourneySerializer, journey_rows)
+
+    def test_renderer_output_matches_drf(self):
+        data = JourneySerializer(Journey.objects.all(), many=True).data
+        self.assertEqual(json.loads(FastJSONRenderer().render(data)), json.loads(JSONRenderer().render(data)))
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1', 'replica_2'])
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        self.user = User.objects.create_user(
+            username='pilgrim', password='bench-Pass-2024', aadhar_number='123456789012',
+            license_number='DL0420240001', phone_number='9876543210',
+        )
+
+    def test_reads_rotate_over_replicas_only_when_asked(self):
+        self.assertEqual({choose_replica(self.user) for _ in range(4)}, {'replica_1', 'replica_2'})
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Journey))
+        with replica_reads('replica_2'):
+            self.assertEqual(router.db_for_read(Journey), 'replica_2')
+            self.assertEqual(router.db_for_write(Journey), 'default')
+        self.assertIsNone(router.db_for_read(Journey))
+
+    def test_successful_write_pins_the_user_to_the_primary(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {issue_token(self.user)}')
+        response = client.post('/api/vehicles/', {
+            'vehicle_type': '4W', 'plate_number': 'UP32AB1235', 'model_name': 'Swift', 'max_capacity': 4,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNone(choose_replica(self.user))
+        self.assertIsNotNone(choose_replica(None))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas_reads_from_the_primary(self):
+        self.assertIsNone(choose_replica(self.user))
+
+
+@override_settings(ADMISSION_BUCKETS={'register': {'rate': 10, 'burst': 2}})
+class AdmissionTests(TestCase):
+    def setUp(self):
+        django_cache.clear()
+        admission._buckets.clear()
+        self.addCleanup(admission._buckets.clear)
+
+    def test_bucket_admits_a_burst_then_refills_at_the_rate(self):
+        bucket = admission.get_bucket('register')
+        with mock.patch.object(admission, '_now_ms', return_value=1_000_000) as now:
+            self.assertEqual([bucket.reserve()[0] for _ in range(3)], [True, True, False])
+            self.assertGreater(bucket.reserve()[1], 0)
+            now.return_value += 100
+            self.assertEqual([bucket.reserve()[0] for _ in range(2)], [True, False])
+
+    def test_refused_request_gets_429_with_retry_after(self):
+        with mock.patch.object(admission, '_now_ms', return_value=1_000_000):
+            responses = [APIClient().post('/api/users/register/', {}, format='json') for _ in range(3)]
+        self.assertEqual([response.status_code for response in responses], [400, 400, 429])
+        self.assertGreaterEqual(int(responses[2]['Retry-After']), 1)
+
+    def test_endpoint_without_a_bucket_is_not_limited(self):
+        self.assertIsNone(admission.get_bucket('journey_create'))
+        self.assertTrue(admission.AdmissionThrottle('journey_create').allow_request(None, None))
+
+
+class WarmupTests(TestCase):
+    def setUp(self):
+        self.addCleanup(origin_index.reset)
+        self.addCleanup(occupancy.reset)
+
+    def test_every_step_runs_and_is_reported(self):
+        results = warmup.run(log=False)
+        self.assertEqual([result.name for result in results], list(warmup.STEPS))
+        self.assertEqual([result.error for result in results], [None] * len(warmup.STEPS))
+        self.assertIsNotNone(occupancy._built_at)
+
+    def test_failing_step_does_not_stop_the_others(self):
+        def broken():
+            raise RuntimeError('no cache')
+
+        with mock.patch.dict(warmup.STEPS, {'url resolver': broken}):
+            results = warmup.run(warmup.MEMORY_STEPS, log=False)
+            with self.assertRaisesMessage(CommandError, 'url resolver'):
+                call_command('warmup', stdout=StringIO())
+        self.assertEqual([result.error is None for result in results], [True, False, True])
+        self.assertIn('failed: no cache', warmup.format_report(results)[1])
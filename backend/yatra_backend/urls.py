@@ -2,10 +2,14 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from .views import cache_stats, metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/users/', include('users.urls')),
     path('api/journeys/', include('journeys.urls')),
     path('api/vehicles/', include('vehicles.urls')),
+    path('api/videos/', include('videos.urls')),
+    path('api/cache-stats/', cache_stats, name='cache-stats'),
+    path('api/metrics/', metrics, name='metrics'),
 ] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT) 
\ No newline at end of file
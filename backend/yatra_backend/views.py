@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from users.permissions import IsAdmin
+from . import cache
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def cache_stats(request):
+    return Response(cache.stats())
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def metrics(request):
+    if not settings.REQUEST_METRICS_ENABLED:
+        return Response({'detail': 'Request metrics are disabled.'}, status=404)
+    from .metrics import registry
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
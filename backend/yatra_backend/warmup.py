@@ -0,0 +1,128 @@
+"""Worker warm-up: do once at startup what the first requests would pay for.
+
+Steps fall into three groups:
+
+* ``MEMORY_STEPS`` need no database: the password validators (the common
+  password list is read and decompressed), the URL resolver, and the
+  fields of every routed serializer and row serializer. They run from
+  ``AppConfig.ready`` when ``WARMUP_ON_STARTUP`` is set.
+* ``DATA_STEPS`` load the in-process origin index and occupancy forecast.
+  They run from wsgi.py/asgi.py, once apps are ready. Under a pre-fork
+  server that loads the app in the master (``gunicorn --preload``), workers
+  share these copy-on-write.
+* ``CONNECTION_STEPS`` open the database connections. Sockets must not be
+  shared across a fork, so the startup hook closes them again; servers with
+  a post-fork hook can run ``run(CONNECTION_STEPS)`` there.
+
+Each run logs how long every step took to the ``yatra_backend.warmup``
+logger; ``manage.py warmup`` runs them all and prints the same report.
+"""
+import logging
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.urls import get_resolver
+
+logger = logging.getLogger('yatra_backend.warmup')
+
+StepResult = namedtuple('StepResult', 'name seconds detail error')
+
+
+def password_validators():
+    from django.contrib.auth.password_validation import get_default_password_validators
+
+    # Cached for the process; CommonPasswordValidator reads its list here.
+    return f'{len(get_default_password_validators())} validators'
+
+
+def url_resolver():
+    resolver = get_resolver()
+    return f'{len(resolver.reverse_dict)} url names'
+
+
+def _routed_views(patterns):
+    for pattern in patterns:
+        if hasattr(pattern, 'url_patterns'):
+            yield from _routed_views(pattern.url_patterns)
+        else:
+            view = getattr(pattern.callback, 'cls', None)
+            if view is not None:
+                yield view
+
+
+def serializers():
+    built = set()
+    for view in _routed_views(get_resolver().url_patterns):
+        serializer_class = getattr(view, 'serializer_class', None)
+        if serializer_class is not None and serializer_class not in built:
+            serializer_class().fields
+            built.add(serializer_class)
+        row_serializer = getattr(view, 'row_serializer', None)
+        if row_serializer is not None:
+            row_serializer.columns
+    return f'{len(built)} serializers'
+
+
+def origin_index():
+    from journeys.origins import origin_index
+
+    origin_index.load()
+    return f'{len(origin_index)} origins'
+
+
+def occupancy_forecast():
+    from journeys.forecast import occupancy
+
+    occupancy.load()
+    return f'{settings.FORECAST_HORIZON_HOURS} hours'
+
+
+def database_connections():
+    aliases = [DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS]
+    for alias in aliases:
+        connections[alias].ensure_connection()
+    return f"{len(aliases)} connection{'s' if len(aliases) != 1 else ''}"
+
+
+MEMORY_STEPS = ('password validators', 'url resolver', 'serializers')
+DATA_STEPS = ('origin index', 'occupancy forecast')
+CONNECTION_STEPS = ('database connections',)
+STEPS = {
+    'password validators': password_validators,
+    'url resolver': url_resolver,
+    'serializers': serializers,
+    'database connections': database_connections,
+    'origin index': origin_index,
+    'occupancy forecast': occupancy_forecast,
+}
+
+
+def run(steps=None, close_connections=False, log=True):
+    """Run the named steps (default: all) in order and return a
+    StepResult for each. A failing step is reported and skipped, so
+    warm-up never keeps a worker from starting."""
+    results = []
+    for name in steps or STEPS:
+        start = time.perf_counter()
+        try:
+            detail, error = STEPS[name](), None
+        except Exception as exc:
+            detail, error = None, exc
+        results.append(StepResult(name, time.perf_counter() - start, detail, error))
+    if close_connections:
+        connections.close_all()
+    if log:
+        for line in format_report(results):
+            logger.info(line)
+    return results
+
+
+def format_report(results):
+    lines = []
+    for result in results:
+        outcome = f'failed: {result.error}' if result.error else result.detail
+        lines.append(f'warm-up {result.name:<22} {result.seconds * 1000:8.1f} ms  {outcome}')
+    lines.append(f"warm-up {'total':<22} {sum(result.seconds for result in results) * 1000:8.1f} ms")
+    return lines
@@ -9,8 +9,17 @@ https://docs.djangoproject.com/en/5.0/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatra_backend.settings')
+os.environ.setdefault('WARMUP_ON_STARTUP', '1')
 
-application = get_wsgi_application() 
\ No newline at end of file
+application = get_wsgi_application() 
+
+if settings.WARMUP_ON_STARTUP:
+    from yatra_backend import warmup
+
+    # Connections are only checked here; workers forked from this process
+    # must open their own.
+    warmup.run(warmup.CONNECTION_STEPS + warmup.DATA_STEPS, close_connections=True)
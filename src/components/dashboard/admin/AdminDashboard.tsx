@@ -8,11 +8,19 @@ import { VideoAnalysis } from './VideoAnalysis';
 import { mockVideoAnalyses } from '@/data/mockData';
 import { useToast } from '@/components/ui/use-toast';
 
+const toRoute = route => ({
+  id: `${route.start_location}__${route.end_location}`,
+  startLocation: route.start_location,
+  endLocation: route.end_location,
+  totalCapacity: route.total_capacity,
+  currentBookings: route.booking_count,
+  trafficStatus: route.traffic_status,
+});
+
 export const AdminDashboard = () => {
   const { user } = useAuth();
   const { toast } = useToast();
   const [activeTab, setActiveTab] = useState('overview');
-  const [journeys, setJourneys] = useState([]);
   const [routeStats, setRouteStats] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -25,7 +33,7 @@ export const AdminDashboard = () => {
       }
 
       try {
-        const response = await fetch('http://localhost:8000/api/journeys/', { 
+        const response = await fetch('http://localhost:8000/api/journeys/route-stats/', { 
           credentials: 'include',
           headers: {
             'Content-Type': 'application/json',
@@ -36,36 +44,9 @@ export const AdminDashboard = () => {
           throw new Error(`HTTP error! status: ${response.status}`);
         }
 
+        // Route stats are aggregated server-side, one row per route
         const data = await response.json();
-        let journeysArray = Array.isArray(data) ? data : (data.results || []);
-        setJourneys(journeysArray);
-
-        // Aggregate route stats
-        const routeMap = new Map();
-        journeysArray.forEach(j => {
-          const key = `${j.start_location}__${j.end_location}`;
-          if (!routeMap.has(key)) {
-            routeMap.set(key, {
-              id: key,
-              startLocation: j.start_location,
-              endLocation: j.end_location,
-              totalCapacity: 500,
-              currentBookings: 0,
-              trafficStatus: 'low',
-            });
-          }
-          routeMap.get(key).currentBookings++;
-        });
-
-        // Calculate traffic status
-        for (const route of routeMap.values()) {
-          const occupancy = route.currentBookings / route.totalCapacity;
-          if (occupancy > 0.9) route.trafficStatus = 'high';
-          else if (occupancy > 0.6) route.trafficStatus = 'moderate';
-          else route.trafficStatus = 'low';
-        }
-
-        setRouteStats(Array.from(routeMap.values()));
+        setRouteStats(data.map(toRoute));
         setError(null);
       } catch (err) {
         console.error('Error fetching journeys:', err);
@@ -82,6 +63,32 @@ export const AdminDashboard = () => {
 
     fetchData();
   }, [user, toast]);
+
+  // Live route updates pushed by the server; replaces polling the stats
+  useEffect(() => {
+    if (!user || user.role !== 'admin') return;
+
+    const source = new EventSource('http://localhost:8000/api/journeys/events/', { withCredentials: true });
+    const mergeRoutes = (event) => {
+      const { routes } = JSON.parse(event.data);
+      setRouteStats(current => {
+        const byId = new Map(current.map(route => [route.id, route]));
+        routes.map(toRoute).forEach(route => {
+          if (route.currentBookings > 0) byId.set(route.id, route);
+          else byId.delete(route.id);
+        });
+        return Array.from(byId.values());
+      });
+    };
+    ['created', 'approved', 'rejected', 'updated', 'deleted'].forEach(type =>
+      source.addEventListener(type, mergeRoutes)
+    );
+    source.addEventListener('snapshot', event => {
+      setRouteStats(JSON.parse(event.data).routes.map(toRoute));
+    });
+
+    return () => source.close();
+  }, [user]);
   
   if (!user || user.role !== 'admin') {
     return (